@@ -0,0 +1,582 @@
+"""Teljesitmenymeresek.
+
+Hasznalat: python benchmark.py [nev ...]  (nev nelkul mindegyik lefut)
+"""
+import math
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import sys
+import time
+import tracemalloc
+
+from core import (Card, BattleCard, Dungeon, BattleEngine, GameState, STRONG_AGAINST, WEAK_AGAINST, base_damage,
+                  DuelCache)
+import simulator
+import optimizer
+import montecarlo
+from rngstream import RngStream
+from replay import Replay, ReplayRecorder, format_event
+from cardlist import CardListModel, CardFilter
+import minigame
+from output import DirectoryOutput, ArchiveOutput
+from profiles import SharedWorld, PlayerProfile
+
+TYPES = ["tuz", "viz", "fold", "levego"]
+
+
+def random_card(rng, name):
+    return Card(name, rng.randint(2, 6), rng.randint(2, 12), rng.choice(TYPES))
+
+
+def random_decks(rng, count, size):
+    return [[random_card(rng, f"P{i}_{k}") for k in range(size)] for i in range(count)]
+
+
+def random_dungeons(rng, count, size):
+    return [Dungeon("kis", f"D{i}", [random_card(rng, f"E{i}_{k}") for k in range(size)],
+                    random_card(rng, f"L{i}"), "sebzes") for i in range(count)]
+
+
+def legacy_normalize_text(text):
+    """A normalize_text korabbi, replace-lancos valtozata (a legacy_damage alapja)."""
+    replacements = {
+        'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ö': 'o', 'ő': 'o',
+        'ú': 'u', 'ü': 'u', 'ű': 'u', 'Á': 'A', 'É': 'E', 'Í': 'I',
+        'Ó': 'O', 'Ö': 'O', 'Ú': 'U', 'Ü': 'U', 'Ű': 'U'
+    }
+    for k, v in replacements.items():
+        text = text.replace(k, v)
+    return text.lower().strip()
+
+
+def legacy_damage(attacker, defender):
+    """A tipusmodosito korabbi szamitasa (replace-lancos normalizalas + szotar), osszehasonlitashoz."""
+    atk_t = legacy_normalize_text(attacker.type)
+    def_t = legacy_normalize_text(defender.type)
+    modifier = 1.0
+    if STRONG_AGAINST.get(atk_t) == def_t:
+        modifier = 2.0
+    elif WEAK_AGAINST.get(atk_t) == def_t:
+        modifier = 0.5
+    return math.floor(attacker.base_dmg * modifier)
+
+
+class LegacyBattleEngine(BattleEngine):
+    """A BattleEngine korabbi tamadas lepese: minden tamadas ujraszamolja a sebzest (legacy_damage)."""
+
+    def step(self):
+        if self.battle_over: return
+
+        if self.p_idx >= len(self.player_deck):
+            self.end_battle("enemy")
+            return
+        if self.e_idx >= len(self.enemy_deck):
+            self.end_battle("player")
+            return
+
+        p_card = self.player_deck[self.p_idx]
+        e_card = self.enemy_deck[self.e_idx]
+
+        if not self.e_card_played:
+            self.log("play", self.turn, "kazamata", e_card, None, 0)
+            self.e_card_played = True
+            return
+
+        if not self.p_card_played:
+            self.log("play", self.turn, "jatekos", p_card, None, 0)
+            self.p_card_played = True
+            return
+
+        attacker_owner = self.next_actor
+        attacker = e_card if attacker_owner == "enemy" else p_card
+        defender = p_card if attacker_owner == "enemy" else e_card
+        is_dungeon_atk = (attacker_owner == "enemy")
+
+        final_dmg = self.apply_difficulty(legacy_damage(attacker, defender), is_dungeon_atk)
+
+        defender.current_hp -= final_dmg
+        self.log("attack", self.turn, attacker_owner, attacker, defender, final_dmg)
+
+        if defender.current_hp <= 0:
+            if not is_dungeon_atk and attacker.current_hp > 0:
+                attacker.current_hp = min(attacker.max_hp, attacker.current_hp + 1)
+
+            if attacker_owner == "enemy":
+                self.p_idx += 1
+                self.p_card_played = False
+                self.next_actor = "enemy"
+            else:
+                self.e_idx += 1
+                self.e_card_played = False
+                self.next_actor = "enemy"
+            self.turn += 1
+        else:
+            self.next_actor = "player" if self.next_actor == "enemy" else "enemy"
+            if attacker_owner == "player":
+                self.turn += 1
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+# --- MÉRÉSEK ---
+
+def bench_simulator():
+    rng = random.Random(42)
+    decks = random_decks(rng, 100, 5)
+    dungeons = random_dungeons(rng, 100, 5)
+    fights = len(decks) * len(dungeons)
+
+    def engine():
+        for deck in decks:
+            for d in dungeons:
+                eng = BattleEngine(deck, d, 0, lambda *a: None, is_game_mode=False)
+                while not eng.battle_over:
+                    eng.step()
+
+    t_engine = timed(engine, repeat=1)
+    print(f"BattleEngine:        {fights / t_engine:12,.0f} harc/s")
+    t_py = timed(lambda: simulator.simulate_matrix(decks, dungeons, use_numpy=False))
+    print(f"simulator (python):  {fights / t_py:12,.0f} harc/s  ({t_engine / t_py:.1f}x)")
+    if simulator.np is not None:
+        t_np = timed(lambda: simulator.simulate_matrix(decks, dungeons, use_numpy=True))
+        print(f"simulator (numpy):   {fights / t_np:12,.0f} harc/s  ({t_engine / t_np:.1f}x)")
+    else:
+        print("simulator (numpy):   nincs NumPy (requirements-optional.txt); vele kb. 30x")
+
+
+def bench_damage():
+    rng = random.Random(7)
+    cards = [random_card(rng, f"C{i}") for i in range(64)]
+    pairs = [(rng.choice(cards), rng.choice(cards)) for _ in range(100_000)]
+    assert all(legacy_damage(a, d) == base_damage(a, d) for a, d in pairs[:1000])
+
+    t_legacy = timed(lambda: [legacy_damage(a, d) for a, d in pairs])
+    t_table = timed(lambda: [base_damage(a, d) for a, d in pairs])
+    n = len(pairs)
+    print(f"replace-lanc + dict:   {t_legacy / n * 1e9:8.0f} ns/tamadas")
+    print(f"TYPE_MODIFIERS tabla:  {t_table / n * 1e9:8.0f} ns/tamadas  ({t_legacy / t_table:.1f}x)")
+
+    # Teljes támadás lépés: a régi út minden támadásnál számol, a BattleEngine lappáronként egyszer
+    decks = random_decks(rng, 40, 5)
+    dungeons = random_dungeons(rng, 40, 5)
+
+    def attacks(engine_cls):
+        dmgs = []
+        log = lambda action, turn, owner, c, t, d: action == "attack" and dmgs.append(d)
+        for deck in decks:
+            for d in dungeons:
+                eng = engine_cls(deck, d, 0, log, is_game_mode=False)
+                while not eng.battle_over:
+                    eng.step()
+        return dmgs
+
+    def step_time(engine_cls):
+        best = None
+        for _ in range(3):
+            engines = [engine_cls(deck, d, 0, lambda *a: None, is_game_mode=False) for deck in decks for d in dungeons]
+            t0 = time.perf_counter()
+            for eng in engines:
+                while not eng.battle_over:
+                    eng.step()
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        return best
+
+    legacy_attacks = attacks(LegacyBattleEngine)
+    assert legacy_attacks == attacks(BattleEngine)
+    n = len(legacy_attacks)
+    t_old_step = step_time(LegacyBattleEngine)
+    t_new_step = step_time(BattleEngine)
+    print(f"lepes (regi):          {t_old_step / n * 1e9:8.0f} ns/tamadas")
+    print(f"lepes (BattleEngine):  {t_new_step / n * 1e9:8.0f} ns/tamadas  ({t_old_step / t_new_step:.1f}x)")
+
+
+def bench_cards():
+    rng = random.Random(3)
+    tracemalloc.start()
+    world = [random_card(rng, f"W{i}") for i in range(100_000)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"100k Card:            {size / len(world):8.0f} bajt/lap")
+
+    cards = world[:1000]
+    n = len(cards)
+    t_copy = timed(lambda: [Card(c.name, c.base_dmg, c.max_hp, c.original_type_str) for c in cards])
+    t_view = timed(lambda: [BattleCard(c) for c in cards])
+    print(f"harci masolat (Card): {t_copy / n * 1e9:8.0f} ns/lap")
+    print(f"BattleCard nezet:     {t_view / n * 1e9:8.0f} ns/lap  ({t_copy / t_view:.1f}x)")
+
+
+def bench_output():
+    rng = random.Random(11)
+    texts = ["\n".join(f"{t}.kor; enemy;tamad; K{rng.randint(0, 99)}; 3; K{t}; {t}" for t in range(30))
+             for _ in range(5000)]
+    n = len(texts)
+    tmp = tempfile.mkdtemp()
+    try:
+        # Minden futás új mappába ír, hogy a fájllétrehozás költsége is benne legyen
+        def per_file():
+            target = tempfile.mkdtemp(dir=tmp)
+            for i, text in enumerate(texts):
+                with open(os.path.join(target, f"out{i}.txt"), 'w', encoding='utf-8') as f:
+                    f.write(text)
+
+        def directory(background=False):
+            out = DirectoryOutput(tempfile.mkdtemp(dir=tmp), background=background)
+            for i, text in enumerate(texts):
+                out.write(f"out{i}.txt", text)
+            out.close()
+
+        def archive():
+            out = ArchiveOutput(os.path.join(tempfile.mkdtemp(dir=tmp), "all.out"))
+            for i, text in enumerate(texts):
+                out.write(f"out{i}.txt", text)
+            out.close()
+
+        t_file = timed(per_file)
+        t_dir = timed(directory)
+        t_bg = timed(lambda: directory(background=True))
+        t_arch = timed(archive)
+        print(f"fajlonkent open/write: {t_file / n * 1e6:8.1f} us/kimenet")
+        print(f"DirectoryOutput:       {t_dir / n * 1e6:8.1f} us/kimenet  ({t_file / t_dir:.1f}x)")
+        print(f"  + hatter szal:       {t_bg / n * 1e6:8.1f} us/kimenet  ({t_file / t_bg:.1f}x)")
+        print(f"ArchiveOutput:         {t_arch / n * 1e6:8.1f} us/kimenet  ({t_file / t_arch:.1f}x)")
+    finally:
+        shutil.rmtree(tmp)
+
+
+def random_world(rng, n_cards, n_dungeons, dungeon_size, collection_size, deck_size):
+    game = GameState()
+    for i in range(n_cards):
+        game.add_world_card(random_card(rng, f"W{i}"))
+    cards = list(game.world_cards.values())
+    for i in range(n_dungeons):
+        game.dungeons.append(Dungeon(rng.choice(["egyszeru", "kis", "nagy"]), f"D{i}",
+                                     rng.sample(cards, dungeon_size), rng.choice(cards),
+                                     rng.choice(["sebzes", "eletero", None])))
+    for c in rng.sample(cards, collection_size):
+        game.add_to_collection(c)
+    game.player_deck = game.player_collection[:deck_size]
+    return game
+
+
+def bench_save():
+    game = random_world(random.Random(5), 100_000, 2_000, 10, 50_000, 20)
+    tmp = tempfile.mkdtemp()
+    try:
+        for label, name in (("JSON", "world.json"), ("binaris", "world.dwb")):
+            path = os.path.join(tmp, name)
+            t_save = timed(lambda: game.save_to_file(path), repeat=1)
+            t_load = timed(lambda: GameState().load_from_file(path), repeat=1)
+            size = os.path.getsize(path)
+            print(f"{label:8s} mentes {t_save:6.2f} s, betoltes {t_load:6.2f} s, {size / 1e6:7.1f} MB")
+    finally:
+        shutil.rmtree(tmp)
+
+
+def bench_autosave():
+    game = random_world(random.Random(5), 100_000, 2_000, 10, 50_000, 20)
+    rng = random.Random(6)
+    cards = list(game.world_cards.values())
+    tmp = tempfile.mkdtemp()
+    try:
+        for label, name in (("JSON", "world.json"), ("binaris", "world.dwb")):
+            path = os.path.join(tmp, name)
+            game.save_incremental(path)
+
+            # Egy harc utáni állapot: egyetlen lap fejlődött
+            def full():
+                game.upgrade_card(rng.choice(cards), "sebzes")
+                game.save_to_file(path)
+
+            def incremental():
+                game.upgrade_card(rng.choice(cards), "sebzes")
+                game.save_incremental(path)
+
+            t_full = timed(full, repeat=1)
+            t_inc = timed(incremental, repeat=20)
+            game._journal.wait()
+            t_load = timed(lambda: GameState().load_from_file(path), repeat=1)
+            print(f"{label:8s} teljes {t_full * 1e3:8.1f} ms, naplozo {t_inc * 1e3:6.3f} ms  ({t_full / t_inc:,.0f}x),"
+                  f" betoltes naploval {t_load:5.2f} s")
+    finally:
+        shutil.rmtree(tmp)
+
+
+def bench_startup():
+    here = os.path.dirname(os.path.abspath(__file__))
+    tmp = tempfile.mkdtemp()
+    try:
+        shutil.copy(os.path.join(here, "tesztek", "in.txt"), tmp)
+        cases = [
+            ("import damareen", ["-c", "import damareen"]),
+            ("teszt mod", [os.path.join(here, "damareen.py"), tmp]),
+            # A --ui ág ugyanezt tölti be a Tk ablak előtt
+            ("import gui (Tk)", ["-c", "import gui"]),
+        ]
+        # Bájtkóddal mérünk (az első futás megírja a .pyc-ket), ahogy egy telepített gépen futna
+        env = dict(os.environ)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        base = timed(lambda: subprocess.run([sys.executable, "-c", "pass"], check=True, env=env), repeat=5)
+        print(f"{'ures interpreter':16s} {base * 1e3:7.1f} ms")
+        for label, args in cases:
+            try:
+                t = timed(lambda: subprocess.run([sys.executable] + args, cwd=here, check=True, env=env,
+                                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL), repeat=5)
+            except subprocess.CalledProcessError:
+                print(f"{label:16s} nem futtathato (nincs tkinter?)")
+                continue
+            print(f"{label:16s} {t * 1e3:7.1f} ms  (+{(t - base) * 1e3:.1f} ms)")
+        loaded = subprocess.run([sys.executable, "-c", "import sys, damareen; print('tkinter' in sys.modules)"],
+                                cwd=here, capture_output=True, text=True).stdout.strip()
+        print(f"tkinter betoltve teszt modban: {loaded}")
+    finally:
+        shutil.rmtree(tmp)
+
+
+def bench_optimizer():
+    rng = random.Random(8)
+    for n_cards in (10, 30, 60):
+        collection = [random_card(rng, f"C{i}") for i in range(n_cards)]
+        dungeons = random_dungeons(rng, 4, 8)
+        t = timed(lambda: optimizer.optimize_decks(collection, dungeons), repeat=1)
+        best = optimizer.optimize_decks(collection, dungeons, top_k=1)
+        wins = sum(1 for res in best if res and res[0].wins)
+        print(f"{n_cards:3d} lap, pakli <= {optimizer.default_deck_size(collection):2d}: "
+              f"{t / len(dungeons) * 1e3:8.1f} ms/kazamata, nyerheto {wins}/{len(dungeons)}")
+
+
+def bench_duel():
+    rng = random.Random(12)
+    decks = [[Card(f"P{i}_{k}", rng.randint(2, 6), rng.randint(20, 200), rng.choice(TYPES)) for k in range(5)]
+             for i in range(30)]
+    dungeons = [Dungeon("kis", f"D{i}", [Card(f"E{i}_{k}", rng.randint(2, 6), rng.randint(20, 200), rng.choice(TYPES))
+                                         for k in range(5)], None, "sebzes") for i in range(30)]
+    fights = len(decks) * len(dungeons)
+
+    def log(action, turn, owner, c, t, d):
+        if action == "attack":
+            return f"{turn}.kor; {owner};tamad; {c.name}; {d}; {t.name}; {max(0, t.current_hp)}"
+
+    def stepwise():
+        for deck in decks:
+            for d in dungeons:
+                eng = BattleEngine(deck, d, 0, log)
+                while not eng.battle_over:
+                    eng.step()
+
+    def logged():
+        for deck in decks:
+            for d in dungeons:
+                BattleEngine(deck, d, 0, log).run()
+
+    cache = DuelCache()
+
+    def fast_forward():
+        for deck in decks:
+            for d in dungeons:
+                eng = BattleEngine(deck, d, 0, None)
+                eng.duel_cache = cache
+                eng.run()
+
+    t_step = timed(stepwise, repeat=1)
+    t_log = timed(logged)
+    t_cold = timed(fast_forward, repeat=1)
+    t_warm = timed(fast_forward)
+    print(f"step():                           {fights / t_step:10,.0f} harc/s")
+    print(f"run(), naplo (tabla nelkul):      {fights / t_log:10,.0f} harc/s  ({t_step / t_log:.1f}x)")
+    print(f"run(), naplo nelkul, ures tabla:  {fights / t_cold:10,.0f} harc/s  ({t_step / t_cold:.1f}x)")
+    print(f"run(), naplo nelkul, meleg tabla: {fights / t_warm:10,.0f} harc/s  ({t_step / t_warm:.1f}x)")
+    print(f"tabla: {len(cache)} parharc, {cache.hits} talalat, {cache.misses} hiany")
+
+
+def bench_montecarlo():
+    rng = random.Random(13)
+    # Kiegyenlített párosítás kell, különben a becslés 0 vagy 1 körül triviális
+    candidates = [(random_decks(rng, 1, 6)[0], random_dungeons(rng, 1, 5)[0]) for _ in range(50)]
+    deck, dungeon = min(candidates, key=lambda c: abs(montecarlo.estimate_win_probability(
+        *c, 5, seed=0, tolerance=0.05).probability - 0.5))
+    backends = [("python", False)] + ([("numpy", True)] if montecarlo.np is not None else [])
+    for label, use_numpy in backends:
+        est = None
+
+        def run():
+            nonlocal est
+            est = montecarlo.estimate_win_probability(deck, dungeon, 5, seed=1, max_fights=20_000, tolerance=0,
+                                                      use_numpy=use_numpy)
+
+        t = timed(run, repeat=1)
+        print(f"{label:7s} {est.fights / t:10,.0f} harc/s   {est}")
+    for tol in (0.05, 0.02, 0.01):
+        est = montecarlo.estimate_win_probability(deck, dungeon, 5, seed=1, tolerance=tol)
+        print(f"korai leallas, tolerancia {tol:.2f}: {est.fights:6d} harc, +-{est.half_width:.3f}")
+
+
+def bench_rng():
+    n = 1_000_000
+    stream = RngStream(1)
+    draws = RngStream(1).draws()
+    t_global = timed(lambda: [random.random() for _ in range(n)])
+    t_stream = timed(lambda: [stream.random() for _ in range(n)])
+    t_draws = timed(lambda: [next(draws) for _ in range(n)])
+    t_batch = timed(lambda: RngStream(1).batch(n))
+    print(f"random.random():     {t_global / n * 1e9:6.0f} ns/huzas")
+    print(f"RngStream.random():  {t_stream / n * 1e9:6.0f} ns/huzas")
+    print(f"RngStream.draws():   {t_draws / n * 1e9:6.0f} ns/huzas")
+    print(f"RngStream.batch(n):  {t_batch / n * 1e9:6.0f} ns/huzas")
+
+
+def bench_replay():
+    # Hosszú harc nagy paklikkal: sok lap, sok életerő, kis sebzés (legalább 2, hogy gyengeségnél se legyen 0)
+    rng = random.Random(16)
+    deck = [Card(f"P{k}", rng.randint(2, 4), rng.randint(50, 200), rng.choice(TYPES)) for k in range(500)]
+    dungeon = Dungeon("kis", "D", [Card(f"E{k}", rng.randint(2, 4), rng.randint(50, 200), rng.choice(TYPES))
+                                   for k in range(500)], None, "sebzes")
+    lines = []
+    eng = BattleEngine(deck, dungeon, 0, lambda *e: lines.append(format_event(*e)))
+    eng.run()
+    text_size = sum(len(l.encode('utf-8')) + 1 for l in lines)
+
+    def record():
+        eng = BattleEngine(deck, dungeon, 0, None)
+        rec = ReplayRecorder(eng)
+        eng.run()
+        return rec.finish()
+
+    t_plain = timed(lambda: BattleEngine(deck, dungeon, 0, lambda *e: None).run())
+    t_record = timed(record)
+    rep = Replay.from_bytes(record().to_bytes())
+    data_size = len(rep.to_bytes())
+    print(f"harc: {rep.event_count:,} esemeny, {rep.final_turn:,} kor")
+    print(f"szoveges naplo:      {text_size / 1024:8.0f} KiB")
+    print(f"visszajatszas:       {data_size / 1024:8.0f} KiB  ({text_size / data_size:.1f}x kisebb)")
+    print(f"felvetel:            {t_record * 1000:8.1f} ms  (naplozott run(): {t_plain * 1000:.1f} ms)")
+
+    turns = [rng.randint(1, rep.final_turn) for _ in range(1000)]
+    t_seek = timed(lambda: [rep.seek(t) for t in turns])
+
+    def rerun(turn):
+        eng = BattleEngine(deck, dungeon, 0, None)
+        while eng.turn < turn and not eng.battle_over:
+            eng.step()
+
+    t_rerun = timed(lambda: [rerun(t) for t in turns[:20]], repeat=1) / 20 * len(turns)
+    print(f"seek:                {t_seek / len(turns) * 1e6:8.1f} us/ugras  "
+          f"(ujrafuttatas step()-pel: {t_rerun / len(turns) * 1e6:,.0f} us, {t_rerun / t_seek:,.0f}x)")
+
+
+def legacy_label(c):
+    icon = "🔥" if c.type == "tuz" else "💧" if c.type == "viz" else "🌿" if c.type == "fold" else "💨"
+    return f"{icon} {c.name} ({c.base_dmg}/{c.max_hp})"
+
+
+def bench_hub():
+    # A régi refresh_lists minden dupla klikknél minden sort újraformázott; a modell csak a látható 30-at
+    rng = random.Random(18)
+    collection = [random_card(rng, f"Lap{i}") for i in range(50_000)]
+    deck = collection[:25_000]
+    visible = 30
+    t_build = timed(lambda: CardListModel(collection, "nev"))
+    t_legacy = timed(lambda: ([legacy_label(c) for c in collection], [legacy_label(c) for c in deck]))
+    model = CardListModel(deck)
+
+    def click():
+        model.insert(collection[rng.randrange(len(collection))])
+        model.delete(rng.randrange(len(model)))
+        [legacy_label(c) for c in model.cards(0, visible)]
+
+    t_click = timed(lambda: [click() for _ in range(100)]) / 100
+    coll = CardListModel(collection, "sebzes")
+    t_filter = timed(lambda: coll.set_filter(CardFilter("lap1", "tuz", 4, 0)))
+    print(f"index epites (50k):   {t_build * 1e3:8.1f} ms")
+    print(f"regi frissites:       {t_legacy * 1e3:8.1f} ms/klikk  (csak formazas, Tk beszuras nelkul)")
+    print(f"diff + lathato sorok: {t_click * 1e6:8.1f} us/klikk  ({t_legacy / t_click:,.0f}x)")
+    print(f"szures (50k):         {t_filter * 1e3:8.1f} ms  ({len(coll):,} talalat)")
+
+
+def bench_minigame():
+    # Rögzített seed: a nehézségi görbe változtatása után ugyanazok a menetek futnak
+    t0 = time.perf_counter()
+    for summary in minigame.run_bots(list(minigame.BOTS), 500, seed=20, jobs=os.cpu_count() or 1):
+        print(summary)
+    print(f"{len(minigame.BOTS) * 500} menet: {time.perf_counter() - t0:.1f} s")
+
+
+def bench_profiles():
+    rng = random.Random(12)
+    tracemalloc.start()
+    game = random_world(rng, 100_000, 2_000, 10, 0, 0)
+    world_size, _ = tracemalloc.get_traced_memory()
+    world = SharedWorld.from_game(game)
+    del game
+    cards = list(world.world_cards.values())
+
+    # Játékosonként 200 lap (a teszt mód felvételéhez hasonlóan másolatként adva), 20-as pakli, 10 jutalom
+    before, _ = tracemalloc.get_traced_memory()
+    profiles = []
+    for _ in range(2_000):
+        p = PlayerProfile(world)
+        for c in rng.sample(cards, 200):
+            p.add_to_collection(Card(c.name, c.base_dmg, c.max_hp, c.original_type_str))
+        p.set_deck_by_names([c.name for c in p.player_collection[:20]])
+        for c in rng.sample(p.player_collection[:20], 10):
+            p.upgrade_card(p.find_in_collection(c.name), rng.choice(["sebzes", "eletero"]))
+        profiles.append(p)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_profile = (size - before) / len(profiles)
+    print(f"vilag (100k lap, GameState): {world_size / 1e6:8.1f} MB  (jatekosonkenti masolat eseten ennyi/jatekos)")
+    print(f"profil (200 lap, 10 jutalom): {per_profile / 1e3:7.1f} kB/jatekos  ({world_size / per_profile:,.0f}x kisebb)")
+
+    # A jutalmazott lapok CardOverlay-en át olvasnak: a harc ára a sima Card paklihoz képest
+    dungeons = list(world.dungeons[:200])
+    deck = profiles[0].player_deck
+    plain = [Card(c.name, c.base_dmg, c.max_hp, c.original_type_str) for c in deck]
+
+    def battles(d):
+        return lambda: [BattleEngine(d, dg, 0, lambda *a: None).run() for dg in dungeons]
+
+    t_plain = timed(battles(plain))
+    t_profile = timed(battles(deck))
+    print(f"harc Card paklival:          {t_plain / len(dungeons) * 1e6:8.1f} us")
+    print(f"harc profil paklival:        {t_profile / len(dungeons) * 1e6:8.1f} us  ({t_profile / t_plain:.2f}x)")
+
+
+BENCHMARKS = {
+    "profiles": bench_profiles,
+    "minigame": bench_minigame,
+    "hub": bench_hub,
+    "replay": bench_replay,
+    "rng": bench_rng,
+    "montecarlo": bench_montecarlo,
+    "duel": bench_duel,
+    "optimizer": bench_optimizer,
+    "startup": bench_startup,
+    "save": bench_save,
+    "autosave": bench_autosave,
+    "output": bench_output,
+    "cards": bench_cards,
+    "damage": bench_damage,
+    "simulator": bench_simulator,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"Ismeretlen meres: {', '.join(unknown)} (elerhetok: {', '.join(BENCHMARKS)})")
+        sys.exit(2)
+    for name in names:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
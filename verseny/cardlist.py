@@ -0,0 +1,101 @@
+"""Rendezett, szurheto kartyalista modell a hub nagy (tizezres) gyujtemenyeihez.
+
+A modell egyszer kiszamolja minden lap rendezesi kulcsat es normalizalt
+nevet, es a lapokat (kulcs, sorszam) szerint rendezve tartja. A lathato
+sorok (rows) ennek a szurt reszsorozata. Egy lap beszurasa vagy torlese
+bisect-tel talalja meg a helyet, es a megvaltozott sor indexet adja vissza
+(diff), igy a nezetnek csak a kepernyon levo sorokat kell ujrarajzolnia.
+
+A "sorrend" rendezes a beszuras sorrendjet tartja (a pakli sorrendje a
+harcban szamit), szures nelkul igy a sor index = a pakli indexe.
+"""
+from bisect import bisect_left, insort
+
+from core import normalize_text
+
+SORT_KEYS = {
+    "sorrend": lambda c, name: (),
+    "nev": lambda c, name: (name,),
+    "tipus": lambda c, name: (c.type, name),
+    "sebzes": lambda c, name: (-c.base_dmg, name),
+    "eletero": lambda c, name: (-c.max_hp, name),
+}
+
+
+class CardFilter:
+    """Nev reszlet (ekezet- es kisbetu-fuggetlen), tipus es minimalis statok."""
+
+    def __init__(self, name="", type_name=None, min_dmg=0, min_hp=0):
+        self.name = normalize_text(name)
+        self.type_name = normalize_text(type_name) if type_name else None
+        self.min_dmg = min_dmg
+        self.min_hp = min_hp
+
+    def matches(self, card, norm_name):
+        return (self.name in norm_name
+                and (self.type_name is None or card.type == self.type_name)
+                and card.base_dmg >= self.min_dmg and card.max_hp >= self.min_hp)
+
+
+class CardListModel:
+    def __init__(self, cards=(), sort="sorrend", card_filter=None):
+        self.sort = sort
+        self.filter = card_filter or CardFilter()
+        self.reset(cards)
+
+    def reset(self, cards):
+        """Teljes ujraepites (pl. betoltes vagy pakli javaslat utan)."""
+        self._seq = 0
+        self._entries = sorted(self._entry(c) for c in cards)
+        self._refilter()
+
+    def _entry(self, card):
+        # A sorszám egyedi, így az összehasonlítás sosem jut el a laphoz
+        name = normalize_text(card.name)
+        entry = (SORT_KEYS[self.sort](card, name), self._seq, name, card)
+        self._seq += 1
+        return entry
+
+    def _refilter(self):
+        f = self.filter
+        self.rows = [e for e in self._entries if f.matches(e[3], e[2])]
+
+    def set_filter(self, card_filter):
+        self.filter = card_filter
+        self._refilter()
+
+    def set_sort(self, sort):
+        if sort == self.sort: return
+        self.sort = sort
+        key = SORT_KEYS[sort]
+        self._entries = sorted((key(e[3], e[2]),) + e[1:] for e in self._entries)
+        self._refilter()
+
+    # --- Diffek ---
+
+    def insert(self, card):
+        """Uj lap; a lathato sor indexe, vagy None, ha a szuro kiszuri."""
+        entry = self._entry(card)
+        insort(self._entries, entry)
+        if not self.filter.matches(card, entry[2]):
+            return None
+        row = bisect_left(self.rows, entry)
+        self.rows.insert(row, entry)
+        return row
+
+    def delete(self, row):
+        """A row. lathato sor torlese; a torolt sor indexe."""
+        entry = self.rows.pop(row)
+        del self._entries[bisect_left(self._entries, entry)]
+        return row
+
+    # --- Olvasás ---
+
+    def __len__(self):
+        return len(self.rows)
+
+    def card_at(self, row):
+        return self.rows[row][3]
+
+    def cards(self, start=0, stop=None):
+        return [e[3] for e in self.rows[start:stop]]
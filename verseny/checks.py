@@ -0,0 +1,426 @@
+"""Veletlenszeru tulajdonsag-ellenorzesek: a gyors utak a lepesenkenti BattleEngine ellen.
+
+Hasznalat: python checks.py [nev ...] [--n N] [--seed S]  (nev nelkul mindegyik lefut)
+Hiba eseten a kimenet a visszajatszhato esetet is kiirja, a kilepesi kod 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+
+from core import Card, Dungeon, BattleEngine, GameState, solve_duel, normalize_text
+from replay import Replay, ReplayRecorder, record_battle
+from cardlist import CardListModel, CardFilter, SORT_KEYS
+from minigame import SoapPool
+from profiling import Profiler
+import difftest
+import simulator
+from profiles import PlayerProfile
+from testmode import TestModeRunner, card_snapshot
+from output import MemoryOutput
+import core
+
+TYPES = ["tuz", "viz", "fold", "levego", "jeg"]
+
+
+def reference_duel(d_ep, d_pe, p_hp, p_max_hp, e_hp, player_next):
+    """A step() tamadasankenti logikaja egyetlen parharcra (a solve_duel referenciaja)."""
+    attacks = 0
+    while True:
+        attacks += 1
+        if player_next:
+            e_hp -= d_pe
+            if e_hp <= 0:
+                if p_hp > 0:
+                    p_hp = min(p_max_hp, p_hp + 1)
+                return attacks, p_hp, e_hp, False
+        else:
+            p_hp -= d_ep
+            if p_hp <= 0:
+                return attacks, p_hp, e_hp, True
+        if attacks == 2 and d_ep <= 0 and d_pe <= 0:
+            return None
+        player_next = not player_next
+
+
+def random_card(rng, name, max_hp=30):
+    # Negatív/nulla értékek is: a szélső esetek a legérdekesebbek
+    return Card(name, rng.randint(-1, 8), rng.randint(-1, max_hp), rng.choice(TYPES))
+
+
+def random_battle(rng):
+    deck = [random_card(rng, f"P{k}") for k in range(rng.randint(0, 6))]
+    enemies = [random_card(rng, f"E{k}") for k in range(rng.randint(0, 5))]
+    leader = random_card(rng, "L") if rng.random() < 0.5 else None
+    return deck, Dungeon("kis", "D", enemies, leader, "sebzes")
+
+
+def engine_state(eng):
+    return (eng.winner, eng.turn, eng.p_idx, eng.e_idx,
+            [c.current_hp for c in eng.player_deck], [c.current_hp for c in eng.enemy_deck])
+
+
+def stepwise(deck, dungeon, prefix_steps=0):
+    events = []
+
+    def log(action, turn, owner, c, t, d):
+        events.append((action, turn, owner, c.name, t and (t.name, t.current_hp), d))
+
+    eng = BattleEngine(deck, dungeon, 0, log)
+    for _ in range(prefix_steps):
+        eng.step()
+    # Elakadt harcnál a step() sosem áll meg: a korlát (jóval a leghosszabb véges harc felett) után None
+    for _ in range(10_000):
+        if eng.battle_over:
+            return events, engine_state(eng)
+        eng.step()
+    return None
+
+
+# --- ELLENŐRZÉSEK ---
+
+# Ékezetes és nagybetűs típusírások: az eredeti kód a típust kétszer normalizálta (a nagy 'Ő' csak így lesz 'o')
+TYPE_SPELLINGS = ["tuz", "TŰZ", "Tűz", "viz", "VÍZ", "fold", "FÖLD", "Föld", "levego", "LEVEGŐ", "Levegő",
+                  "levegő", " Levego ", "jeg"]
+
+# A kiinduló (baseline) kód kimenete: a LEVEGŐ lap duplán sebez a föld ellen, de jutalomként nem
+# érvényes típus (ott az egyszer normalizált "levegő" számít)
+LEVEGO_SCRIPT = ["uj kartya;A;4;10;LEVEGŐ", "uj kartya;B;4;10;fold", "uj kartya;E;1;1;LEVEGŐ",
+                 "uj kazamata;egyszeru;D;B;sebzes", "uj kazamata;nagy;N;B", "uj jatekos", "felvetel gyujtemenybe;A",
+                 "felvetel gyujtemenybe;B", "uj pakli;A", "harc;D;out.txt", "harc;N;out2.txt"]
+LEVEGO_EXPECTED = {"out.txt": "jatekos nyert; sebzes; A", "out2.txt": "jatekos nyert; nincs uj kartya"}
+
+
+def reference_damage(attacker, defender):
+    """Az eredeti calculate_damage tipusszabalya: a Card.type meg egyszer normalizalva, majd a ket szotar."""
+    atk_t, def_t = normalize_text(attacker.type), normalize_text(defender.type)
+    if core.STRONG_AGAINST.get(atk_t) == def_t:
+        return attacker.base_dmg * 2
+    if core.WEAK_AGAINST.get(atk_t) == def_t:
+        return attacker.base_dmg // 2
+    return attacker.base_dmg
+
+
+def check_type_spellings(rng, n):
+    """base_damage == az eredeti, ketszer normalizalo szabaly minden tipusirasra; a LEVEGŐ eset a teszt modban."""
+    failures = 0
+    cards = [Card(f"C{i}", rng.randint(0, 9), 10, t) for i, t in enumerate(TYPE_SPELLINGS)]
+    for _ in range(n):
+        a, d = rng.choice(cards), rng.choice(cards)
+        if core.base_damage(a, d) != reference_damage(a, d):
+            failures += 1
+            print(f"  base_damage({a.original_type_str!r} -> {d.original_type_str!r}): "
+                  f"{core.base_damage(a, d)} != {reference_damage(a, d)}")
+    runner = TestModeRunner(None, output=MemoryOutput())
+    for line in LEVEGO_SCRIPT:
+        runner.dispatch(line.split(';'))
+    runner.flush()
+    for name, expected in LEVEGO_EXPECTED.items():
+        last = runner.output.files[name].decode('utf-8').splitlines()[-1]
+        if last != expected:
+            failures += 1
+            print(f"  LEVEGŐ harc ({name}): {last!r} != {expected!r}")
+    return failures
+
+
+def check_duel(rng, n):
+    failures = 0
+    for _ in range(n):
+        # A referencia támadásonként lép, ezért a "nagy" hp is csak néhány ezer
+        hp_max = 5000 if rng.random() < 0.2 else 40
+        args = (rng.randint(-2, 12), rng.randint(-2, 12), rng.randint(-2, hp_max), rng.randint(-2, hp_max),
+                rng.randint(-2, hp_max), rng.random() < 0.5)
+        if solve_duel(*args) != reference_duel(*args):
+            failures += 1
+            print(f"  solve_duel{args}: {solve_duel(*args)} != {reference_duel(*args)}")
+    return failures
+
+
+def check_fast_forward(rng, n):
+    """run() naplo nelkul (zart alak) == step() vegallapota."""
+    failures = 0
+    for _ in range(n):
+        deck, dungeon = random_battle(rng)
+        prefix = rng.randint(0, 6)
+        ref = stepwise(deck, dungeon, prefix)
+        if ref is None: continue
+        eng = BattleEngine(deck, dungeon, 0, None)
+        for _ in range(prefix):
+            eng.step()
+        eng.run()
+        if engine_state(eng) != ref[1]:
+            failures += 1
+            print(f"  fast-forward: {engine_state(eng)} != {ref[1]}")
+    return failures
+
+
+def check_simulator(rng, n):
+    """simulator (Python es NumPy mag) == step() vegallapota; elakadt harcnal WINNER_NONE."""
+    winners = {"player": simulator.WINNER_PLAYER, "enemy": simulator.WINNER_ENEMY}
+    battles = [random_battle(rng) for _ in range(n)]
+    refs = [stepwise(deck, dungeon) for deck, dungeon in battles]
+    backends = [False] + ([True] if simulator.np is not None else [])
+    failures = 0
+    for use_numpy in backends:
+        res = simulator.simulate_pairs(battles, use_numpy=use_numpy)
+        for i, ref in enumerate(refs):
+            got = res.outcome(i)
+            ok = (got[0] == simulator.WINNER_NONE if ref is None
+                  else got == (winners[ref[1][0]],) + ref[1][1:])
+            if not ok:
+                failures += 1
+                print(f"  simulator (numpy={use_numpy}): {got} != {ref and ref[1]}")
+    return failures
+
+
+def check_replay(rng, n):
+    """run() naplóval: ugyanazok az esemenyek es vegallapot, mint step()-enkent."""
+    failures = 0
+    for _ in range(n):
+        deck, dungeon = random_battle(rng)
+        prefix = rng.randint(0, 6)
+        ref = stepwise(deck, dungeon, prefix)
+        if ref is None: continue
+        events = []
+
+        def log(action, turn, owner, c, t, d):
+            events.append((action, turn, owner, c.name, t and (t.name, t.current_hp), d))
+
+        eng = BattleEngine(deck, dungeon, 0, log)
+        for _ in range(prefix):
+            eng.step()
+        eng.run()
+        if (events, engine_state(eng)) != ref:
+            failures += 1
+            print(f"  replay: elteres a {len(events)} / {len(ref[0])} esemenyes harcban")
+    return failures
+
+
+def check_recording(rng, n):
+    """Rogzitett harc: a play() esemenyei es a seek() allapotai egyeznek a step()-enkenti motorral."""
+    failures = 0
+    for _ in range(n):
+        deck, dungeon = random_battle(rng)
+        ref = stepwise(deck, dungeon)
+        if ref is None: continue
+        _, rep = record_battle(deck, dungeon, snapshot_every=rng.randint(1, 8))
+        rep = Replay.from_bytes(rep.to_bytes())
+        events = []
+
+        def log(action, turn, owner, c, t, d):
+            events.append((action, turn, owner, c.name, t and (t.name, t.current_hp), d))
+
+        rep.play(log)
+        ok = events == ref[0] and (rep.winner, rep.final_turn) == ref[1][:2]
+        # Minden kör eleji állapot a motorból, a kör első eseménye előtt
+        eng = BattleEngine(deck, dungeon, 0, None)
+        for turn in range(1, rep.final_turn + 1):
+            while eng.turn < turn and not eng.battle_over:
+                eng.step()
+            state = rep.seek(turn)
+            if eng.turn != turn: continue
+            hps = ([rep.player_hp(state, i) for i in range(len(rep.players))],
+                   [rep.enemy_hp(state, i) for i in range(len(rep.enemies))])
+            if (state.p_idx, state.e_idx) != (eng.p_idx, eng.e_idx) or hps != tuple(engine_state(eng)[4:]):
+                ok = False
+        if not ok:
+            failures += 1
+            print(f"  recording: elteres a {len(ref[0])} esemenyes harcban")
+    return failures
+
+
+def check_recording_reward(rng, n):
+    """A harc utani jutalom nem valtoztatja a felvetel lapjait (a BattleCard az elo lapot olvassa)."""
+    failures = 0
+    game = GameState()
+    for _ in range(n):
+        deck, dungeon = random_battle(rng)
+        if stepwise(deck, dungeon) is None: continue
+        eng = BattleEngine(deck, dungeon, 0, None)
+        recorder = ReplayRecorder(eng)
+        eng.run()
+        before = card_snapshot(deck)
+        for card in deck:
+            game.upgrade_card(card, rng.choice(["sebzes", "eletero"]))
+        rep = Replay.from_bytes(recorder.finish().to_bytes())
+        if card_snapshot(rep.players) != before or rep._p_max != [s[2] for s in before]:
+            failures += 1
+            print(f"  jutalom: a felvetel lapjai {card_snapshot(rep.players)} != {before}")
+    return failures
+
+
+def check_cardlist(rng, n):
+    """Beszurasok/torlesek diffjei utan a lathato sorok == a teljes lista rendezve es szurve."""
+    names = ["Árny", "arnyek", "Tűz", "Kő", "Vihar", "Szél"]
+    failures = 0
+    for _ in range(n):
+        f = CardFilter(rng.choice(["", "ar", "Á", "z"]), rng.choice([None, "tuz", "viz"]),
+                       rng.randint(0, 4), rng.randint(0, 10))
+        sort = rng.choice(list(SORT_KEYS))
+        cards = [Card(rng.choice(names), rng.randint(0, 8), rng.randint(0, 30), rng.choice(TYPES))
+                 for _ in range(rng.randint(0, 8))]
+        model = CardListModel(cards, sort, f)
+        shown = model.cards()
+        for _ in range(rng.randint(0, 12)):
+            if shown and rng.random() < 0.4:
+                row = rng.randrange(len(shown))
+                cards.remove(shown[row])
+                del shown[model.delete(row)]
+            else:
+                c = Card(rng.choice(names), rng.randint(0, 8), rng.randint(0, 30), rng.choice(TYPES))
+                cards.append(c)
+                row = model.insert(c)
+                if row is not None: shown.insert(row, c)
+        # Referencia: stabil rendezés a beszúrási sorrend szerint, majd szűrés
+        key = SORT_KEYS[sort]
+        expected = [c for c in sorted(cards, key=lambda c: key(c, normalize_text(c.name)))
+                    if f.matches(c, normalize_text(c.name))]
+        if shown != expected or model.cards() != expected:
+            failures += 1
+            print(f"  cardlist ({sort}): {[c.name for c in model.cards()]} != {[c.name for c in expected]}")
+    return failures
+
+
+def check_soap_pool(rng, n):
+    """A racsoszlopos utkozes == minden aktiv szappan bbox-atfedese; a helyek nem vesznek el."""
+    failures = 0
+    for _ in range(n):
+        pool = SoapPool(800, rng.randint(10, 60), rng.randint(10, 40), capacity=rng.randint(1, 16),
+                        cell=rng.choice([16, 64, 200]))
+        for _ in range(rng.randint(1, 30)):
+            r = rng.random()
+            if r < 0.4:
+                pool.spawn(rng.uniform(30, 770), rng.uniform(-60, 600), rng.uniform(100, 400))
+            elif r < 0.6 and pool.active:
+                pool.remove(rng.choice(pool.active))
+            else:
+                pool.advance(rng.uniform(0, 0.1))
+            left, top = rng.uniform(-50, 800), rng.uniform(-50, 600)
+            box = (left, top, left + rng.uniform(0, 120), top + rng.uniform(0, 120))
+            hw, hh = pool.soap_w / 2, pool.soap_h / 2
+            expected = sorted(i for i in pool.active
+                              if not (box[2] < pool.x[i] - hw or box[0] > pool.x[i] + hw
+                                      or box[3] < pool.y[i] - hh or box[1] > pool.y[i] + hh))
+            if sorted(pool.colliding(*box)) != expected or len(pool.active) + len(pool.free) != pool.capacity:
+                failures += 1
+                print(f"  soap_pool: {sorted(pool.colliding(*box))} != {expected}")
+                break
+    return failures
+
+
+def check_profiler(rng, n):
+    """Meres alatt ugyanaz a harc; uninstall() utan az eredeti fuggvenyek es metodusok allnak vissza."""
+    before = (dict(vars(BattleEngine)), dict(vars(Card)), core.base_damage)
+    prof = Profiler()
+    prof.install()
+    failures = 0
+    try:
+        for _ in range(n):
+            deck, dungeon = random_battle(rng)
+            ref = stepwise(deck, dungeon)
+            if ref is None: continue
+            events = []
+
+            def log(action, turn, owner, c, t, d):
+                events.append((action, turn, owner, c.name, t and (t.name, t.current_hp), d))
+
+            eng = BattleEngine(deck, dungeon, 0, log)
+            eng.run()
+            if (events, engine_state(eng)) != ref:
+                failures += 1
+                print(f"  profiler: elteres a {len(ref[0])} esemenyes harcban")
+    finally:
+        prof.uninstall()
+    if prof._stack or (dict(vars(BattleEngine)), dict(vars(Card)), core.base_damage) != before:
+        failures += 1
+        print("  profiler: a verem nem ures vagy az eredeti metodusok nem alltak vissza")
+    return failures
+
+
+def check_differential(rng, n):
+    """A teszt mod gyors utjainak kimenete bajtra == a referencia (lasd difftest.py)."""
+    failures = 0
+    # Egy eset egy egész parancsfájl minden változaton, ezért n/10 eset
+    for _ in range(max(1, n // 10)):
+        lines = difftest.random_script(rng)
+        for name, diff in difftest.check_case(lines, list(difftest.VARIANTS)).items():
+            failures += 1
+            print(f"  {name}: {diff}")
+    return failures
+
+
+def check_invalid_utf8(rng, n):
+    """Hibas UTF-8 sor eseten egyetlen parancs sem fut (mint az eredeti readlines()), barhol a fajlban."""
+    failures = 0
+    for _ in range(max(1, n // 10)):
+        lines = [line.encode('utf-8') for line in difftest.random_script(rng)]
+        lines.insert(rng.randint(0, len(lines)), b"uj kartya;\xff\xfe;1;1;tuz")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "in.txt")
+            with open(path, 'wb') as f:
+                f.write(b"\n".join(lines))
+            runner = TestModeRunner(tmp, output=MemoryOutput())
+            # A várt hibaüzenet nem kerül a kimenetre, csak ellenőrizzük
+            with contextlib.redirect_stdout(io.StringIO()) as err:
+                runner.run(path)
+            runner.close()
+        if runner.output.files or runner.offset or "Hiba a fajl olvasasakor" not in err.getvalue():
+            failures += 1
+            print(f"  hibas UTF-8: {sorted(runner.output.files)} kimenet, offset {runner.offset}")
+    return failures
+
+
+def check_profiles(rng, n):
+    """Profil: JSON mentes/betoltes es GameState oda-vissza utan ugyanaz a gyujtemeny es pakli."""
+    def stats(cards):
+        return [(c.name, c.base_dmg, c.max_hp, c.original_type_str) for c in cards]
+
+    failures = 0
+    for _ in range(max(1, n // 10)):
+        profile = difftest.profile_runner(difftest.random_script(rng)).game
+        world = profile.world
+        restored = PlayerProfile.from_dict(world, json.loads(json.dumps(profile.to_dict())))
+        back = PlayerProfile.from_game(world, profile.to_game_state())
+        # Mentésnél a pakli név szerint kötődik újra (új játékos után a régi lapok statja elveszhet)
+        ok = (stats(restored.player_collection) == stats(profile.player_collection)
+              and [c.name for c in restored.player_deck] == [c.name for c in profile.player_deck]
+              and (stats(back.player_collection), stats(back.player_deck))
+              == (stats(profile.player_collection), stats(profile.player_deck)))
+        if not ok:
+            failures += 1
+            print(f"  profiles: {stats(profile.player_collection)} / {stats(profile.player_deck)}")
+    return failures
+
+
+CHECKS = {
+    "type_spellings": check_type_spellings,
+    "duel": check_duel,
+    "fast_forward": check_fast_forward,
+    "simulator": check_simulator,
+    "replay": check_replay,
+    "recording": check_recording,
+    "recording_reward": check_recording_reward,
+    "cardlist": check_cardlist,
+    "soap_pool": check_soap_pool,
+    "profiler": check_profiler,
+    "differential": check_differential,
+    "profiles": check_profiles,
+    "invalid_utf8": check_invalid_utf8,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="checks")
+    parser.add_argument("names", nargs="*", help="ellenorzesek (alapertelmezetten mind)")
+    parser.add_argument("--n", type=int, default=2000, help="esetek szama ellenorzesenkent")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    total = 0
+    for name in args.names or list(CHECKS):
+        failures = CHECKS[name](random.Random(args.seed), args.n)
+        print(f"{name}: {'OK' if not failures else f'{failures} HIBA'}")
+        total += failures
+    sys.exit(1 if total else 0)
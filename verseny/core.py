@@ -0,0 +1,711 @@
+import sys
+import os
+import math
+import json
+from collections import OrderedDict
+from savefmt import BINARY_EXTENSION, WorldReader, is_binary_save, write_world
+from journal import Journal
+from rngstream import RngStream
+
+# --- KONFIGURÁCIÓ ÉS GLOBÁLIS VÁLTOZÓK ---
+DEFAULT_WORLD_FILE = "world_save.json"
+
+# Típusok erősorrendje
+STRONG_AGAINST = {
+    "levego": "fold",
+    "fold": "tuz",
+    "tuz": "viz",
+    "viz": "levego"
+}
+WEAK_AGAINST = {
+    "levego": "tuz",
+    "tuz": "levego",
+    "fold": "viz",
+    "viz": "fold"
+}
+
+# Típus azonosítók a sebzésszámításhoz; minden más típus az UNKNOWN_TYPE_ID-t kapja
+TYPE_IDS = {"tuz": 0, "viz": 1, "fold": 2, "levego": 3}
+UNKNOWN_TYPE_ID = len(TYPE_IDS)
+
+# TYPE_MODIFIERS[támadó][védekező]; az ismeretlen típus sora/oszlopa semleges
+TYPE_MODIFIERS = [[1.0] * (UNKNOWN_TYPE_ID + 1) for _ in range(UNKNOWN_TYPE_ID + 1)]
+for _atk, _atk_id in TYPE_IDS.items():
+    if STRONG_AGAINST.get(_atk) in TYPE_IDS:
+        TYPE_MODIFIERS[_atk_id][TYPE_IDS[STRONG_AGAINST[_atk]]] = 2.0
+    if WEAK_AGAINST.get(_atk) in TYPE_IDS:
+        TYPE_MODIFIERS[_atk_id][TYPE_IDS[WEAK_AGAINST[_atk]]] = 0.5
+
+# Egyetlen translate() hívás a karakterenkénti replace() lánc helyett (a hub keresője minden lapra hívja)
+_ACCENT_TABLE = str.maketrans({
+    'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ö': 'o', 'ő': 'o',
+    'ú': 'u', 'ü': 'u', 'ű': 'u', 'Á': 'A', 'É': 'E', 'Í': 'I',
+    'Ó': 'O', 'Ö': 'O', 'Ú': 'U', 'Ü': 'U', 'Ű': 'U'
+})
+
+
+def normalize_text(text):
+    """Ekezetek eltavolitasa es kisbetusites."""
+    return text.translate(_ACCENT_TABLE).lower().strip()
+
+
+_TYPE_CACHE = {}
+
+
+def normalize_type(type_name):
+    """normalize_text tipusnevekre, gyorsitotarral (keves kulonbozo tipus van, de sok lap)."""
+    t = _TYPE_CACHE.get(type_name)
+    if t is None:
+        t = _TYPE_CACHE[type_name] = sys.intern(normalize_text(type_name))
+    return t
+
+
+def base_damage(attacker, defender):
+    """Tipusmodositoval szamolt sebzes, nehezseg nelkul."""
+    return math.floor(attacker.base_dmg * TYPE_MODIFIERS[attacker.type_id][defender.type_id])
+
+
+# --- ADATMODELL OSZTÁLYOK ---
+
+class Card:
+    # Nagy világokban (100k+ lap) a példányonkénti __dict__ dominálná a memóriát
+    __slots__ = ("name", "base_dmg", "max_hp", "current_hp", "type", "type_id", "original_type_str")
+
+    def __init__(self, name, dmg, hp, type_name):
+        self.name = name
+        self.base_dmg = int(dmg)
+        self.max_hp = int(hp)
+        self.current_hp = int(hp)
+        self.type = normalize_type(type_name)
+        # Mint az eredeti sebzésszámításban: a típus a harchoz még egyszer normalizálódik. A tábla
+        # a kis 'ő'-t ismeri, a nagy 'Ő'-t nem, így pl. "LEVEGŐ" csak a második lépésben lesz "levego".
+        self.type_id = TYPE_IDS.get(normalize_type(self.type), UNKNOWN_TYPE_ID)
+        self.original_type_str = sys.intern(type_name)
+
+    def to_dict(self):
+        return {
+            "name": self.name, "dmg": self.base_dmg,
+            "hp": self.max_hp, "type": self.original_type_str
+        }
+
+    @staticmethod
+    def from_dict(data):
+        return Card(data["name"], data["dmg"], data["hp"], data["type"])
+
+    def __str__(self):
+        return f"[{self.original_type_str.upper()}] {self.name} (DMG: {self.base_dmg} | HP: {self.max_hp})"
+
+
+class BattleCard:
+    """Harci peldany: a statokat a forras kartyarol olvassa, csak a HP sajat (copy-on-write)."""
+    __slots__ = ("card", "current_hp")
+
+    def __init__(self, card):
+        self.card = card
+        self.current_hp = card.max_hp
+
+    name = property(lambda self: self.card.name)
+    base_dmg = property(lambda self: self.card.base_dmg)
+    max_hp = property(lambda self: self.card.max_hp)
+    type = property(lambda self: self.card.type)
+    type_id = property(lambda self: self.card.type_id)
+    original_type_str = property(lambda self: self.card.original_type_str)
+
+    def to_dict(self):
+        return self.card.to_dict()
+
+    def __str__(self):
+        return str(self.card)
+
+
+class Dungeon:
+    def __init__(self, type_id, name, cards, leader=None, reward_type=None):
+        self.type_id = type_id
+        self.name = name
+        self.cards = cards
+        self.leader = leader
+        self.reward_type = reward_type
+
+    def get_full_enemy_list(self):
+        enemies = [BattleCard(c) for c in self.cards]
+        if self.leader:
+            enemies.append(BattleCard(self.leader))
+        return enemies
+
+    def to_dict(self):
+        return {
+            "type_id": self.type_id, "name": self.name,
+            "cards": [c.name for c in self.cards],
+            "leader": self.leader.name if self.leader else None,
+            "reward_type": self.reward_type
+        }
+
+
+class GameState:
+    def __init__(self):
+        self.world_cards = {}
+        self.dungeons = []
+        self.player_collection = []
+        self.player_deck = []
+        self.difficulty = 0
+
+        # Indexek: név -> első ilyen nevű gyűjteménybeli lap, és a világ lapjainak sorrendje.
+        # A _unowned_cursor előtti világlapok mind megvannak vagy érvénytelen típusúak.
+        self._collection_by_name = {}
+        self._world_order = []
+        self._world_pos = {}
+        self._unowned_cursor = 0
+
+        # Változáskövetés a naplózó mentéshez (save_incremental): mi változott a legutóbbi mentés óta
+        self._journal = None
+        self._dirty_cards = set()
+        self._saved_dungeons = 0
+        self._saved_collection = 0
+        self._collection_reset = False
+        self._saved_deck = ()
+        self._saved_difficulty = None
+
+    # --- INDEXELT MŰVELETEK ---
+
+    def rebuild_indexes(self):
+        """Indexek ujraepitese a world_cards / player_collection kozvetlen csereje utan."""
+        self._world_order = list(self.world_cards)
+        self._world_pos = {name: i for i, name in enumerate(self._world_order)}
+        self._collection_by_name = {}
+        for c in self.player_collection:
+            self._collection_by_name.setdefault(c.name, c)
+        self._unowned_cursor = 0
+
+    def add_world_card(self, card):
+        pos = self._world_pos.get(card.name)
+        if pos is None:
+            self._world_pos[card.name] = len(self._world_order)
+            self._world_order.append(card.name)
+        elif pos < self._unowned_cursor:
+            # Felülírt lap: új típussal újra jutalom lehet
+            self._unowned_cursor = pos
+        self.world_cards[card.name] = card
+        self._dirty_cards.add(card.name)
+
+    def add_to_collection(self, card):
+        self.player_collection.append(card)
+        self._collection_by_name.setdefault(card.name, card)
+
+    def reset_collection(self):
+        self.player_collection = []
+        self._collection_by_name = {}
+        self._unowned_cursor = 0
+        self._collection_reset = True
+
+    def upgrade_card(self, card, reward_type):
+        """Sebzes/eletero jutalom egy lapra; a vilaglapok valtozasat a mentes szamara jegyezzuk."""
+        if reward_type == "sebzes":
+            card.base_dmg += 1
+        elif reward_type == "eletero":
+            card.max_hp += 2
+            card.current_hp = card.max_hp
+        else:
+            return
+        if self.world_cards.get(card.name) is card:
+            self._dirty_cards.add(card.name)
+
+    def find_in_collection(self, name):
+        return self._collection_by_name.get(name)
+
+    def set_deck_by_names(self, names):
+        self.player_deck = [self._collection_by_name[n] for n in names if n in self._collection_by_name]
+
+    def first_unowned_card(self):
+        """Az elso olyan ervenyes tipusu vilaglap, ami meg nincs a gyujtemenyben."""
+        order = self._world_order
+        while self._unowned_cursor < len(order):
+            c = self.world_cards[order[self._unowned_cursor]]
+            # Az eredetivel egyezően az egyszer normalizált típus dönt (a "levegő" itt nem érvényes)
+            if c.type in TYPE_IDS and c.name not in self._collection_by_name:
+                return c
+            self._unowned_cursor += 1
+        return None
+
+    def save_to_file(self, filename, binary=None):
+        """Mentes JSON-ba, vagy binarisan (alapertelmezetten a .dwb kiterjesztesnel)."""
+        if binary is None:
+            binary = filename.lower().endswith(BINARY_EXTENSION)
+        journal = self._journal if self._journal and self._journal.snapshot_path == filename else None
+        if journal:
+            journal.wait()
+        try:
+            if binary:
+                self._save_binary(filename)
+            else:
+                self._save_json(filename)
+            if journal:
+                # A régi napló a felülírt pillanatképhez tartozott
+                journal.reset()
+                self._mark_saved()
+            return True
+        except Exception as e:
+            print(f"Hiba a mentesnel: {e}")
+            return False
+
+    # --- NAPLÓZÓ (DELTA) MENTÉS ---
+
+    def save_incremental(self, filename):
+        """Csak a legutobbi mentes ota tortent valtozasokat fuzi a <filename>.journal naplohoz.
+
+        Ha nincs ervenyes naplo ehhez a fajlhoz, teljes mentes tortenik. A naplot
+        egy hatterszal tomoriti uj pillanatkeppe, ha tul nagyra no.
+        """
+        journal = self._journal
+        if journal is None or journal.snapshot_path != filename or not journal.is_current():
+            if not self.save_to_file(filename):
+                return False
+            self._journal = Journal(filename)
+            self._journal.reset()
+            self._mark_saved()
+            return True
+
+        changes = self._collect_changes()
+        if changes:
+            try:
+                journal.append(changes)
+            except Exception as e:
+                print(f"Hiba a mentesnel: {e}")
+                return False
+        self._mark_saved()
+        if journal.needs_compaction():
+            journal.start_compaction(lambda: GameState._compact(journal))
+        return True
+
+    def _mark_saved(self):
+        self._dirty_cards = set()
+        self._saved_dungeons = len(self.dungeons)
+        self._saved_collection = len(self.player_collection)
+        self._collection_reset = False
+        self._saved_deck = tuple(c.name for c in self.player_deck)
+        self._saved_difficulty = self.difficulty
+
+    def _collect_changes(self):
+        changes = {}
+        if self._dirty_cards:
+            # Világbeli sorrendben, hogy az új lapok visszajátszáskor ugyanoda kerüljenek
+            names = sorted((n for n in self._dirty_cards if n in self.world_cards), key=self._world_pos.get)
+            changes["cards"] = [self.world_cards[n].to_dict() for n in names]
+        if len(self.dungeons) < self._saved_dungeons:
+            changes["dungeons"] = [d.to_dict() for d in self.dungeons]
+        elif len(self.dungeons) > self._saved_dungeons:
+            changes["dungeons_append"] = [d.to_dict() for d in self.dungeons[self._saved_dungeons:]]
+        if self._collection_reset or len(self.player_collection) < self._saved_collection:
+            changes["collection"] = [c.name for c in self.player_collection]
+        elif len(self.player_collection) > self._saved_collection:
+            changes["collection_append"] = [c.name for c in self.player_collection[self._saved_collection:]]
+        deck = tuple(c.name for c in self.player_deck)
+        if deck != self._saved_deck:
+            changes["deck"] = list(deck)
+        if self.difficulty != self._saved_difficulty:
+            changes["difficulty"] = self.difficulty
+        return changes
+
+    def _replay(self, records):
+        world = self.world_cards
+        for rec in records:
+            for c_data in rec.get("cards", ()):
+                card = world.get(c_data["name"])
+                if card is None:
+                    self.add_world_card(Card.from_dict(c_data))
+                else:
+                    # Helyben frissítjük, így a kazamaták/gyűjtemény hivatkozásai is az új statokat látják
+                    Card.__init__(card, c_data["name"], c_data["dmg"], c_data["hp"], c_data["type"])
+            if "dungeons" in rec:
+                self.dungeons = []
+            for d_data in rec.get("dungeons", []) + rec.get("dungeons_append", []):
+                self.dungeons.append(self._dungeon_from_dict(d_data))
+            if "collection" in rec:
+                self.player_collection = []
+            for name in rec.get("collection", []) + rec.get("collection_append", []):
+                if name in world: self.player_collection.append(world[name])
+            if "deck" in rec:
+                self.player_deck = [world[name] for name in rec["deck"] if name in world]
+            if "difficulty" in rec:
+                self.difficulty = rec["difficulty"]
+
+    @staticmethod
+    def _compact(journal):
+        """Hatterszal: pillanatkep + naplo -> uj pillanatkep, az elo allapot erintese nelkul."""
+        try:
+            consumed = journal.size
+            reader = Journal(journal.snapshot_path)
+            state = GameState()
+            state._load_snapshot(journal.snapshot_path)
+            state.rebuild_indexes()
+            records = reader.load(limit=consumed)
+            if records is None:
+                return
+            state._replay(records)
+            tmp = journal.snapshot_path + ".compact"
+            if not state.save_to_file(tmp, binary=is_binary_save(journal.snapshot_path)):
+                return
+            with journal.lock:
+                journal.replace_snapshot(tmp, consumed)
+        except Exception as e:
+            print(f"Hiba a naplo tomoritesekor: {e}")
+
+    def _save_json(self, filename):
+        data = {
+            "world_cards": [c.to_dict() for c in self.world_cards.values()],
+            "dungeons": [d.to_dict() for d in self.dungeons],
+            "player_collection": [c.name for c in self.player_collection],
+            "player_deck": [c.name for c in self.player_deck],
+            "difficulty": self.difficulty
+        }
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+
+    def _save_binary(self, filename):
+        # A JSON-hoz hasonlóan névvel azonosítunk: ami nincs a világban, az kimarad
+        pos = {c.name: i for i, c in enumerate(self.world_cards.values())}
+        cards = [(c.name, c.base_dmg, c.max_hp, c.original_type_str) for c in self.world_cards.values()]
+        dungeons = [(d.type_id, d.name, [pos[c.name] for c in d.cards if c.name in pos],
+                     pos.get(d.leader.name) if d.leader else None, d.reward_type) for d in self.dungeons]
+        write_world(filename, cards, dungeons,
+                    [pos[c.name] for c in self.player_collection if c.name in pos],
+                    [pos[c.name] for c in self.player_deck if c.name in pos], self.difficulty)
+
+    def load_from_file(self, filename):
+        """Betoltes; a formatumot (JSON vagy binaris) a fajl eleje donti el."""
+        if not os.path.exists(filename): return False
+        try:
+            self._load_snapshot(filename)
+            self.rebuild_indexes()
+            journal = Journal(filename)
+            records = journal.load()
+            if records:
+                self._replay(records)
+                self.rebuild_indexes()
+            self._journal = journal if records is not None else None
+            self._mark_saved()
+            return True
+        except Exception as e:
+            print(f"Hiba a betoltesnel: {e}")
+            self.rebuild_indexes()
+            return False
+
+    def _load_snapshot(self, filename):
+        if is_binary_save(filename):
+            self._load_binary(filename)
+        else:
+            self._load_json(filename)
+
+    def _dungeon_from_dict(self, d_data):
+        d_cards = [self.world_cards[name] for name in d_data["cards"] if name in self.world_cards]
+        leader = self.world_cards.get(d_data["leader"]) if d_data["leader"] else None
+        return Dungeon(d_data["type_id"], d_data["name"], d_cards, leader, d_data["reward_type"])
+
+    def _load_json(self, filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.world_cards = {}
+        for c_data in data["world_cards"]:
+            card = Card.from_dict(c_data)
+            self.world_cards[card.name] = card
+
+        self.dungeons = [self._dungeon_from_dict(d_data) for d_data in data["dungeons"]]
+
+        self.player_collection = [self.world_cards[name] for name in data["player_collection"] if
+                                  name in self.world_cards]
+        self.player_deck = [self.world_cards[name] for name in data["player_deck"] if name in self.world_cards]
+        self.difficulty = data.get("difficulty", 0)
+
+    def _load_binary(self, filename):
+        with WorldReader(filename) as r:
+            cards = [Card(n, d, h, t) for n, d, h, t in r.cards()]
+            self.world_cards = {c.name: c for c in cards}
+            self.dungeons = [Dungeon(t, n, [cards[i] for i in ids], cards[leader] if leader is not None else None,
+                                     reward) for t, n, ids, leader, reward in r.dungeons()]
+            self.player_collection = [cards[i] for i in r.collection]
+            self.player_deck = [cards[i] for i in r.deck]
+            self.difficulty = r.difficulty
+
+    def create_default_world(self):
+        cards_data = [
+            ("Arin", 2, 5, "fold"), ("Liora", 2, 4, "levego"), ("Nerun", 3, 3, "tuz"),
+            ("Selia", 2, 6, "viz"), ("Torak", 3, 4, "fold"), ("Emera", 2, 5, "levego"),
+            ("Vorn", 2, 7, "viz"), ("Kael", 3, 5, "tuz"), ("Myra", 2, 6, "fold"),
+            ("Thalen", 3, 5, "levego"), ("Isara", 2, 6, "viz")
+        ]
+        for name, d, h, t in cards_data:
+            self.world_cards[name] = Card(name, d, h, t)
+
+        self.world_cards["Lord Torak"] = Card("Lord Torak", 6, 4, "fold")
+        self.world_cards["Priestess Selia"] = Card("Priestess Selia", 2, 12, "viz")
+
+        self.dungeons.append(Dungeon("egyszeru", "Barlangi Portya", [self.world_cards["Nerun"]], None, "sebzes"))
+
+        osisz_cards = [self.world_cards[n] for n in ["Arin", "Emera", "Selia"]]
+        self.dungeons.append(Dungeon("kis", "Osi Szentely", osisz_cards, self.world_cards["Lord Torak"], "eletero"))
+
+        melyseg_cards = [self.world_cards[n] for n in ["Liora", "Arin", "Selia", "Nerun", "Torak"]]
+        self.dungeons.append(
+            Dungeon("nagy", "A melyseg kiralynoje", melyseg_cards, self.world_cards["Priestess Selia"], None))
+
+        start_coll = ["Arin", "Liora", "Selia", "Nerun", "Torak", "Emera", "Kael", "Myra", "Thalen", "Isara"]
+        self.player_collection = [self.world_cards[n] for n in start_coll if n in self.world_cards]
+        self.rebuild_indexes()
+
+
+# --- HARC LOGIKA ---
+
+def hits_to_kill(hp, dmg):
+    """Hanyadik talalat viszi 0 ala a hp-t (a step() 'hp -= dmg; hp <= 0' ellenorzese szerint), vagy None."""
+    if hp - dmg <= 0: return 1
+    if dmg <= 0: return None
+    return -(-hp // dmg)
+
+
+def solve_duel(d_ep, d_pe, p_hp, p_max_hp, e_hp, player_next):
+    """Egy parharc vegeredmenye zart alakban, a step() szabalyai szerint.
+
+    d_ep: kazamata -> jatekos, d_pe: jatekos -> kazamata sebzes. Eredmeny:
+    (tamadasok szama, jatekos hp, kazamata hp, a jatekos lapja esett-e el),
+    vagy None, ha egyik fel sem tudja legyozni a masikat.
+    """
+    k_p = hits_to_kill(p_hp, d_ep)
+    k_e = hits_to_kill(e_hp, d_pe)
+    if k_p is None and k_e is None:
+        return None
+    # Aki kezd, annak a k. ütése megelőzi a másik k. ütését
+    if player_next:
+        player_dies = k_e is None or (k_p is not None and k_p < k_e)
+    else:
+        player_dies = k_e is None or (k_p is not None and k_p <= k_e)
+
+    if player_dies:
+        e_hits = k_p
+        p_hits = k_p if player_next else k_p - 1
+        return e_hits + p_hits, p_hp - e_hits * d_ep, e_hp - p_hits * d_pe, True
+    p_hits = k_e
+    e_hits = k_e - 1 if player_next else k_e
+    p_hp -= e_hits * d_ep
+    if p_hp > 0:
+        p_hp = min(p_max_hp, p_hp + 1)
+    return e_hits + p_hits, p_hp, e_hp - p_hits * d_pe, False
+
+
+_MISSING = object()
+
+
+def _no_log(action, turn, owner, c, t, d):
+    pass
+
+
+class DuelCache:
+    """LRU transzpozicios tabla a determinisztikus parharcok eredmenyeire.
+
+    Kulcs: (d_ep, d_pe, jatekos hp, jatekos max hp, kazamata hp, a jatekos jon-e);
+    a lapok statjai es tipusai a ket sebzesben jelennek meg.
+    Csak a naplo nelkuli run() hasznalja: naplozaskor a tamadasokat ugyis
+    egyenkent kell kiirni, ott a tabla csak a kulcs es az LRU koltseget adna.
+    """
+
+    def __init__(self, maxsize=1 << 16):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        data = self._data
+        value = data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            value = data[key] = solve_duel(*key)
+            if len(data) > self.maxsize:
+                data.popitem(last=False)
+        else:
+            self.hits += 1
+            data.move_to_end(key)
+        return value
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+DUEL_CACHE = DuelCache()
+
+
+class BattleEngine:
+    # A run() által használt párharc tábla; példányonként felülírható
+    duel_cache = DUEL_CACHE
+
+    def __init__(self, player_deck, dungeon, difficulty_level, logger_func, is_game_mode=False, rng=None):
+        self.player_deck = [BattleCard(c) for c in player_deck]
+        self.enemy_deck = dungeon.get_full_enemy_list()
+        self.dungeon = dungeon
+        self.difficulty = difficulty_level
+        # logger_func=None: nincs napló, a run() naplóesemények nélkül ugrik a párharcok végére
+        self.log = logger_func or _no_log
+        self.fast_forward = logger_func is None
+        self.is_game_mode = is_game_mode
+        # Saját véletlen folyam (RngStream vagy FactorStream); None esetén az első húzáskor seed nélkül jön létre
+        self.rng = rng
+
+        self.turn = 1
+        self.battle_over = False
+        self.winner = None
+
+        self.p_idx = 0
+        self.e_idx = 0
+
+        self.p_card_played = False
+        self.e_card_played = False
+        self.next_actor = "enemy"
+
+        # Az aktuális lappár sebzései (kazamata -> játékos, játékos -> kazamata)
+        self._matchup_key = None
+        self._matchup = (0, 0)
+
+        # TÖRÖLVE: IDŐJÁRÁS LOGIKA (weather)
+
+    # TÖRÖLVE: get_weather_bonus függvény
+
+    def calculate_damage(self, attacker, defender, is_dungeon_atk):
+        return self.apply_difficulty(base_damage(attacker, defender), is_dungeon_atk)
+
+    def apply_difficulty(self, current_dmg, is_dungeon_atk):
+        if self.is_game_mode and self.difficulty > 0:
+            n = self.difficulty
+            if self.rng is None:
+                self.rng = RngStream()
+            rnd = self.rng.random()
+
+            if is_dungeon_atk:
+                current_dmg = round(current_dmg * (1 + (rnd * n / 10)))
+            else:
+                current_dmg = round(current_dmg * (1 - (rnd * n / 20)))
+
+        return int(current_dmg)
+
+    def step(self):
+        if self.battle_over: return
+
+        if self.p_idx >= len(self.player_deck):
+            self.end_battle("enemy")
+            return
+        if self.e_idx >= len(self.enemy_deck):
+            self.end_battle("player")
+            return
+
+        p_card = self.player_deck[self.p_idx]
+        e_card = self.enemy_deck[self.e_idx]
+
+        if not self.e_card_played:
+            self.log("play", self.turn, "kazamata", e_card, None, 0)
+            self.e_card_played = True
+            return
+
+        if not self.p_card_played:
+            self.log("play", self.turn, "jatekos", p_card, None, 0)
+            self.p_card_played = True
+            return
+
+        attacker_owner = self.next_actor
+        attacker = e_card if attacker_owner == "enemy" else p_card
+        defender = p_card if attacker_owner == "enemy" else e_card
+        is_dungeon_atk = (attacker_owner == "enemy")
+
+        if self._matchup_key != (self.p_idx, self.e_idx):
+            self._matchup_key = (self.p_idx, self.e_idx)
+            self._matchup = (base_damage(e_card, p_card), base_damage(p_card, e_card))
+        final_dmg = self.apply_difficulty(self._matchup[0 if is_dungeon_atk else 1], is_dungeon_atk)
+
+        defender.current_hp -= final_dmg
+        self.log("attack", self.turn, attacker_owner, attacker, defender, final_dmg)
+
+        if defender.current_hp <= 0:
+            if not is_dungeon_atk and attacker.current_hp > 0:
+                attacker.current_hp = min(attacker.max_hp, attacker.current_hp + 1)
+
+            if attacker_owner == "enemy":
+                self.p_idx += 1
+                self.p_card_played = False
+                self.next_actor = "enemy"
+            else:
+                self.e_idx += 1
+                self.e_card_played = False
+                self.next_actor = "enemy"
+            self.turn += 1
+        else:
+            self.next_actor = "player" if self.next_actor == "enemy" else "enemy"
+            if attacker_owner == "player":
+                self.turn += 1
+
+    def run(self):
+        """A harc vegigjatszasa.
+
+        Determinisztikus harcban (nincs veletlen sebzes) a parharcok zart
+        alakban oldodnak meg; naplo nelkul az eredmeny a duel_cache-bol jon.
+        A naplo ugyanazokat az esemenyeket kapja, mint step()-enkenti futtataskor.
+        """
+        deterministic = not (self.is_game_mode and self.difficulty > 0)
+        while not self.battle_over:
+            if (deterministic and self.e_card_played and self.p_card_played
+                    and self.p_idx < len(self.player_deck) and self.e_idx < len(self.enemy_deck)):
+                if self._resolve_duel():
+                    continue
+                # Elakadt párharc: a lépésenkénti út, ami itt (az eredetivel egyezően) sosem ér véget
+                deterministic = False
+            self.step()
+
+    def _resolve_duel(self):
+        p_card = self.player_deck[self.p_idx]
+        e_card = self.enemy_deck[self.e_idx]
+        if self._matchup_key != (self.p_idx, self.e_idx):
+            self._matchup_key = (self.p_idx, self.e_idx)
+            self._matchup = (base_damage(e_card, p_card), base_damage(p_card, e_card))
+        d_ep, d_pe = self._matchup
+        player_next = self.next_actor == "player"
+        if self.fast_forward:
+            outcome = self.duel_cache.lookup((d_ep, d_pe, p_card.current_hp, p_card.max_hp, e_card.current_hp,
+                                              player_next))
+        else:
+            # Naplózáskor a tábla nem spórolna: a támadásokat úgyis egyenként írjuk ki
+            outcome = solve_duel(d_ep, d_pe, p_card.current_hp, p_card.max_hp, e_card.current_hp, player_next)
+        if outcome is None:
+            return False
+        attacks, p_hp, e_hp, player_died = outcome
+
+        if self.fast_forward:
+            # Minden játékos támadás egy kör (a kezdő fél a páratlan sorszámú támadásokat kapja)
+            self.turn += (attacks + 1) // 2 if player_next else attacks // 2
+        else:
+            # Naplóesemények újrajátszása: a logger támadáskor a védekező aktuális hp-ját olvassa
+            log = self.log
+            for _ in range(attacks):
+                if player_next:
+                    e_card.current_hp -= d_pe
+                    log("attack", self.turn, "player", p_card, e_card, d_pe)
+                    self.turn += 1
+                else:
+                    p_card.current_hp -= d_ep
+                    log("attack", self.turn, "enemy", e_card, p_card, d_ep)
+                player_next = not player_next
+        p_card.current_hp = p_hp
+        e_card.current_hp = e_hp
+
+        if player_died:
+            self.p_idx += 1
+            self.p_card_played = False
+            self.turn += 1
+        else:
+            self.e_idx += 1
+            self.e_card_played = False
+        self.next_actor = "enemy"
+        return True
+
+    def end_battle(self, winner_code):
+        self.battle_over = True
+        self.winner = winner_code
@@ -0,0 +1,600 @@
+"""Differencialis teszt: a teszt mod gyors utjai a referencia kimenetevel, bajtra osszevetve.
+
+Veletlen (seedelt) parancsfajlokat futtat a referencian es a valtozatokon,
+es kimeneti fajlonkent bajtra osszeveti az eredmenyt. A referencia az eredeti
+teszt mod onallo masolata (parancsok, lapok, harc, jutalom, export, JSON
+mentes): a sebzes az eredeti szoveges szabalyokbol szamolodik (ketszer
+normalizalt tipus, STRONG/WEAK szotarak), nem a core tipustablajabol, igy a
+tipusok kezelese es a formatum elcsuszasa is kiderul, nem csak az eltero harc.
+
+Valtozatok:
+    alap          TestModeRunner: run() zart alaku parharcokkal
+    naplo_nelkul  with_log=False; a referencia harcfajljaibol csak a jutalom sor
+    parhuzamos    jobs=2, spekulativ harcok sorrendi lezarassal (szalkeszlettel,
+                  hogy egy eset ne folyamatinditas legyen; a logika ugyanaz)
+    szimulator    a harc kimenetele a simulator.simulate() tombos magjabol
+    dwb           az utolso export elott .dwb mentes es visszatoltes; referenciaja
+                  ugyanez JSON mentessel (a betoltes mindket formatumban
+                  a vilaglapokra koti a gyujtemenyt)
+    profil        a vilagot epito parancsok utan a jatekos parancsai egy
+                  SharedWorld feletti PlayerProfile-on; referenciaja ugyanez
+                  a sorrend a referencian
+
+Elteres eseten a hibas parancsfajl automatikusan kicsinyul (sorblokkok es
+listaelemek torlese, kisebb szamok), amig a hiba megmarad.
+
+Hasznalat: python difftest.py [valtozat ...] [--cases N] [--seed S] [--jobs J] [--out MAPPA]
+"""
+import argparse
+import atexit
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from core import GameState
+from output import MemoryOutput
+from rngstream import derive_seed
+from testmode import TestModeRunner
+from profiles import SharedWorld, PlayerProfile
+import simulator
+
+NAMES = ["Arin", "Liora", "Nerun", "Selia", "Torak", "Emera"]
+LEADERS = ["Vezer A", "Vezer B", "Arin"]  # a vezér felülírhat egy meglévő lapot is
+DUNGEONS = ["D1", "D2", "D3"]
+TYPES = ["tuz", "viz", "fold", "levego", "Tűz", "LEVEGŐ", "Levegő", "jeg"]
+REWARDS = ["sebzes", "eletero", "semmi"]
+OUT_FILES = [f"out{i}.txt" for i in range(6)]  # kevés név: a felülírás sorrendje is számít
+
+
+# --- VÉLETLEN PARANCSFÁJL ---
+
+def _names(rng, lo, hi):
+    return ",".join(rng.choice(NAMES + LEADERS) for _ in range(rng.randint(lo, hi)))
+
+
+def _dungeon_fields(rng):
+    kind = rng.choice(["egyszeru", "kis", "nagy"])
+    fields = ["uj kazamata", kind, rng.choice(DUNGEONS)]
+    if kind == "egyszeru":
+        return fields + [rng.choice(NAMES), rng.choice(REWARDS)]
+    fields += [_names(rng, 0, 4), rng.choice(LEADERS)]
+    return fields + [rng.choice(REWARDS)] if kind == "kis" else fields
+
+
+# A sebzés legalább 2: gyengeségnél is >= 1, így nincs elakadó (végtelen) harc
+COMMANDS = [
+    (15, lambda rng: ["uj kartya", rng.choice(NAMES), str(rng.randint(2, 9)), str(rng.randint(-1, 20)),
+                      rng.choice(TYPES)]),
+    (5, lambda rng: ["uj vezer", rng.choice(LEADERS), rng.choice(NAMES), rng.choice(REWARDS)]),
+    (10, _dungeon_fields),
+    (2, lambda rng: ["uj jatekos"]),
+    (15, lambda rng: ["felvetel gyujtemenybe", rng.choice(NAMES + LEADERS)]),
+    (10, lambda rng: ["uj pakli", _names(rng, 0, 5)]),
+    (30, lambda rng: ["harc", rng.choice(DUNGEONS), rng.choice(OUT_FILES)]),
+    (8, lambda rng: [rng.choice(["export vilag", "export jatekos"]), rng.choice(OUT_FILES)]),
+]
+_WEIGHTS = [w for w, _ in COMMANDS]
+_MAKERS = [m for _, m in COMMANDS]
+
+
+def random_script(rng):
+    """Egy parancsfajl sorai: altalaban egy kis kezdo vilag, utana sulyozott veletlen parancsok."""
+    lines = []
+    if rng.random() < 0.8:
+        lines += [";".join(_MAKERS[0](rng)) for _ in range(rng.randint(1, 4))]
+        lines.append(";".join(_dungeon_fields(rng)))
+        lines.append("uj jatekos")
+        lines += [f"felvetel gyujtemenybe;{rng.choice(NAMES)}" for _ in range(rng.randint(1, 4))]
+        lines.append(f"uj pakli;{_names(rng, 1, 4)}")
+    for maker in rng.choices(_MAKERS, _WEIGHTS, k=rng.randint(1, 30)):
+        fields = maker(rng)
+        r = rng.random()
+        if r < 0.05:
+            fields = fields[:rng.randint(1, len(fields))]  # hiányos parancs: a kezelők átugorják
+        elif r < 0.1:
+            fields = [f" {f} " for f in fields]
+        lines.append(";".join(fields))
+        if rng.random() < 0.03:
+            lines.append(rng.choice(["", "// megjegyzes", "ismeretlen parancs;x"]))
+    return lines
+
+
+# --- REFERENCIA ---
+# Az eredeti teszt mód önálló másolata: saját lapok, típusszabályok, harc és export, a futtatott
+# kód egyetlen függvényét sem használja. Csak a kimeneti réteg (MemoryOutput) közös.
+
+STRONG_AGAINST = {"levego": "fold", "fold": "tuz", "tuz": "viz", "viz": "levego"}
+WEAK_AGAINST = {"levego": "tuz", "tuz": "levego", "fold": "viz", "viz": "fold"}
+_ACCENTS = {
+    'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ö': 'o', 'ő': 'o',
+    'ú': 'u', 'ü': 'u', 'ű': 'u', 'Á': 'A', 'É': 'E', 'Í': 'I',
+    'Ó': 'O', 'Ö': 'O', 'Ú': 'U', 'Ü': 'U', 'Ű': 'U'
+}
+
+
+def ref_normalize(text):
+    """Az eredeti replace-lanc: ekezetek le, kisbetusites (a nagy 'Ő' kimarad a tablabol)."""
+    for k, v in _ACCENTS.items():
+        text = text.replace(k, v)
+    return text.lower().strip()
+
+
+class RefCard:
+    def __init__(self, name, dmg, hp, type_name):
+        self.name = name
+        self.base_dmg = int(dmg)
+        self.max_hp = int(hp)
+        self.current_hp = int(hp)
+        self.type = ref_normalize(type_name)
+        self.original_type_str = type_name
+
+    def copy(self):
+        return RefCard(self.name, self.base_dmg, self.max_hp, self.original_type_str)
+
+
+class RefDungeon:
+    def __init__(self, type_id, name, cards, leader, reward_type):
+        self.type_id = type_id
+        self.name = name
+        self.cards = cards
+        self.leader = leader
+        self.reward_type = reward_type
+
+
+def ref_damage(attacker, defender):
+    """Teszt modu sebzes az eredeti szaballyal: a mar normalizalt tipus meg egyszer normalizalva."""
+    atk_t = ref_normalize(attacker.type)
+    def_t = ref_normalize(defender.type)
+    modifier = 1.0
+    if STRONG_AGAINST.get(atk_t) == def_t:
+        modifier = 2.0
+    elif WEAK_AGAINST.get(atk_t) == def_t:
+        modifier = 0.5
+    return int(math.floor(attacker.base_dmg * modifier))
+
+
+def golden_battle(deck, dungeon):
+    """A harcfajl sorai (jutalom sor nelkul) es (gyoztes, p_idx, a pakli harci masolata)."""
+    logs = [f"harc kezdodik; {dungeon.name}"]
+    players = [c.copy() for c in deck]
+    enemies = [c.copy() for c in dungeon.cards] + ([dungeon.leader.copy()] if dungeon.leader else [])
+    turn, p_idx, e_idx = 1, 0, 0
+    p_played = e_played = False
+    actor = "enemy"
+    while True:
+        if p_idx >= len(players):
+            return logs, "enemy", p_idx, players
+        if e_idx >= len(enemies):
+            return logs, "player", p_idx, players
+        p, e = players[p_idx], enemies[e_idx]
+        for owner, c, played in (("kazamata", e, e_played), ("jatekos", p, p_played)):
+            if not played:
+                logs.append(f"{turn}.kor; {owner};kijatszik; {c.name};{c.base_dmg};{c.max_hp}; {c.original_type_str}")
+        e_played = p_played = True
+
+        attacker, defender = (e, p) if actor == "enemy" else (p, e)
+        dmg = ref_damage(attacker, defender)
+        defender.current_hp -= dmg
+        logs.append(f"{turn}.kor; {actor};tamad; {attacker.name}; {dmg}; {defender.name}; {max(0, defender.current_hp)}")
+        if defender.current_hp <= 0:
+            if actor == "player":
+                if attacker.current_hp > 0:
+                    attacker.current_hp = min(attacker.max_hp, attacker.current_hp + 1)
+                e_idx, e_played = e_idx + 1, False
+            else:
+                p_idx, p_played = p_idx + 1, False
+            actor = "enemy"
+            turn += 1
+        else:
+            if actor == "player":
+                turn += 1
+            actor = "player" if actor == "enemy" else "enemy"
+
+
+class ReferenceRunner:
+    """Soros teszt mod az eredeti parancskezelessel, linearis keresesekkel, indexek nelkul."""
+
+    def __init__(self, output):
+        self.output = output
+        self.world_cards = {}
+        self.dungeons = []
+        self.collection = []
+        self.deck = []
+        self.known_leaders = set()
+
+    def flush(self):
+        pass
+
+    def dispatch(self, parts):
+        cmd, world = parts[0], self.world_cards
+        if cmd == "uj kartya":
+            if len(parts) >= 5:
+                world[parts[1]] = RefCard(parts[1], parts[2], parts[3], parts[4])
+        elif cmd == "uj vezer":
+            if len(parts) >= 4 and parts[2] in world:
+                base = world[parts[2]]
+                dmg, hp = base.base_dmg, base.max_hp
+                if "sebzes" in parts[3]:
+                    dmg *= 2
+                elif "eletero" in parts[3]:
+                    hp *= 2
+                world[parts[1]] = RefCard(parts[1], dmg, hp, base.original_type_str)
+                self.known_leaders.add(parts[1])
+        elif cmd == "uj kazamata":
+            if len(parts) >= 4:
+                cards = [world[x.strip()] for x in parts[3].split(',') if x.strip() in world]
+                leader = reward = None
+                if parts[1] == "egyszeru":
+                    if len(parts) > 4: reward = parts[4]
+                elif parts[1] == "kis":
+                    if len(parts) > 4 and parts[4] in world: leader = world[parts[4]]
+                    if len(parts) > 5: reward = parts[5]
+                elif parts[1] == "nagy":
+                    if len(parts) > 4 and parts[4] in world: leader = world[parts[4]]
+                self.dungeons.append(RefDungeon(parts[1], parts[2], cards, leader, reward))
+        elif cmd == "uj jatekos":
+            self.collection = []
+        elif cmd == "felvetel gyujtemenybe":
+            if len(parts) >= 2 and parts[1] in world:
+                self.collection.append(world[parts[1]].copy())
+        elif cmd == "uj pakli":
+            if len(parts) >= 2:
+                self.deck = []
+                for n in (x.strip() for x in parts[1].split(',')):
+                    found = next((c for c in self.collection if c.name == n), None)
+                    if found: self.deck.append(found)
+        elif cmd == "harc":
+            if len(parts) >= 3:
+                dungeon = next((d for d in self.dungeons if d.name == parts[1]), None)
+                if not dungeon: return
+                logs, winner, p_idx, fought = golden_battle(self.deck, dungeon)
+                logs.append(self.reward(winner, p_idx, fought, dungeon))
+                self.output.write(parts[2], "\n".join(logs), "mentesnel")
+        elif cmd.startswith("export"):
+            if len(parts) >= 2:
+                self.output.write(parts[1], "\n".join(self.export_lines("vilag" in cmd)), "exportnal")
+
+    def reward(self, winner, p_idx, fought, dungeon):
+        if winner != "player":
+            return "jatekos vesztett"
+        if not fought:
+            return "jatekos nyert; hiba"
+        lc = fought[max(0, min(p_idx, len(fought) - 1))]
+        if dungeon.type_id != "nagy":
+            orig = next((c for c in self.collection if c.name == lc.name), None)
+            if orig and dungeon.reward_type == "sebzes":
+                orig.base_dmg += 1
+            elif orig and dungeon.reward_type == "eletero":
+                orig.max_hp += 2
+                orig.current_hp = orig.max_hp
+            return f"jatekos nyert; {dungeon.reward_type}; {lc.name}"
+        # Az egyszer normalizált típus dönt, mint az eredetiben
+        new_c = next((wc for wc in self.world_cards.values()
+                      if wc.type in ["tuz", "viz", "fold", "levego"]
+                      and not any(pc.name == wc.name for pc in self.collection)), None)
+        if new_c is None:
+            return "jatekos nyert; nincs uj kartya"
+        self.collection.append(new_c.copy())
+        return f"jatekos nyert; {new_c.name}"
+
+    def export_lines(self, world):
+        if not world:
+            return ([f"gyujtemeny; {c.name}; {c.base_dmg};{c.max_hp};{c.original_type_str}" for c in self.collection]
+                    + [f"pakli; {c.name}" for c in self.deck])
+        lines = [f"{'vezer' if c.name in self.known_leaders else 'kartya'}; {c.name};{c.base_dmg};{c.max_hp};"
+                 f"{c.original_type_str}" for c in self.world_cards.values()]
+        for d in self.dungeons:
+            line = f"kazamata; {d.type_id}; {d.name}; " + ", ".join(c.name for c in d.cards)
+            if d.leader: line += f"; {d.leader.name}"
+            if d.reward_type: line += f"; {d.reward_type}"
+            lines.append(line)
+        return lines
+
+    def json_roundtrip(self):
+        """Az eredeti JSON mentes es betoltes: a gyujtemeny es a pakli a vilaglapokra kotodik."""
+        data = json.loads(json.dumps({
+            "world_cards": [{"name": c.name, "dmg": c.base_dmg, "hp": c.max_hp, "type": c.original_type_str}
+                            for c in self.world_cards.values()],
+            "dungeons": [{"type_id": d.type_id, "name": d.name, "cards": [c.name for c in d.cards],
+                          "leader": d.leader.name if d.leader else None, "reward_type": d.reward_type}
+                         for d in self.dungeons],
+            "player_collection": [c.name for c in self.collection],
+            "player_deck": [c.name for c in self.deck],
+        }))
+        world = self.world_cards = {}
+        for c in data["world_cards"]:
+            world[c["name"]] = RefCard(c["name"], c["dmg"], c["hp"], c["type"])
+        self.dungeons = [RefDungeon(d["type_id"], d["name"], [world[n] for n in d["cards"] if n in world],
+                                    world.get(d["leader"]) if d["leader"] else None, d["reward_type"])
+                         for d in data["dungeons"]]
+        self.collection = [world[n] for n in data["player_collection"] if n in world]
+        self.deck = [world[n] for n in data["player_deck"] if n in world]
+
+
+# --- FUTTATÓK ---
+
+class SimulatorRunner(TestModeRunner):
+    """Naplo nelkuli teszt mod, a harc kimenetele a tombos szimulatorbol."""
+
+    def cmd_battle(self, parts):
+        if len(parts) >= 3:
+            dungeon = next((d for d in self.game.dungeons if d.name == parts[1]), None)
+            if not dungeon: return
+            deck = self.game.player_deck
+            res = simulator.simulate(deck, dungeon)
+            winner = "player" if res.winner[0] == simulator.WINNER_PLAYER else "enemy"
+            self.write_output(parts[2], [self.resolve_reward(winner, int(res.p_idx[0]), deck, dungeon)],
+                              "mentesnel")
+
+    HANDLERS = {**TestModeRunner.HANDLERS, "harc": cmd_battle}
+
+
+_tmp = None
+_thread_pool = None
+
+
+def _tmp_dir():
+    global _tmp
+    if _tmp is None:
+        _tmp = tempfile.mkdtemp(prefix="damareen-difftest-")
+        atexit.register(shutil.rmtree, _tmp, True)
+    return _tmp
+
+
+def _roundtrip(runner, extension):
+    runner.flush()
+    path = os.path.join(_tmp_dir(), "world" + extension)
+    if not runner.game.save_to_file(path):
+        raise RuntimeError("mentes sikertelen")
+    game = GameState()
+    if not game.load_from_file(path):
+        raise RuntimeError("betoltes sikertelen")
+    runner.game = game
+
+
+def run_script(runner, lines, roundtrip=None):
+    """A sorok vegrehajtasa (a teszt mod tokenizalasaval); a kimeneti fajlok nev -> bajtok.
+
+    roundtrip(runner) megadasa eseten az utolso export elott lefut (a jatek mentese
+    es visszatoltese; esetenkent egyszer: ez az eset koltsegenek nagyja).
+    """
+    commands = [[p.strip() for p in line.split(';')] for line in map(str.strip, lines)
+                if line and not line.startswith("//")]
+    at = None
+    if roundtrip:
+        at = max((i for i, parts in enumerate(commands) if parts[0].startswith("export")), default=None)
+    for i, parts in enumerate(commands):
+        if i == at:
+            roundtrip(runner)
+        runner.dispatch(parts)
+    runner.flush()
+    return runner.output.files
+
+
+def run_reference(lines):
+    return run_script(ReferenceRunner(MemoryOutput()), lines)
+
+
+def run_reference_json(lines):
+    return run_script(ReferenceRunner(MemoryOutput()), lines, roundtrip=ReferenceRunner.json_roundtrip)
+
+
+def run_fast(lines):
+    return run_script(TestModeRunner(None, output=MemoryOutput()), lines)
+
+
+def run_no_log(lines):
+    return run_script(TestModeRunner(None, output=MemoryOutput(), with_log=False), lines)
+
+
+def run_parallel(lines):
+    global _thread_pool
+    if _thread_pool is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _thread_pool = ThreadPoolExecutor(max_workers=2)
+    runner = TestModeRunner(None, jobs=2, output=MemoryOutput())
+    # Közös készlet; a runner.close() nem hívódik, így nem állítja le
+    runner._pool = _thread_pool
+    return run_script(runner, lines)
+
+
+def run_simulator(lines):
+    return run_script(SimulatorRunner(None, output=MemoryOutput()), lines)
+
+
+def run_binary_save(lines):
+    return run_script(TestModeRunner(None, output=MemoryOutput()), lines, roundtrip=lambda r: _roundtrip(r, ".dwb"))
+
+
+WORLD_COMMANDS = ("uj kartya", "uj vezer", "uj kazamata")
+
+
+def world_first(lines):
+    """A vilagot epito sorok elore (egymas kozti sorrendjukben), utanuk a tobbi."""
+    world = [line.split(';')[0].strip() in WORLD_COMMANDS for line in lines]
+    return [l for l, w in zip(lines, world) if w] + [l for l, w in zip(lines, world) if not w]
+
+
+def run_reference_world_first(lines):
+    return run_reference(world_first(lines))
+
+
+def profile_runner(lines):
+    """A world_first sorrend: a vilag GameState-en epul, a jatekos parancsai egy PlayerProfile-on futnak."""
+    lines = world_first(lines)
+    k = sum(1 for line in lines if line.split(';')[0].strip() in WORLD_COMMANDS)
+    runner = TestModeRunner(None, output=MemoryOutput())
+    run_script(runner, lines[:k])
+    # A profil a megosztott (már változatlan) világ fölött játszik
+    runner.game = PlayerProfile(SharedWorld.from_game(runner.game))
+    run_script(runner, lines[k:])
+    return runner
+
+
+def run_profile(lines):
+    return profile_runner(lines).output.files
+
+
+def reward_only(files):
+    """A naplo nelkuli harcfajl: a naplozott harcfajlbol csak az utolso (jutalom) sor."""
+    return {name: data.rsplit(b"\n", 1)[-1] if data.startswith(b"harc kezdodik") else data
+            for name, data in files.items()}
+
+
+# név -> (futtató, referencia, a referencia kimenetének vetítése vagy None)
+VARIANTS = {
+    "alap": (run_fast, run_reference, None),
+    "naplo_nelkul": (run_no_log, run_reference, reward_only),
+    "parhuzamos": (run_parallel, run_reference, None),
+    "szimulator": (run_simulator, run_reference, reward_only),
+    "dwb": (run_binary_save, run_reference_json, None),
+    "profil": (run_profile, run_reference_world_first, None),
+}
+
+
+# --- ÖSSZEVETÉS ---
+
+def diff_outputs(expected, actual):
+    """None, ha bajtra egyeznek; kulonben az elso elteres leirasa."""
+    for name in sorted(set(expected) | set(actual)):
+        exp, act = expected.get(name), actual.get(name)
+        if exp == act: continue
+        if exp is None or act is None:
+            return f"{name}: {'felesleges' if exp is None else 'hianyzo'} kimenet"
+        exp_lines, act_lines = exp.split(b"\n"), act.split(b"\n")
+        for i, (e, a) in enumerate(zip(exp_lines, act_lines)):
+            if e != a:
+                return f"{name}, {i + 1}. sor: {e!r} != {a!r}"
+        return f"{name}: {len(exp_lines)} sor helyett {len(act_lines)}"
+    return None
+
+
+def check_case(lines, names):
+    """{valtozat: elteres} az eltero valtozatokra; a referenciak esetenkent egyszer futnak."""
+    refs = {}
+    failures = {}
+    for name in names:
+        run, reference, project = VARIANTS[name]
+        try:
+            if reference not in refs:
+                refs[reference] = reference(lines)
+            expected = refs[reference]
+            actual = run(lines)
+        except Exception as e:
+            failures[name] = f"kivetel: {type(e).__name__}: {e}"
+            continue
+        diff = diff_outputs(project(expected) if project else expected, actual)
+        if diff:
+            failures[name] = diff
+    return failures
+
+
+def case_script(seed, index):
+    return random_script(random.Random(derive_seed(seed, "difftest", index)))
+
+
+def _cases_job(seed, start, stop, names):
+    return [(i, name, diff) for i in range(start, stop)
+            for name, diff in check_case(case_script(seed, i), names).items()]
+
+
+# --- KICSINYÍTÉS ---
+
+def _smaller_lines(line):
+    """Egyszerubb valtozatok egy sorra: listaelemek torlese, kisebb szamok."""
+    fields = line.split(';')
+    for k, field in enumerate(fields):
+        items = field.split(',')
+        if len(items) > 1:
+            for j in range(len(items)):
+                yield ";".join(fields[:k] + [",".join(items[:j] + items[j + 1:])] + fields[k + 1:])
+        # Csak a lapok számai csökkennek, a sebzés 2 alá nem (elakadó harc)
+        if fields[0].strip() == "uj kartya" and k in (2, 3) and field.strip().lstrip('-').isdigit():
+            low = 2 if k == 2 else 1
+            if int(field) > low:
+                yield ";".join(fields[:k] + [str(low)] + fields[k + 1:])
+
+
+def shrink(lines, fails):
+    """Sorblokkok torlese felezodo merettel, majd soronkenti egyszerusites, amig fails() igaz marad."""
+    chunk = max(1, len(lines) // 2)
+    while True:
+        i, removed = 0, False
+        while i < len(lines):
+            candidate = lines[:i] + lines[i + chunk:]
+            if fails(candidate):
+                lines, removed = candidate, True
+            else:
+                i += chunk
+        if chunk > 1:
+            chunk //= 2
+        elif not removed:
+            break
+
+    changed = True
+    while changed:
+        changed = False
+        for i, line in enumerate(lines):
+            for simpler in _smaller_lines(line):
+                candidate = lines[:i] + [simpler] + lines[i + 1:]
+                if fails(candidate):
+                    lines, changed = candidate, True
+                    break
+            if changed: break
+    return lines
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="difftest", description="Differencialis teszt a teszt mod gyors utjaira")
+    parser.add_argument("variants", nargs="*", help=f"valtozatok (alapertelmezetten mind: {', '.join(VARIANTS)})")
+    parser.add_argument("--cases", type=int, default=10_000, help="esetek szama")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=1, help="parhuzamos folyamatok szama")
+    parser.add_argument("--max-shrink", type=int, default=3, help="legfeljebb ennyi hibas esetet kicsinyit valtozatonkent")
+    parser.add_argument("--out", help="a kicsinyitett esetek ide kerulnek <valtozat>-<eset>/in.txt neven")
+    args = parser.parse_args(argv)
+
+    names = args.variants or list(VARIANTS)
+    unknown = [n for n in names if n not in VARIANTS]
+    if unknown:
+        print(f"Ismeretlen valtozat: {', '.join(unknown)}")
+        return 2
+
+    t0 = time.perf_counter()
+    jobs = max(1, args.jobs)
+    chunk = max(1, min(1000, -(-args.cases // (jobs * 8))))
+    bounds = [(s, min(s + chunk, args.cases)) for s in range(0, args.cases, chunk)]
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            found = pool.map(_cases_job, [args.seed] * len(bounds), *zip(*bounds), [names] * len(bounds))
+            failures = [f for part in found for f in part]
+    else:
+        failures = [f for s, e in bounds for f in _cases_job(args.seed, s, e, names)]
+    elapsed = time.perf_counter() - t0
+    print(f"{args.cases} eset, {elapsed:.1f} s ({args.cases / elapsed:.0f} eset/s)")
+
+    for name in names:
+        mine = [(i, diff) for i, n, diff in failures if n == name]
+        print(f"{name}: {'OK' if not mine else f'{len(mine)} HIBA'}")
+        for i, diff in mine[:args.max_shrink]:
+            lines = shrink(case_script(args.seed, i), lambda c: name in check_case(c, [name]))
+            print(f"  eset {i}: {diff}")
+            print(f"    kicsinyitve ({check_case(lines, [name]).get(name)}):")
+            for line in lines:
+                print(f"      {line}")
+            if args.out:
+                path = os.path.join(args.out, f"{name}-{i}")
+                os.makedirs(path, exist_ok=True)
+                with open(os.path.join(path, "in.txt"), 'w', encoding='utf-8') as f:
+                    f.write("\n".join(lines) + "\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
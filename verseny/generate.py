@@ -0,0 +1,147 @@
+"""Szintetikus bemenetek a teljesitmenymeresekhez: in.txt parancsfajlok es vilagmentesek.
+
+Minden generator seedelt: ugyanaz a WorldSpec bajtra ugyanazt a bemenetet
+adja, igy ket verzio meresei ugyanazon a terhelesen futnak. A vilagmentes
+ugyanabbol a parancsfajlbol (harcok es exportok nelkul) epul fel a teszt mod
+parancsvegrehajtojaval, tehat pontosan az lesz benne, amit egy teszt futas
+is latna.
+
+Hasznalat: python generate.py script <mappa> [meretek]   (-> <mappa>/in.txt)
+           python generate.py world <fajl> [meretek]     (.json vagy .dwb)
+"""
+import argparse
+import math
+import os
+import random
+import sys
+
+TYPES = ["tuz", "viz", "fold", "levego"]
+REWARDS = ["sebzes", "eletero"]
+
+
+class WorldSpec:
+    """A generalt vilag es parancsfajl meretei."""
+    FIELDS = ("cards", "dungeons", "dungeon_size", "collection", "deck", "battles", "leader_ratio", "exports", "seed")
+
+    def __init__(self, cards=1000, dungeons=100, dungeon_size=5, collection=200, deck=10, battles=1000,
+                 leader_ratio=0.1, exports=4, seed=0):
+        self.cards = cards
+        self.dungeons = dungeons
+        self.dungeon_size = dungeon_size
+        self.collection = collection
+        self.deck = deck
+        self.battles = battles
+        self.leader_ratio = leader_ratio  # vezérek száma a lapokhoz képest
+        self.exports = exports  # export vilag/jatekos párok a harcok között elosztva
+        self.seed = seed
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.FIELDS}
+
+    def replace(self, **changes):
+        values = self.to_dict()
+        values.update({k: v for k, v in changes.items() if v is not None})
+        return WorldSpec(**values)
+
+
+def script_lines(spec):
+    """A parancsfajl sorai (generator, allando memoriaval)."""
+    rng = random.Random(spec.seed)
+    names = [f"Lap{i}" for i in range(max(1, spec.cards))]
+    for name in names:
+        yield f"uj kartya;{name};{rng.randint(2, 6)};{rng.randint(2, 12)};{rng.choice(TYPES)}"
+
+    leaders = [f"Vezer{i}" for i in range(int(len(names) * spec.leader_ratio))]
+    for leader in leaders:
+        yield f"uj vezer;{leader};{rng.choice(names)};{rng.choice(REWARDS)}"
+
+    dungeons = [f"Kazamata{i}" for i in range(max(1, spec.dungeons))]
+    for name in dungeons:
+        # Vezér nélkül csak egyszerű kazamata lehet
+        kind = rng.choice(["egyszeru", "kis", "nagy"]) if leaders else "egyszeru"
+        if kind == "egyszeru":
+            yield f"uj kazamata;egyszeru;{name};{rng.choice(names)};{rng.choice(REWARDS)}"
+            continue
+        cards = ",".join(rng.sample(names, min(spec.dungeon_size, len(names))))
+        line = f"uj kazamata;{kind};{name};{cards};{rng.choice(leaders)}"
+        if kind == "kis":
+            line += f";{rng.choice(REWARDS)}"
+        yield line
+
+    yield "uj jatekos"
+    collection = rng.sample(names, min(spec.collection, len(names)))
+    for name in collection:
+        yield f"felvetel gyujtemenybe;{name}"
+    deck_size = min(spec.deck, len(collection))
+    if deck_size:
+        yield f"uj pakli;{','.join(rng.sample(collection, deck_size))}"
+
+    export_every = math.ceil(spec.battles / spec.exports) if spec.exports else None
+    exported = 0
+    for b in range(spec.battles):
+        # Időnként új pakli, ahogy egy valódi futásban a játékos átrendezi
+        if deck_size and b and rng.random() < 0.05:
+            yield f"uj pakli;{','.join(rng.sample(collection, deck_size))}"
+        yield f"harc;{rng.choice(dungeons)};out.harc{b + 1:05d}.txt"
+        if export_every and (b + 1) % export_every == 0:
+            exported += 1
+            yield f"export vilag;out.vilag{exported:03d}.txt"
+            yield f"export jatekos;out.jatekos{exported:03d}.txt"
+
+
+def write_script(spec, directory):
+    """<directory>/in.txt megirasa; az utvonalat adja vissza."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "in.txt")
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for line in script_lines(spec):
+            f.write(line + "\n")
+    return path
+
+
+def generate_world(spec):
+    """GameState a parancsfajl vilag- es jatekos reszebol (harcok es exportok nelkul)."""
+    from testmode import TestModeRunner
+    runner = TestModeRunner(None)
+    for line in script_lines(spec.replace(battles=0, exports=0)):
+        runner.dispatch([p.strip() for p in line.split(';')])
+    return runner.game
+
+
+def add_spec_arguments(parser):
+    parser.add_argument("--cards", type=int, help="vilaglapok szama")
+    parser.add_argument("--dungeons", type=int, help="kazamatak szama")
+    parser.add_argument("--dungeon-size", type=int, help="lapok kazamatankent (kis/nagy)")
+    parser.add_argument("--collection", type=int, help="gyujtemeny merete")
+    parser.add_argument("--deck", type=int, help="pakli merete")
+    parser.add_argument("--battles", type=int, help="harc parancsok szama")
+    parser.add_argument("--leaders", type=float, dest="leader_ratio", help="vezerek aranya a lapokhoz")
+    parser.add_argument("--exports", type=int, help="export parok szama")
+    parser.add_argument("--seed", type=int)
+
+
+def spec_from_args(args, base=None):
+    return (base or WorldSpec()).replace(**{k: getattr(args, k, None) for k in WorldSpec.FIELDS})
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="generate", description="Szintetikus teszt bemenetek")
+    parser.add_argument("kind", choices=["script", "world"])
+    parser.add_argument("target", help="mappa (script) vagy mentes fajl (world)")
+    add_spec_arguments(parser)
+    args = parser.parse_args(argv)
+    spec = spec_from_args(args)
+
+    if args.kind == "script":
+        print(write_script(spec, args.target))
+        return 0
+    game = generate_world(spec)
+    if not game.save_to_file(args.target):
+        return 1
+    print(f"{args.target}: {len(game.world_cards)} lap, {len(game.dungeons)} kazamata, "
+          f"{len(game.player_collection)} gyujtemeny")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
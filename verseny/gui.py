@@ -0,0 +1,894 @@
+import math
+import threading
+import time
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk, messagebox, filedialog
+from core import DEFAULT_WORLD_FILE, Card, Dungeon, BattleEngine, GameState, normalize_text
+from optimizer import optimize_deck
+from montecarlo import estimate_win_probability
+from rngstream import RngStream
+from replay import ReplayRecorder
+from cardlist import CardListModel, CardFilter
+from minigame import BathGame, MinigameConfig
+
+# Kép fájlnevek
+IMG_SOAP = "png-clipart-soap-soap-thumbnail-removebg-preview.png"
+IMG_STICKMAN = "st_large_507x507-pad_600x600_f8f8f8-removebg-preview.png"
+IMG_BG = "hatter.jpg"
+
+# Vicces beszólások a Koboldtól (ÚJ FEATURE)
+KOBOLD_QUOTES_ATTACK = [
+    "A macskám nagyobbat üt ennél!",
+    "Hű, ez fájt... volna, ha érdekelne!",
+    "Ezt hívod te támadásnak?!",
+    "Bumm! A közepébe! Vagy mellé...",
+    "Most kellene izgulnom?",
+    "Hozzon már valaki egy sört!",
+    "Ez a meccs lassabb, mint a csigafutam!",
+    "Na végre, vér!",
+    "A nagymamám erősebb, pedig ő már nem is él!",
+    "Piff-puff, dirr-durr, mi van itt kérem?"
+]
+
+KOBOLD_QUOTES_PLAY = [
+    "Már megint ez a lap? Uncsi.",
+    "Hűha, előkerült a 'nagyágyú'... ja nem.",
+    "Ettől most be kéne tojni?",
+    "Szép kártya. Kár, hogy béna vagy.",
+    "Na, ki jött a buliba?",
+    "Én a helyedben nem ezt raktam volna...",
+    "Végre valami akció!",
+    "Ez a lap bűzlik, mint a lábam."
+]
+
+# GUI Színek és Stílusok
+TYPE_COLORS = {
+    "tuz": "#e74c3c",  # Piros
+    "viz": "#3498db",  # Kék
+    "fold": "#27ae60",  # Zöld
+    "levego": "#f1c40f",  # Sárga/Arany
+    "default": "#95a5a6"  # Szürke
+}
+BG_COLOR = "#2c3e50"  # Sötétkék háttér
+CARD_BG = "#34495e"  # Kártya háttér
+TEXT_COLOR = "#ecf0f1"  # Világos szöveg
+TYPE_ICONS = {"tuz": "🔥", "viz": "💧", "fold": "🌿"}  # Minden más: 💨
+SORT_LABELS = {"Sorrend": "sorrend", "Név": "nev", "Típus": "tipus", "Sebzés": "sebzes", "Életerő": "eletero"}
+AUTOPLAY_FRAME_MS = 250  # Automatikus lejátszás: egy lépés képkockánként
+ODDS_DELAY_MS = 150  # Gyors egymás utáni pakliváltásoknál csak az utolsó indít esélybecslést
+ODDS_CACHE_SIZE = 256
+BACKGROUND_POLL_MS = 40
+
+
+# --- MINIGAME (FÜRDÉS) ---
+
+class BathMinigame:
+    # Csak rajzol és billentyűt olvas: a fizika és a szappanok a minigame.BathGame modellben vannak
+    def __init__(self, root, on_finish_callback, rng=None, config=None):
+        self.root = root
+        self.on_finish = on_finish_callback
+        self.load_assets()
+        cfg = config or MinigameConfig()
+        if self.img_stickman:
+            cfg.player_size = (self.img_stickman.width(), self.img_stickman.height())
+        if self.img_soap:
+            cfg.soap_size = (self.img_soap.width(), self.img_soap.height())
+        self.game = BathGame(cfg, rng if rng is not None else RngStream())
+        self.width, self.height = cfg.width, cfg.height
+        self.setup_ui()
+        self.pressed_keys = {'a': False, 'd': False}
+        self.canvas.bind('<KeyPress>', self.on_key_press)
+        self.canvas.bind('<KeyRelease>', self.on_key_release)
+        self.canvas.bind('<F3>', self.toggle_stats)
+        self.canvas.focus_set()
+        self.last_frame = time.perf_counter()
+        self.game_loop()
+
+    def load_assets(self):
+        self.img_soap = None
+        self.img_stickman = None
+        self.img_bg = None
+
+        try:
+            raw_stick = tk.PhotoImage(file=IMG_STICKMAN)
+            self.img_stickman = raw_stick.subsample(6, 6)
+        except:
+            pass
+        try:
+            raw_soap = tk.PhotoImage(file=IMG_SOAP)
+            self.img_soap = raw_soap.subsample(8, 8)
+        except:
+            pass
+        try:
+            self.img_bg = tk.PhotoImage(file='hatter.png')
+        except:
+            pass
+
+    def setup_ui(self):
+        for widget in self.root.winfo_children(): widget.destroy()
+        self.canvas = tk.Canvas(self.root, width=self.width, height=self.height, bg="#87CEEB")
+        self.canvas.pack()
+
+        if self.img_bg:
+            self.canvas.create_image(0, 0, image=self.img_bg, anchor="nw")
+
+        game = self.game
+        x, y = game.player_x, game.player_y
+        if self.img_stickman:
+            self.player = self.canvas.create_image(x, y, image=self.img_stickman, anchor="center")
+        else:
+            self.player = self.canvas.create_rectangle(x - 20, y - 40, x + 20, y + 40, fill="black")
+        self.drawn_x = x
+        # Szappanhelyenként a legutóbb kirajzolt y: a canvas elemet csak a különbséggel mozgatjuk
+        self.drawn_y = [0.0] * game.soaps.capacity
+        self.txt_score = self.canvas.create_text(20, 20, text=f"Szappanok: 0 / {game.config.win_score}", anchor="nw",
+                                                 font=("Segoe UI", 16), fill="white")
+
+        # Képkocka-idő kijelző (F3-mal kapcsolható, alapból rejtett): átlagos és legrosszabb ciklusidő
+        # a tick kerethez képest
+        self.show_stats = False
+        self.frame_times = []
+        self.stats_updated = time.perf_counter()
+        self.txt_stats = self.canvas.create_text(self.width - 10, 10, text="", anchor="ne", font=("Consolas", 10),
+                                                 fill="white", state="hidden")
+
+    def on_key_press(self, event):
+        if event.keysym.lower() in self.pressed_keys: self.pressed_keys[event.keysym.lower()] = True
+
+    def on_key_release(self, event):
+        if event.keysym.lower() in self.pressed_keys: self.pressed_keys[event.keysym.lower()] = False
+
+    def toggle_stats(self, event=None):
+        self.show_stats = not self.show_stats
+        self.canvas.itemconfig(self.txt_stats, state="normal" if self.show_stats else "hidden")
+
+    def game_loop(self):
+        start = time.perf_counter()
+        # Valódi eltelt idő; egy hosszú akadás (pl. ablak mozgatás) ne teleportáljon
+        dt = min(start - self.last_frame, 0.1)
+        self.last_frame = start
+
+        game = self.game
+        game.step(dt, self.pressed_keys['d'] - self.pressed_keys['a'])
+        self.draw()
+
+        if game.status == "win":
+            messagebox.showinfo("Siker", "Tiszta vagy!")
+            self.on_finish()
+            return
+        if game.status == "lose":
+            messagebox.showerror("Vége", "Leesett a szappan!")
+            self.on_finish()
+            return
+
+        self.record_frame(time.perf_counter() - start)
+        self.root.after(game.config.tick_ms, self.game_loop)
+
+    def draw(self):
+        game, canvas = self.game, self.canvas
+        soaps, drawn_y = game.soaps, self.drawn_y
+        if game.player_x != self.drawn_x:
+            canvas.move(self.player, game.player_x - self.drawn_x, 0)
+            self.drawn_x = game.player_x
+        for item in game.caught:
+            canvas.delete(item)
+        if game.caught:
+            canvas.itemconfig(self.txt_score, text=f"Szappanok: {game.score} / {game.config.win_score}")
+        for i in game.spawned:
+            x, y = soaps.x[i], soaps.y[i]
+            soaps.item[i] = canvas.create_image(x, y, image=self.img_soap, anchor="center") if self.img_soap \
+                else canvas.create_oval(x - 15, y - 10, x + 15, y + 10, fill="pink")
+            drawn_y[i] = y
+        for i in soaps.active:
+            dy = soaps.y[i] - drawn_y[i]
+            if dy:
+                canvas.move(soaps.item[i], 0, dy)
+                drawn_y[i] = soaps.y[i]
+
+    def record_frame(self, elapsed):
+        self.frame_times.append(elapsed)
+        now = time.perf_counter()
+        if now - self.stats_updated < 0.25: return
+        if self.show_stats:
+            avg = sum(self.frame_times) / len(self.frame_times)
+            fps = len(self.frame_times) / (now - self.stats_updated)
+            worst = max(self.frame_times)
+            self.canvas.itemconfig(self.txt_stats, text=f"keret: {avg * 1000:.2f} ms (max {worst * 1000:.2f}) / "
+                                                        f"{self.game.config.tick_ms} ms\n{fps:.0f} FPS, "
+                                                        f"{len(self.game.soaps)} szappan")
+        self.frame_times.clear()
+        self.stats_updated = now
+
+
+def card_label(card):
+    return f"{TYPE_ICONS.get(card.type, '💨')} {card.name} ({card.base_dmg}/{card.max_hp})"
+
+
+# --- VIRTUÁLIS LISTA ---
+
+class VirtualList:
+    # Listbox egy CardListModel fölött, amely csak a látható sorokat tartalmazza: a görgetés és a
+    # beszúrás/törlés diffek is csak a képernyőn lévő néhány sort rajzolják újra.
+    def __init__(self, parent, model, **listbox_opts):
+        self.model = model
+        self.top = 0
+        self.visible = 20
+
+        frame = tk.Frame(parent, bg=BG_COLOR)
+        frame.pack(fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox = tk.Listbox(frame, activestyle="none", **listbox_opts)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.line_height = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace") + 1
+
+        self.listbox.bind("<Configure>", self.on_resize)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.listbox.bind(seq, self.on_wheel)
+
+    def bind_double_click(self, callback):
+        def on_double(e):
+            row = self.selected_row()
+            if row is not None: callback(row)
+        self.listbox.bind('<Double-1>', on_double)
+
+    def selected_row(self):
+        sel = self.listbox.curselection()
+        if not sel or self.top + sel[0] >= len(self.model): return None
+        return self.top + sel[0]
+
+    def on_resize(self, e):
+        self.visible = max(1, e.height // self.line_height)
+        self.render()
+
+    def on_scroll(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.model)))
+        elif args[0] == "scroll":
+            self.scroll_to(self.top + int(args[1]) * (self.visible if args[2] == "pages" else 1))
+
+    def on_wheel(self, e):
+        self.scroll_to(self.top + (-3 if e.num == 4 or e.delta > 0 else 3))
+        return "break"
+
+    def scroll_to(self, top):
+        self.top = top
+        self.render()
+
+    def render(self):
+        n = len(self.model)
+        self.top = max(0, min(self.top, n - self.visible))
+        end = min(n, self.top + self.visible)
+        self.listbox.delete(0, tk.END)
+        if end > self.top:
+            self.listbox.insert(tk.END, *(card_label(c) for c in self.model.cards(self.top, end)))
+        if n:
+            self.scrollbar.set(self.top / n, end / n)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def inserted(self, row):
+        if row is None: return
+        # A látható sorok fölé szúrt lap ne tolja el a nézetet
+        if row < self.top: self.top += 1
+        self.render()
+
+    def deleted(self, row):
+        if row < self.top: self.top -= 1
+        self.render()
+
+
+# --- HARCI KÁRTYA NÉZET ---
+
+class CardView:
+    # Megtartott kártya widget egy arénahelyen: lépésenként csak a változott mezők frissülnek
+    # (HP felirat, csík), a teljes kártya csak új lap (p_idx/e_idx lépés) esetén épül újra.
+    def __init__(self, slot, caption, caption_color, defeated_text):
+        self.slot = slot
+        self.caption = caption
+        self.caption_color = caption_color
+        self.defeated_text = defeated_text
+        self.idx = None
+        self.hp = None
+        self.card_frame = self.lbl_hp = self.pb = None
+
+    def show(self, idx, card):
+        if idx != self.idx:
+            self.rebuild(idx, card)
+        if card is None: return
+        if card.current_hp != self.hp:
+            self.hp = card.current_hp
+            self.lbl_hp.config(text=f"❤ {card.current_hp}/{card.max_hp}")
+            self.pb.config(value=card.current_hp)
+
+    def rebuild(self, idx, card):
+        for w in self.slot.winfo_children(): w.destroy()
+        self.idx, self.hp = idx, None
+        if card is None:
+            tk.Label(self.slot, text=self.defeated_text, font=("Segoe UI", 16, "bold"), bg=BG_COLOR,
+                     fg="#7f8c8d").pack()
+            return
+
+        type_color = TYPE_COLORS.get(normalize_text(card.type), TYPE_COLORS["default"])
+        self.card_frame = tk.Frame(self.slot, bg="#f39c12", padx=3, pady=3)
+        self.card_frame.pack()
+
+        inner = tk.Frame(self.card_frame, bg=CARD_BG, width=180, height=250)
+        inner.pack_propagate(False)
+        inner.pack()
+
+        tk.Label(inner, text=card.type.upper(), bg=type_color, fg="white", font=("Segoe UI", 10, "bold")).pack(fill="x")
+
+        tk.Label(inner, text=TYPE_ICONS.get(card.type, "💨"), bg=CARD_BG, fg=type_color, font=("Segoe UI", 40)).pack(pady=20)
+
+        tk.Label(inner, text=card.name, bg=CARD_BG, fg="white", font=("Cinzel", 12, "bold"), wraplength=160).pack()
+
+        stats_frame = tk.Frame(inner, bg=CARD_BG)
+        stats_frame.pack(side="bottom", fill="x", pady=5)
+
+        tk.Label(stats_frame, text=f"⚔ {card.base_dmg}", bg=CARD_BG, fg="#e74c3c", font=("Segoe UI", 12, "bold")).pack(
+            side="left", padx=15)
+        self.lbl_hp = tk.Label(stats_frame, bg=CARD_BG, fg="#2ecc71", font=("Segoe UI", 12, "bold"))
+        self.lbl_hp.pack(side="right", padx=15)
+
+        self.pb = ttk.Progressbar(self.slot, length=180, maximum=card.max_hp)
+        self.pb.pack(pady=5)
+        tk.Label(self.slot, text=self.caption, bg=BG_COLOR, fg=self.caption_color, font=("Segoe UI", 10, "bold")).pack()
+
+
+# --- HÁTTÉRMUNKA ---
+
+class BackgroundJob:
+    # func(cancelled) egy háttérszálon fut, a Tk szál root.after-rel kérdezi le; a kész eredmény az
+    # on_done-hoz kerül (a Tk szálon). cancel() után az eredmény eldobódik, a func pedig a cancelled
+    # (threading.Event) alapján korábban is kiszállhat.
+    def __init__(self, root, func, on_done, on_error=None):
+        self.root = root
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = threading.Event()
+        self.result = self.error = None
+        self.thread = threading.Thread(target=self.run, args=(func,), daemon=True)
+        self.thread.start()
+        self.poll_job = root.after(BACKGROUND_POLL_MS, self.poll)
+
+    def run(self, func):
+        try:
+            self.result = func(self.cancelled)
+        except Exception as e:
+            self.error = e
+
+    def poll(self):
+        if self.thread.is_alive():
+            self.poll_job = self.root.after(BACKGROUND_POLL_MS, self.poll)
+            return
+        self.poll_job = None
+        if self.cancelled.is_set(): return
+        if self.error is None:
+            self.on_done(self.result)
+        elif self.on_error:
+            self.on_error(self.error)
+        else:
+            print(f"Hiba a hatterszamitasban: {self.error}")
+
+    def cancel(self):
+        self.cancelled.set()
+        if self.poll_job is not None:
+            self.root.after_cancel(self.poll_job)
+            self.poll_job = None
+
+
+def frozen_cards(cards):
+    # Saját másolat a háttérszálnak: a Tk szál közben jutalmazhatja (módosíthatja) az eredeti lapokat
+    return [Card(c.name, c.base_dmg, c.max_hp, c.original_type_str) for c in cards]
+
+
+def stats_key(cards):
+    return tuple((c.name, c.base_dmg, c.max_hp, c.type_id) for c in cards)
+
+
+# --- GUI IMPLEMENTÁCIÓ ---
+
+class App:
+    def __init__(self, root, cli_args, seed=None):
+        self.root = root
+        self.root.title("Damareen - II. Forduló")
+        self.root.geometry("1100x750")
+        self.root.configure(bg=BG_COLOR)
+
+        # Stílus konfiguráció
+        self.style = ttk.Style()
+        self.style.theme_use('clam')
+        self.style.configure("TFrame", background=BG_COLOR)
+        self.style.configure("TLabel", background=BG_COLOR, foreground=TEXT_COLOR, font=("Segoe UI", 10))
+        self.style.configure("Title.TLabel", background=BG_COLOR, foreground="#f39c12", font=("Cinzel", 36, "bold"))
+        self.style.configure("Header.TLabel", font=("Segoe UI", 14, "bold"))
+        self.style.configure("TButton", font=("Segoe UI", 10, "bold"), padding=6)
+
+        # Egy gyökér folyam (--seed), ebből harconként / minigame-enként külön ágak
+        self.rng = RngStream(seed)
+        self.quote_rng = self.rng.split("kobold")
+        self.battle_count = 0
+        self.minigame_count = 0
+        self.last_replay = None
+        # Esélybecslés: (pakli, kazamata, nehézség) szerinti gyorsítótár, késleltetett indítás, háttérszál
+        self.odds_cache = {}
+        self.odds_after = None
+        self.odds_job = None
+        self.suggest_job = None
+
+        self.game_state = GameState()
+        # A mentés oda kerül, ahonnan a játék betöltődött
+        self.save_path = DEFAULT_WORLD_FILE
+        if not self.game_state.load_from_file(DEFAULT_WORLD_FILE):
+            self.game_state.create_default_world()
+        self.setup_main_menu()
+
+    def clear_window(self):
+        self.cancel_odds()
+        if self.suggest_job is not None:
+            self.suggest_job.cancel()
+            self.suggest_job = None
+        for widget in self.root.winfo_children(): widget.destroy()
+
+    def setup_main_menu(self):
+        self.clear_window()
+        frame = ttk.Frame(self.root)
+        frame.place(relx=0.5, rely=0.5, anchor="center")
+
+        ttk.Label(frame, text="DAMAREEN", style="Title.TLabel").pack(pady=30)
+
+        diff_frame = ttk.LabelFrame(frame, text=" Játék Beállítások ", padding=15)
+        diff_frame.pack(pady=20, fill="x")
+
+        row1 = ttk.Frame(diff_frame)
+        row1.pack(fill="x", pady=5)
+        ttk.Label(row1, text="Nehézségi Szint (0-10):").pack(side="left", padx=5)
+        self.diff_var = tk.IntVar(value=self.game_state.difficulty)
+        tk.Spinbox(row1, from_=0, to=10, textvariable=self.diff_var, width=5, font=("Segoe UI", 12)).pack(side="right")
+
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(pady=10)
+
+        ttk.Button(btn_frame, text="Kaland Indítása", command=self.start_game_ui, width=20).pack(pady=5)
+        ttk.Button(btn_frame, text="Játék Mentése", command=self.save_game, width=20).pack(pady=5)
+        ttk.Button(btn_frame, text="Játék Betöltése", command=self.load_game, width=20).pack(pady=5)
+
+        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=15)
+        ttk.Button(frame, text="🛁 FÜRDÉS MINIGAME 🛁", command=self.start_minigame,
+                   width=25).pack(pady=5)
+        ttk.Button(frame, text="Kilépés", command=self.root.quit, width=20).pack(pady=15)
+
+    def start_minigame(self):
+        self.minigame_count += 1
+        BathMinigame(self.root, self.setup_main_menu, rng=self.rng.split("furdes", self.minigame_count))
+
+    def save_game(self):
+        # Csak a legutóbbi mentés óta történt változások kerülnek a naplóba
+        self.game_state.save_incremental(self.save_path)
+
+    def load_game(self):
+        f = filedialog.askopenfilename(filetypes=[("JSON", "*.json"), ("Damareen binaris", "*.dwb")])
+        if f and self.game_state.load_from_file(f):
+            self.save_path = f
+            self.diff_var.set(self.game_state.difficulty)
+            messagebox.showinfo("Infó", "Játék sikeresen betöltve!")
+
+    def start_game_ui(self):
+        self.game_state.difficulty = self.diff_var.get()
+        self.setup_hub()
+
+    def setup_hub(self):
+        self.clear_window()
+
+        header = ttk.Frame(self.root, padding=10)
+        header.pack(fill="x")
+        ttk.Button(header, text="⬅ Vissza a Menübe", command=self.setup_main_menu).pack(side="left")
+        ttk.Label(header, text="Kártya Hub", style="Header.TLabel").pack(side="left", padx=20)
+
+        content = ttk.Frame(self.root, padding=10)
+        content.pack(expand=True, fill="both")
+
+        content.columnconfigure(0, weight=1)
+        content.columnconfigure(1, weight=1)
+        content.columnconfigure(2, weight=1)
+        content.rowconfigure(0, weight=1)
+
+        lf_coll = ttk.LabelFrame(content, text=" Gyűjteményed ", padding=10)
+        lf_coll.grid(row=0, column=0, sticky="nsew", padx=5)
+
+        filter_row = ttk.Frame(lf_coll)
+        filter_row.pack(fill="x", pady=(0, 2))
+        self.filter_name = tk.StringVar()
+        ttk.Entry(filter_row, textvariable=self.filter_name, width=14).pack(side="left", fill="x", expand=True)
+        self.filter_type = tk.StringVar(value="mind")
+        ttk.Combobox(filter_row, textvariable=self.filter_type, values=["mind", "tuz", "viz", "fold", "levego"],
+                     state="readonly", width=7).pack(side="left", padx=2)
+        stats_row = ttk.Frame(lf_coll)
+        stats_row.pack(fill="x", pady=(0, 5))
+        self.filter_dmg, self.filter_hp = tk.StringVar(value="0"), tk.StringVar(value="0")
+        for text, var in (("⚔ ≥", self.filter_dmg), ("❤ ≥", self.filter_hp)):
+            ttk.Label(stats_row, text=text).pack(side="left")
+            tk.Spinbox(stats_row, from_=0, to=999, textvariable=var, width=4).pack(side="left", padx=(2, 6))
+        self.sort_var = tk.StringVar(value="Sorrend")
+        ttk.Combobox(stats_row, textvariable=self.sort_var, values=list(SORT_LABELS), state="readonly",
+                     width=8).pack(side="right")
+        for var in (self.filter_name, self.filter_type, self.filter_dmg, self.filter_hp, self.sort_var):
+            var.trace_add("write", lambda *a: self.apply_filter())
+
+        self.coll_model = CardListModel()
+        self.coll_view = VirtualList(lf_coll, self.coll_model, bg="#34495e", fg="white", font=("Consolas", 10),
+                                     selectbackground="#e67e22")
+        self.coll_view.bind_double_click(self.add_to_deck)
+        ttk.Label(lf_coll, text="(Dupla klikk: Hozzáadás)", font=("Segoe UI", 8)).pack(anchor="e")
+
+        lf_deck = ttk.LabelFrame(content, text=" Aktív Pakli ", padding=10)
+        lf_deck.grid(row=0, column=1, sticky="nsew", padx=5)
+
+        # A pakli sorrendje számít: beszúrási sorrend, szűrés nélkül (sor index = pakli index)
+        self.deck_model = CardListModel()
+        self.deck_view = VirtualList(lf_deck, self.deck_model, bg="#2c3e50", fg="#2ecc71", font=("Consolas", 10),
+                                     selectbackground="#c0392b")
+        self.deck_view.bind_double_click(self.remove_from_deck)
+        self.lbl_deck_info = ttk.Label(lf_deck, text="0 lap", font=("Segoe UI", 8))
+        self.lbl_deck_info.pack(anchor="e")
+
+        lf_dung = ttk.LabelFrame(content, text=" Kazamaták ", padding=10)
+        lf_dung.grid(row=0, column=2, sticky="nsew", padx=5)
+
+        self.dungeon_list = tk.Listbox(lf_dung, bg="#2c3e50", fg="#f1c40f", font=("Segoe UI", 11),
+                                       selectbackground="#8e44ad")
+        self.dungeon_list.pack(fill="both", expand=True)
+        self.dungeon_list.bind('<<ListboxSelect>>', self.on_dungeon_select)
+        self.selected_dungeon = None
+        for d in self.game_state.dungeons:
+            rew = f"Jutalom: {d.reward_type}" if d.reward_type else "Jutalom: Új lap"
+            self.dungeon_list.insert(tk.END, f"{d.name} ({d.type_id}) - {rew}")
+
+        action_bar = ttk.Frame(self.root, padding=20)
+        action_bar.pack(fill="x")
+        self.lbl_odds = ttk.Label(action_bar, text="", font=("Segoe UI", 10))
+        self.lbl_odds.pack(pady=(0, 8))
+        ttk.Button(action_bar, text="⚔ HARC INDÍTÁSA ⚔", command=self.start_battle, width=30).pack()
+        self.btn_suggest = ttk.Button(action_bar, text="🧠 Pakli Javaslat", command=self.suggest_deck, width=30)
+        self.btn_suggest.pack(pady=5)
+        ttk.Button(action_bar, text="🎞 Utolsó Harc Visszajátszása", command=self.show_replay, width=30).pack()
+
+        self.refresh_lists()
+
+    def refresh_lists(self):
+        # Teljes újraépítés; a hozzáadás/eltávolítás diffekkel frissít (add_to_deck, remove_from_deck)
+        self.coll_model.reset(self.game_state.player_collection)
+        self.deck_model.reset(self.game_state.player_deck)
+        self.coll_view.render()
+        self.deck_view.render()
+        self.deck_changed()
+
+    def apply_filter(self):
+        def number(var):
+            try:
+                return int(var.get())
+            except ValueError:
+                return 0
+
+        type_name = self.filter_type.get()
+        self.coll_model.set_sort(SORT_LABELS[self.sort_var.get()])
+        self.coll_model.set_filter(CardFilter(self.filter_name.get(), None if type_name == "mind" else type_name,
+                                              number(self.filter_dmg), number(self.filter_hp)))
+        self.coll_view.scroll_to(0)
+
+    def deck_changed(self):
+        limit = math.ceil(len(self.game_state.player_collection) / 2)
+        curr = len(self.game_state.player_deck)
+        self.lbl_deck_info.config(text=f"Pakli mérete: {curr} / {limit}")
+        self.update_odds()
+
+    def on_dungeon_select(self, e):
+        sel = self.dungeon_list.curselection()
+        if sel:
+            self.selected_dungeon = self.game_state.dungeons[sel[0]]
+            self.update_odds()
+
+    def update_odds(self):
+        # A becslés háttérszálon fut; az előző (már érvénytelen) kérés törlődik
+        self.cancel_odds()
+        if not self.game_state.player_deck or self.selected_dungeon is None:
+            self.lbl_odds.config(text="Győzelmi esély: válassz paklit és kazamatát")
+            return
+        d = self.selected_dungeon
+        deck = frozen_cards(self.game_state.player_deck)
+        dungeon = Dungeon(d.type_id, d.name, frozen_cards(d.cards), d.leader and frozen_cards([d.leader])[0],
+                          d.reward_type)
+        difficulty = self.game_state.difficulty
+        # A kulcsban a statok is: jutalom után ugyanaz a nevű pakli más esélyt ad
+        key = (stats_key(deck), stats_key(dungeon.cards + [dungeon.leader] * bool(dungeon.leader)), difficulty)
+        est = self.odds_cache.get(key)
+        if est is not None:
+            self.show_odds(est)
+            return
+        self.lbl_odds.config(text="Győzelmi esély: számolás…")
+        self.odds_after = self.root.after(ODDS_DELAY_MS, lambda: self.start_odds(key, deck, dungeon, difficulty))
+
+    def start_odds(self, key, deck, dungeon, difficulty):
+        self.odds_after = None
+
+        def done(est):
+            self.odds_job = None
+            if len(self.odds_cache) >= ODDS_CACHE_SIZE:
+                del self.odds_cache[next(iter(self.odds_cache))]
+            self.odds_cache[key] = est
+            self.show_odds(est)
+
+        # Rögzített seed: ugyanarra a paklira mindig ugyanazt mutatjuk
+        self.odds_job = BackgroundJob(self.root, lambda cancelled: estimate_win_probability(
+            deck, dungeon, difficulty, seed=0, max_fights=2000, tolerance=0.02, cancelled=cancelled), done)
+
+    def cancel_odds(self):
+        if self.odds_after is not None:
+            self.root.after_cancel(self.odds_after)
+            self.odds_after = None
+        if self.odds_job is not None:
+            self.odds_job.cancel()
+            self.odds_job = None
+
+    def show_odds(self, est):
+        if est.probability is None:
+            self.lbl_odds.config(text="Győzelmi esély: a harc nem dőlne el")
+        elif est.exact:
+            self.lbl_odds.config(text=f"Győzelmi esély: {est.probability:.0%}, körök: {est.expected_turns:.0f}")
+        else:
+            self.lbl_odds.config(text=f"Győzelmi esély: {est.probability:.0%} "
+                                      f"({est.low:.0%}–{est.high:.0%}), várható körök: {est.expected_turns:.1f}")
+
+    def add_to_deck(self, row):
+        limit = math.ceil(len(self.game_state.player_collection) / 2)
+        if len(self.game_state.player_deck) >= limit:
+            messagebox.showwarning("Tele a pakli", f"Maximum {limit} kártyát vihetsz magaddal!")
+            return
+        card = self.coll_model.card_at(row)
+        self.game_state.player_deck.append(card)
+        self.deck_view.inserted(self.deck_model.insert(card))
+        self.deck_changed()
+
+    def remove_from_deck(self, row):
+        del self.game_state.player_deck[row]
+        self.deck_view.deleted(self.deck_model.delete(row))
+        self.deck_changed()
+
+    def suggest_deck(self):
+        sel = self.dungeon_list.curselection()
+        if not sel: return messagebox.showerror("Hiba", "Válassz kazamatát!")
+        d = self.game_state.dungeons[sel[0]]
+        # Nagy gyűjteménynél a keresés másodpercekig tarthat: háttérszálon, a gomb közben tiltva
+        collection = self.game_state.player_collection
+        frozen = frozen_cards(collection)
+        originals = {id(c): orig for c, orig in zip(frozen, collection)}
+        dungeon = Dungeon(d.type_id, d.name, frozen_cards(d.cards), d.leader and frozen_cards([d.leader])[0],
+                          d.reward_type)
+
+        def done(results):
+            self.suggest_finished()
+            for r in results:
+                r.deck = [originals[id(c)] for c in r.deck]
+            self.show_suggestions(results)
+
+        def failed(error):
+            self.suggest_finished()
+            messagebox.showerror("Hiba", f"A pakli javaslat nem sikerült: {error}")
+
+        self.btn_suggest.config(state="disabled", text="🧠 Keresés…")
+        self.suggest_job = BackgroundJob(self.root, lambda cancelled: optimize_deck(
+            frozen, dungeon, top_k=3, cancelled=cancelled), done, failed)
+
+    def suggest_finished(self):
+        self.suggest_job = None
+        self.btn_suggest.config(state="normal", text="🧠 Pakli Javaslat")
+
+    def show_suggestions(self, results):
+        if not results: return messagebox.showinfo("Pakli Javaslat", "Ebből a gyűjteményből nem áll össze pakli.")
+
+        # A javaslat nehézség nélkül számol; magasabb szinten a kazamata erősebben üt
+        lines = []
+        for i, r in enumerate(results, 1):
+            outcome = "győzelem" if r.wins else "vereség"
+            lines.append(f"{i}. {', '.join(c.name for c in r.deck)}\n    {outcome}, különbség: {r.margin:+d}")
+        if messagebox.askyesno("Pakli Javaslat", "\n".join(lines) + "\n\nBeállítod az elsőt aktív paklinak?"):
+            self.game_state.player_deck = list(results[0].deck)
+            self.refresh_lists()
+
+    def start_battle(self):
+        if not self.game_state.player_deck: return messagebox.showerror("Hiba", "Üres paklival nem indulhatsz csatába!")
+        sel = self.dungeon_list.curselection()
+        if not sel: return messagebox.showerror("Hiba", "Válassz kazamatát!")
+        dungeon = self.game_state.dungeons[sel[0]]
+
+        if dungeon.type_id == "nagy" and self.game_state.first_unowned_card() is None:
+            return messagebox.showinfo("Mester", "Már mindent megtanultál, amit ettől a kazamatától lehet!")
+
+        self.setup_battle_ui(dungeon)
+
+    def show_replay(self):
+        rep = self.last_replay
+        if rep is None: return messagebox.showinfo("Visszajátszás", "Még nem volt harc ebben a játékban.")
+
+        win = tk.Toplevel(self.root, bg=BG_COLOR)
+        win.title(f"Visszajátszás - {rep.dungeon_name}")
+        lbl_state = ttk.Label(win, text="", font=("Consolas", 10))
+        lbl_state.pack(fill="x", padx=10, pady=5)
+        text = tk.Text(win, height=12, width=80, bg="#222", fg="#ecf0f1", font=("Consolas", 9))
+        text.pack(fill="both", expand=True, padx=10)
+
+        def show_turn(value):
+            # Ugrás a legközelebbi pillanatképtől: a harcot nem kell újrafuttatni
+            turn = int(float(value))
+            state = rep.seek(turn)
+            lines = []
+            for label, cards, idx, hp in (("Kazamata", rep.enemies, state.e_idx, rep.enemy_hp),
+                                          ("Te", rep.players, state.p_idx, rep.player_hp)):
+                card = f"{cards[idx].name} ({hp(state, idx)}/{cards[idx].max_hp})" if idx < len(cards) else "—"
+                lines.append(f"{label}: {idx + 1}/{len(cards)}. lap {card}")
+            lbl_state.config(text="\n".join(lines))
+            text.delete("1.0", tk.END)
+            rep.play(lambda *e: text.insert(tk.END, self.format_log(*e) + "\n"), turn, turn + 1)
+
+        tk.Scale(win, from_=1, to=max(1, rep.final_turn), orient="horizontal", label="Kör", command=show_turn,
+                 bg=BG_COLOR, fg=TEXT_COLOR, highlightthickness=0).pack(fill="x", padx=10, pady=5)
+        show_turn(1)
+
+    # --- ÚJ HARC FELÜLET ELEMEI ---
+
+    def setup_battle_ui(self, dungeon):
+        self.clear_window()
+
+        self.battle_count += 1
+        self.battle_engine = BattleEngine(self.game_state.player_deck, dungeon, self.game_state.difficulty,
+                                          self.log_battle, is_game_mode=True,
+                                          rng=self.rng.split("harc", self.battle_count))
+        self.battle_recorder = ReplayRecorder(self.battle_engine)
+
+        # 1. Felső Sáv: Infó és A KOBOLD (ÚJ)
+        top_frame = tk.Frame(self.root, bg="#2c3e50")
+        top_frame.pack(fill="x", pady=10)
+
+        tk.Label(top_frame, text=f"Helyszín: {dungeon.name}", font=("Cinzel", 20, "bold"), bg="#2c3e50",
+                 fg="white").pack()
+
+        # A RÉSZEG KOBOLD KOMMENTÁTOR HELYE
+        self.lbl_kobold = tk.Label(top_frame, text="Kobold: 'Hukk! Kezdődjön a mészárlás!'",
+                                   font=("Segoe UI", 14, "italic"), bg="#2c3e50", fg="#00ff00")
+        self.lbl_kobold.pack(pady=5)
+
+        # 2. Középső Aréna: Ellenség vs Játékos
+        self.arena_frame = tk.Frame(self.root, bg=BG_COLOR)
+        self.arena_frame.pack(expand=True, fill="both", padx=20)
+
+        self.arena_frame.columnconfigure(0, weight=1)  # Enemy
+        self.arena_frame.columnconfigure(1, weight=0)  # VS
+        self.arena_frame.columnconfigure(2, weight=1)  # Player
+
+        self.enemy_slot = tk.Frame(self.arena_frame, bg=BG_COLOR)
+        self.enemy_slot.grid(row=0, column=0)
+
+        tk.Label(self.arena_frame, text="VS", font=("Cinzel", 30, "bold"), bg=BG_COLOR, fg="#e74c3c").grid(row=0,
+                                                                                                           column=1,
+                                                                                                           padx=20)
+
+        self.player_slot = tk.Frame(self.arena_frame, bg=BG_COLOR)
+        self.player_slot.grid(row=0, column=2)
+
+        self.enemy_view = CardView(self.enemy_slot, "ELLENSÉG", "#e74c3c", "☠ LEGYŐZVE ☠")
+        self.player_view = CardView(self.player_slot, "TE", "#3498db", "☠ KIESTÉL ☠")
+
+        # 3. Alsó Sáv: Log és Gombok
+        bottom_frame = ttk.Frame(self.root, padding=10)
+        bottom_frame.pack(fill="x", side="bottom")
+
+        log_frame = ttk.LabelFrame(bottom_frame, text=" Harci Napló ")
+        log_frame.pack(fill="x", pady=5)
+        self.log_text = tk.Text(log_frame, height=6, bg="#222", fg="#ecf0f1", font=("Consolas", 9))
+        self.log_text.pack(fill="x")
+
+        self.btn_next = ttk.Button(bottom_frame, text="KÖVETKEZŐ KÖR >>", command=self.next_turn)
+        self.btn_next.pack(fill="x", pady=5, ipady=5)
+        self.btn_auto = ttk.Button(bottom_frame, text="▶ AUTOMATIKUS LEJÁTSZÁS", command=self.toggle_autoplay)
+        self.btn_auto.pack(fill="x")
+        self.autoplay_job = None
+
+        self.update_ui()
+
+    @staticmethod
+    def format_log(action, turn, owner, card, target, dmg):
+        owner_str = "KAZAMATA" if owner == "kazamata" else "TE"
+        msg = f"[{turn}. Kör] {owner_str}: {card.name}"
+        if action == "attack":
+            msg += f" megtámadja {target.name}-t. Sebzés: {dmg}"
+        elif action == "play":
+            msg += " harcba lép."
+        return msg
+
+    def log_battle(self, action, turn, owner, card, target, dmg):
+        msg = self.format_log(action, turn, owner, card, target, dmg)
+        kobold_text = ""
+
+        if action == "attack":
+            # KOBOLD REAGÁL A TÁMADÁSRA
+            kobold_text = self.quote_rng.choice(KOBOLD_QUOTES_ATTACK)
+        elif action == "play":
+            # KOBOLD REAGÁL A KIJÁTSZÁSRA
+            kobold_text = self.quote_rng.choice(KOBOLD_QUOTES_PLAY)
+
+        self.log_text.insert(tk.END, msg + "\n")
+        self.log_text.see(tk.END)
+
+        # Frissítjük a Kobold szövegét
+        if self.lbl_kobold:
+            self.lbl_kobold.config(text=f"Kobold: '{kobold_text}'")
+
+    def update_ui(self):
+        be = self.battle_engine
+        ec = be.enemy_deck[be.e_idx] if be.e_idx < len(be.enemy_deck) else None
+        pc = be.player_deck[be.p_idx] if be.p_idx < len(be.player_deck) else None
+        self.enemy_view.show(be.e_idx, ec)
+        self.player_view.show(be.p_idx, pc)
+
+    def next_turn(self):
+        if self.battle_engine.battle_over:
+            self.stop_autoplay()
+            # A felvétel a jutalom előtt zárul, hogy a jutalmazott lap harc előtti statjait őrizze
+            self.last_replay = self.battle_recorder.finish()
+            if self.battle_engine.winner == "player":
+                self.apply_reward()
+                messagebox.showinfo("Győzelem", "Gratulálok! Diadalmaskodtál a kazamatában!")
+            else:
+                messagebox.showinfo("Vereség", "Sajnos alulmaradtál. Próbáld újra!")
+            self.setup_hub()
+            return
+
+        self.battle_engine.step()
+        self.update_ui()
+        if self.battle_engine.battle_over:
+            self.stop_autoplay()
+            self.btn_next.config(text="HARC VÉGE - Vissza a térképre")
+            self.lbl_kobold.config(text="Kobold: 'Na, vége a mókának. Ki fizet?'")
+
+    # --- AUTOMATIKUS LEJÁTSZÁS ---
+
+    def toggle_autoplay(self):
+        if self.autoplay_job is not None:
+            self.stop_autoplay()
+        elif not self.battle_engine.battle_over:
+            self.btn_auto.config(text="⏸ SZÜNET")
+            self.autoplay_deadline = time.perf_counter()
+            self.autoplay_frame()
+
+    def autoplay_frame(self):
+        self.next_turn()
+        if self.battle_engine.battle_over: return
+        # Abszolút ütemezés: egy lassabb képkocka nem tolja el a következőket
+        self.autoplay_deadline += AUTOPLAY_FRAME_MS / 1000
+        delay = max(0, round((self.autoplay_deadline - time.perf_counter()) * 1000))
+        self.autoplay_job = self.root.after(delay, self.autoplay_frame)
+
+    def stop_autoplay(self):
+        if self.autoplay_job is not None:
+            self.root.after_cancel(self.autoplay_job)
+            self.autoplay_job = None
+        self.btn_auto.config(text="▶ AUTOMATIKUS LEJÁTSZÁS")
+
+    def apply_reward(self):
+        be = self.battle_engine
+        if not be.player_deck: return
+        last_card_name = be.player_deck[min(be.p_idx, len(be.player_deck) - 1)].name
+        orig = self.game_state.find_in_collection(last_card_name)
+        if not orig: return
+
+        dt = be.dungeon.type_id
+        rt = be.dungeon.reward_type
+
+        if dt in ["egyszeru", "kis"]:
+            self.game_state.upgrade_card(orig, rt)
+        elif dt == "nagy":
+            c = self.game_state.first_unowned_card()
+            if c:
+                self.game_state.add_to_collection(Card(c.name, c.base_dmg, c.max_hp, c.original_type_str))
@@ -0,0 +1,141 @@
+"""Hozzafuzo naplo a vilagmentesek valtozasaihoz.
+
+A <mentes>.journal fajl elso sora a pillanatkep alairasa (meret, CRC32),
+utana soronkent egy-egy JSON rekord a ket mentes kozotti valtozasokkal. A
+naplo csak akkor ervenyes, ha az alairas egyezik a pillanatkeppel; egy
+teljes mentes ezert automatikusan ervenyteleniti a regi naplot.
+
+Tomoriteskor az uj pillanatkephez tartozo naplo elobb <naplo>.next neven
+keszul el, igy ha a ket atnevezes kozott szakad meg a program, a betoltes
+ebbol folytatja.
+"""
+import json
+import os
+import threading
+import zlib
+
+JOURNAL_SUFFIX = ".journal"
+NEXT_SUFFIX = ".next"
+
+
+def snapshot_signature(path):
+    crc = 0
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+    return [size, crc]
+
+
+class Journal:
+    def __init__(self, snapshot_path):
+        self.snapshot_path = snapshot_path
+        self.path = snapshot_path + JOURNAL_SUFFIX
+        self.lock = threading.Lock()
+        self.signature = None
+        self.size = 0
+        self.compactor = None
+
+    def reset(self):
+        """Uj, ures naplo a jelenlegi pillanatkephez."""
+        with self.lock:
+            self.signature = snapshot_signature(self.snapshot_path)
+            self._write(self.path, self.signature, [])
+            self.size = os.path.getsize(self.path)
+
+    @staticmethod
+    def _write(path, signature, record_lines):
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(json.dumps({"snapshot": signature}).encode('utf-8') + b"\n")
+            f.writelines(record_lines)
+        os.replace(tmp, path)
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n"
+        with self.lock:
+            with open(self.path, 'ab') as f:
+                f.write(line)
+            self.size += len(line)
+
+    def is_current(self):
+        """Olcso ellenorzes: a naplo es a pillanatkep meg a mienk-e."""
+        try:
+            return (self.signature is not None and os.path.getsize(self.snapshot_path) == self.signature[0]
+                    and os.path.getsize(self.path) == self.size)
+        except OSError:
+            return False
+
+    def load(self, limit=None):
+        """A naplo rekordjai (legfeljebb limit bajtig), vagy None, ha nincs vagy nem ehhez a mentelhez tartozik."""
+        if not os.path.exists(self.snapshot_path):
+            return None
+        signature = snapshot_signature(self.snapshot_path)
+        result = self._read(self.path, signature, limit)
+        if result is None:
+            # Megszakadt tömörítés: a pillanatkép már az új, a hozzá tartozó napló még .next néven van
+            result = self._read(self.path + NEXT_SUFFIX, signature, limit)
+            if result is None:
+                return None
+            os.replace(self.path + NEXT_SUFFIX, self.path)
+        records, end = result
+        self.signature = signature
+        # Félbeszakadt utolsó sor után nem fűzünk: az is_current() ekkor hamis, és teljes mentés jön
+        self.size = os.path.getsize(self.path) if limit is not None else end
+        return records
+
+    @staticmethod
+    def _read(path, signature, limit):
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return None
+        with f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                return None
+            if not isinstance(header, dict) or header.get("snapshot") != signature:
+                return None
+            records = []
+            end = f.tell()
+            for line in f:
+                if limit is not None and f.tell() > limit:
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break  # félbeszakadt utolsó sor
+                end = f.tell()
+        return records, end
+
+    def needs_compaction(self, min_size=64 * 1024, ratio=0.5):
+        return self.size > max(min_size, self.signature[0] * ratio)
+
+    def replace_snapshot(self, new_snapshot, consumed):
+        """Az uj pillanatkep a helyere kerul; a naplobol csak a consumed bajt utani rekordok maradnak.
+
+        A hivonak a lock-ot tartania kell.
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(consumed)
+            tail = f.readlines()
+        signature = snapshot_signature(new_snapshot)
+        self._write(self.path + NEXT_SUFFIX, signature, tail)
+        os.replace(new_snapshot, self.snapshot_path)
+        os.replace(self.path + NEXT_SUFFIX, self.path)
+        self.signature = signature
+        self.size = os.path.getsize(self.path)
+
+    def start_compaction(self, target):
+        """target() a hatterszalon fut; egyszerre csak egy tomorites lehet."""
+        if self.compactor and self.compactor.is_alive():
+            return
+        self.compactor = threading.Thread(target=target, daemon=True)
+        self.compactor.start()
+
+    def wait(self):
+        if self.compactor:
+            self.compactor.join()
+            self.compactor = None
@@ -0,0 +1,322 @@
+"""A furdes minigame Tk nelkul: lepesenkent futtathato modell es fej nelkuli botok.
+
+A BathGame a fizika es a szappan-letrehozas teljes allapota; a gui
+BathMinigame csak rajzolja es a billentyukbol iranyt ad neki. Igy a
+jatek tobb ezer szimulalt meneten is lefuttathato, a spawn_rate, a
+szappansebesseg es a score * 50 nehezsegi gorbe hangolasahoz.
+
+A szappanok egy fix kapacitasu, tomb-alapu keszletben (SoapPool) elnek: a
+helyek egy szabad-lista verembol kerulnek ki es oda terulnek vissza, igy a
+keret soran nincs dict/lista foglalas es nincs O(n) list.remove. Mivel a
+szappanok csak fuggolegesen esnek, az x oszlopuk a letrehozaskor eldol:
+az utkozesvizsgalat csak a jatekos x-savjaba eso racsoszlopokat nezi.
+
+Hasznalat: python minigame.py [bot ...] [--games N] [--jobs J] [--seed S]
+           [--spawn-rate MS] [--spawn-step MS] [--speed MIN MAX]
+"""
+import argparse
+import sys
+import time
+
+from rngstream import RngStream, derive_seed
+
+SOAP_CAPACITY = 64
+GRID_CELL = 64  # px, az ütközési rács oszlopszélessége
+
+
+class SoapPool:
+    def __init__(self, width, soap_w, soap_h, capacity=SOAP_CAPACITY, cell=GRID_CELL):
+        self.soap_w, self.soap_h = soap_w, soap_h
+        self.capacity = capacity
+        self.cell = cell
+        self.x = [0.0] * capacity
+        self.y = [0.0] * capacity
+        self.speed = [0.0] * capacity  # px / mp
+        self.item = [None] * capacity  # a canvas elem azonosítója
+        self.column = [0] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+        self.active = []  # aktív helyek, sorrend nem számít (törlés: csere az utolsóval)
+        self._active_pos = [-1] * capacity
+        self.columns = [set() for _ in range(int(width // cell) + 2)]
+
+    def __len__(self):
+        return len(self.active)
+
+    def spawn(self, x, y, speed, item=None):
+        """Uj szappan; a hely indexe, vagy None, ha a keszlet tele van."""
+        if not self.free: return None
+        i = self.free.pop()
+        self.x[i], self.y[i], self.speed[i], self.item[i] = x, y, speed, item
+        col = min(max(0, int(x // self.cell)), len(self.columns) - 1)
+        self.column[i] = col
+        self.columns[col].add(i)
+        self._active_pos[i] = len(self.active)
+        self.active.append(i)
+        return i
+
+    def remove(self, i):
+        pos = self._active_pos[i]
+        last = self.active.pop()
+        if last != i:
+            self.active[pos] = last
+            self._active_pos[last] = pos
+        self._active_pos[i] = -1
+        self.columns[self.column[i]].discard(i)
+        self.item[i] = None
+        self.free.append(i)
+
+    def advance(self, dt):
+        """Minden szappan esik dt masodpercnyit; a legalacsonyabb szappan felso ele."""
+        lowest = None
+        x, y, speed = self.x, self.y, self.speed
+        for i in self.active:
+            y[i] += speed[i] * dt
+            if lowest is None or y[i] > lowest:
+                lowest = y[i]
+        return None if lowest is None else lowest - self.soap_h / 2
+
+    def colliding(self, left, top, right, bottom):
+        """Az (left, top, right, bottom) dobozzal erintkezo szappanok (a hatar is erintes, mint a bbox-nal)."""
+        hw, hh = self.soap_w / 2, self.soap_h / 2
+        first = max(0, int((left - hw) // self.cell))
+        last = min(len(self.columns) - 1, int((right + hw) // self.cell))
+        hits = []
+        x, y = self.x, self.y
+        for col in range(first, last + 1):
+            for i in self.columns[col]:
+                if not (right < x[i] - hw or left > x[i] + hw or bottom < y[i] - hh or top > y[i] + hh):
+                    hits.append(i)
+        return hits
+
+
+# --- JÁTÉKMODELL ---
+
+class MinigameConfig:
+    """A minigame hangolhato parameterei; a sebessegek px / tick (tick_ms) egysegben."""
+
+    def __init__(self, width=800, height=600, player_speed=12, soap_speed=(3, 7), spawn_rate=1500, spawn_step=50,
+                 min_spawn=500, win_score=20, tick_ms=20, player_size=(40, 80), soap_size=(30, 20)):
+        self.width, self.height = width, height
+        self.player_speed = player_speed
+        self.soap_speed = soap_speed
+        self.spawn_rate = spawn_rate
+        self.spawn_step = spawn_step  # ennyi ms-mal gyorsul a spawn kifogott szappanonként
+        self.min_spawn = min_spawn
+        self.win_score = win_score
+        self.tick_ms = tick_ms
+        self.player_size = player_size
+        self.soap_size = soap_size
+
+    def spawn_interval(self, score):
+        """Ket szappan kozti ido masodpercben az adott pontszamnal."""
+        return max(self.min_spawn, self.spawn_rate - score * self.spawn_step) / 1000
+
+
+class BathGame:
+    """A minigame allapota; step(dt, irany) lepteti, status: None, "win" vagy "lose".
+
+    Lepesenkent a spawned a most letrejott szappanok helye, a caught a most
+    kifogottak item erteke (a rajzolonak); mindketto ujrahasznalt lista.
+    """
+
+    def __init__(self, config=None, rng=None):
+        self.config = cfg = config or MinigameConfig()
+        self.rng = rng if rng is not None else RngStream()
+        self.player_x, self.player_y = cfg.width // 2, cfg.height - 80
+        self.player_w, self.player_h = cfg.player_size
+        self.soaps = SoapPool(cfg.width, *cfg.soap_size)
+        self.time = 0.0
+        self.score = 0
+        self.spawn_count = 0
+        self.status = None
+        self.next_spawn = 0.0  # az első szappan azonnal jön
+        self.spawned = []
+        self.caught = []
+        self._tick_scale = 1000 / cfg.tick_ms
+
+    def step(self, dt, direction=0):
+        self.spawned.clear()
+        self.caught.clear()
+        if self.status: return
+        cfg = self.config
+        self.time += dt
+        self.player_x += direction * cfg.player_speed * dt * self._tick_scale
+
+        soaps = self.soaps
+        while self.next_spawn <= self.time:
+            x = self.rng.randint(30, cfg.width - 30)
+            speed = self.rng.randint(*cfg.soap_speed)
+            i = soaps.spawn(x, -50, speed * self._tick_scale)
+            if i is not None:
+                self.spawned.append(i)
+                self.spawn_count += 1
+            self.next_spawn += cfg.spawn_interval(self.score)
+
+        lowest = soaps.advance(dt)
+        hw, hh = self.player_w / 2, self.player_h / 2
+        for i in soaps.colliding(self.player_x - hw, self.player_y - hh, self.player_x + hw, self.player_y + hh):
+            self.score += 1
+            self.caught.append(soaps.item[i])
+            soaps.remove(i)
+            if self.score >= cfg.win_score:
+                self.status = "win"
+                return
+
+        # Ha a legalacsonyabb épp most lett kifogva, a maradékban kell keresni
+        if lowest is not None and lowest > cfg.height and any(
+                soaps.y[i] - soaps.soap_h / 2 > cfg.height for i in soaps.active):
+            self.status = "lose"
+
+
+# --- BOTOK ---
+
+def _toward(game, x):
+    # Holtsáv egy lépésnyi mozgásnyi, hogy a bot ne rezegjen a cél körül
+    dead = game.config.player_speed / 2
+    return 0 if abs(x - game.player_x) <= dead else (1 if x > game.player_x else -1)
+
+
+def bot_idle(game, rng):
+    return 0
+
+
+def bot_lowest(game, rng):
+    """A legmelyebben levo szappan ala all."""
+    soaps = game.soaps
+    if not soaps.active: return 0
+    return _toward(game, soaps.x[max(soaps.active, key=soaps.y.__getitem__)])
+
+
+def bot_urgent(game, rng):
+    """Az a szappan, amelyik a leghamarabb eri el a jatekos tetejet."""
+    soaps = game.soaps
+    top = game.player_y - game.player_h / 2
+    best, best_t = None, None
+    for i in soaps.active:
+        t = (top - soaps.y[i]) / soaps.speed[i]
+        if t > -0.05 and (best_t is None or t < best_t):
+            best, best_t = i, t
+    return 0 if best is None else _toward(game, soaps.x[best])
+
+
+def bot_random(game, rng):
+    return rng.randint(-1, 1)
+
+
+BOTS = {
+    "allo": bot_idle,
+    "legalacsonyabb": bot_lowest,
+    "surgos": bot_urgent,
+    "veletlen": bot_random,
+}
+
+
+class GameResult:
+    def __init__(self, status, score, spawned, survival, steps, step_time, worst_step):
+        self.status = status  # None: időkorlát
+        self.score = score
+        self.spawned = spawned
+        self.survival = survival  # szimulált másodperc
+        self.steps = steps
+        self.step_time = step_time  # valódi másodperc a step()-ekben összesen
+        self.worst_step = worst_step
+
+
+def play_game(bot, seed, config=None, max_time=300.0):
+    """Egy szimulalt menet fix tick lepesekkel; a bot (nev) minden tickben iranyt valaszt."""
+    policy = BOTS[bot]
+    game = BathGame(config, RngStream(derive_seed(seed, "jatek")))
+    bot_rng = RngStream(derive_seed(seed, "bot"))
+    dt = game.config.tick_ms / 1000
+    step_time = worst = 0.0
+    steps = 0
+    clock = time.perf_counter
+    while game.status is None and game.time < max_time:
+        direction = policy(game, bot_rng)
+        t0 = clock()
+        game.step(dt, direction)
+        elapsed = clock() - t0
+        step_time += elapsed
+        worst = max(worst, elapsed)
+        steps += 1
+    return GameResult(game.status, game.score, game.spawn_count, game.time, steps, step_time, worst)
+
+
+def _games_job(bot, seeds, config, max_time):
+    return [play_game(bot, s, config, max_time) for s in seeds]
+
+
+class BotSummary:
+    """Sok menet osszesitese egy botra."""
+
+    def __init__(self, bot, results):
+        n = len(results)
+        self.bot = bot
+        self.games = n
+        self.wins = sum(r.status == "win" for r in results)
+        self.mean_score = sum(r.score for r in results) / n
+        spawned = sum(r.spawned for r in results)
+        self.catch_rate = sum(r.score for r in results) / spawned if spawned else 0.0
+        self.mean_survival = sum(r.survival for r in results) / n
+        steps = sum(r.steps for r in results)
+        self.step_cost = sum(r.step_time for r in results) / steps if steps else 0.0
+        self.worst_step = max(r.worst_step for r in results)
+
+    def __str__(self):
+        return (f"{self.bot:15s} gyozelem {self.wins / self.games:6.1%}  pont {self.mean_score:5.1f}  "
+                f"elkapas {self.catch_rate:6.1%}  tuleles {self.mean_survival:6.1f} s  "
+                f"keret {self.step_cost * 1e6:5.1f} us (max {self.worst_step * 1e6:.0f})")
+
+
+def run_bots(bots, games, seed=0, config=None, jobs=1, max_time=300.0):
+    """Minden botra games menet; a k. menet seedje csak (seed, k)-tol fugg, igy jobs-tol fuggetlen."""
+    seeds = [derive_seed(seed, "furdes", k) for k in range(games)]
+    chunk = max(1, -(-games // (jobs * 4)))
+    summaries = []
+    pool = None
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        for bot in bots:
+            parts = [seeds[k:k + chunk] for k in range(0, games, chunk)]
+            if pool:
+                found = pool.map(_games_job, [bot] * len(parts), parts, [config] * len(parts),
+                                 [max_time] * len(parts))
+            else:
+                found = [_games_job(bot, p, config, max_time) for p in parts]
+            summaries.append(BotSummary(bot, [r for part in found for r in part]))
+    finally:
+        if pool:
+            pool.shutdown()
+    return summaries
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="minigame", description="Furdes minigame botokkal, Tk nelkul")
+    parser.add_argument("bots", nargs="*", help=f"botok (alapertelmezetten mind: {', '.join(BOTS)})")
+    parser.add_argument("--games", type=int, default=1000, help="menetek szama botonkent")
+    parser.add_argument("--jobs", type=int, default=1, help="parhuzamos folyamatok szama")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-time", type=float, default=300.0, help="menet idokorlat (szimulalt mp)")
+    parser.add_argument("--spawn-rate", type=int, default=1500, help="kezdo spawn ido (ms)")
+    parser.add_argument("--spawn-step", type=int, default=50, help="gyorsulas kifogott szappanonkent (ms)")
+    parser.add_argument("--min-spawn", type=int, default=500, help="legrovidebb spawn ido (ms)")
+    parser.add_argument("--speed", type=int, nargs=2, default=(3, 7), metavar=("MIN", "MAX"),
+                        help="szappan sebesseg (px / tick)")
+    args = parser.parse_args(argv)
+
+    unknown = [b for b in args.bots if b not in BOTS]
+    if unknown:
+        print(f"Ismeretlen bot: {', '.join(unknown)}")
+        return 1
+    config = MinigameConfig(spawn_rate=args.spawn_rate, spawn_step=args.spawn_step, min_spawn=args.min_spawn,
+                            soap_speed=tuple(args.speed))
+    for summary in run_bots(args.bots or list(BOTS), max(1, args.games), args.seed, config, max(1, args.jobs),
+                            args.max_time):
+        print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
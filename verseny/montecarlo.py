@@ -0,0 +1,249 @@
+"""Monte Carlo gyozelmi esely becsles jatek modu (nehezsegi szintes) harcokra.
+
+Jatek modban a BattleEngine.apply_difficulty minden tamadasnal egy
+random.random() erteket huz: a kazamata sebzese round(d * (1 + r*n/10)),
+a jatekose round(d * (1 - r*n/20)). Itt ugyanez a szabaly fut sok
+fuggetlen, seedelt harcban egyszerre ("savokban"); NumPy eseten a savok
+minden iteracioban egy vektoros huzassal lepnek. A becsles kotegenkent
+no, es leall, amint a Wilson-intervallum fele szelessege a tolerancia ala
+esik.
+
+A kotegek sajat, a seedbol es a koteg sorszamabol szarmaztatott folyamot
+kapnak, igy jobs > 1 eseten is ugyanaz az eredmeny. A seed egy backend-en
+belul reprodukalhato; a tiszta Python ag egy harcot pontosan ugyanazokkal a
+huzasokkal jatszik le, mint egy ugyanarra az RngStream-re kotott BattleEngine.
+"""
+import math
+from statistics import NormalDist
+
+from core import base_damage
+from rngstream import RngStream, derive_seed
+import simulator
+from simulator import WINNER_ENEMY, WINNER_PLAYER, WINNER_NONE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class WinEstimate:
+    """Becsles: gyozelmi valoszinuseg (Wilson-intervallummal) es a varhato korszam."""
+
+    def __init__(self, wins, decided, undecided, turns_sum, turns_sq_sum, confidence, exact=False):
+        self.wins = wins
+        self.fights = decided + undecided
+        self.decided = decided
+        self.undecided = undecided  # a támadáskorlátig el nem dőlt (elakadt) harcok
+        self.confidence = confidence
+        self.exact = exact
+        self.probability = wins / decided if decided else None
+        self.low, self.high = _wilson(wins, decided, confidence) if not exact else (self.probability,) * 2
+        self.expected_turns = turns_sum / decided if decided else None
+        if decided > 1 and not exact:
+            var = max(0.0, (turns_sq_sum - turns_sum * turns_sum / decided) / (decided - 1))
+            self.turns_stderr = math.sqrt(var / decided)
+        else:
+            self.turns_stderr = 0.0
+
+    @property
+    def half_width(self):
+        return None if self.probability is None else (self.high - self.low) / 2
+
+    def __repr__(self):
+        if self.probability is None:
+            return f"WinEstimate(nincs eldolt harc, {self.fights} harc)"
+        return (f"WinEstimate(p={self.probability:.3f} [{self.low:.3f}, {self.high:.3f}], "
+                f"korok={self.expected_turns:.1f}, {self.fights} harc)")
+
+
+def _wilson(wins, n, confidence):
+    if not n:
+        return None, None
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    p = wins / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _tables(deck, dungeon):
+    enemies = dungeon.get_full_enemy_list()
+    d_ep = [[base_damage(e, p) for e in enemies] for p in deck]
+    d_pe = [[base_damage(p, e) for e in enemies] for p in deck]
+    return d_ep, d_pe, [c.max_hp for c in deck], [c.max_hp for c in enemies]
+
+
+# --- TISZTA PYTHON MAG ---
+
+def _fight_python(tables, difficulty, draws, max_attacks):
+    """Egy harc a BattleEngine.step() sorrendjeben; (winner, turn). draws: a [0, 1) huzasok iteratora."""
+    d_ep, d_pe, p_max, e_max = tables
+    n_p, n_e = len(p_max), len(e_max)
+    p_idx = e_idx = 0
+    turn = 1
+    p_hp = p_max[0] if n_p else 0
+    e_hp = e_max[0] if n_e else 0
+    player_next = False
+    for _ in range(max_attacks):
+        if p_idx >= n_p: return WINNER_ENEMY, turn
+        if e_idx >= n_e: return WINNER_PLAYER, turn
+        if d_ep[p_idx][e_idx] <= 0 and d_pe[p_idx][e_idx] <= 0 and p_hp > 0 and e_hp > 0:
+            return WINNER_NONE, turn
+        rnd = next(draws)
+        if player_next:
+            e_hp -= int(round(d_pe[p_idx][e_idx] * (1 - (rnd * difficulty / 20))))
+            turn += 1
+            if e_hp <= 0:
+                if p_hp > 0:
+                    p_hp = min(p_max[p_idx], p_hp + 1)
+                e_idx += 1
+                e_hp = e_max[e_idx] if e_idx < n_e else 0
+            player_next = False
+        else:
+            p_hp -= int(round(d_ep[p_idx][e_idx] * (1 + (rnd * difficulty / 10))))
+            if p_hp <= 0:
+                p_idx += 1
+                p_hp = p_max[p_idx] if p_idx < n_p else 0
+                turn += 1
+            else:
+                player_next = True
+    return WINNER_NONE, turn
+
+
+def _batch_python(tables, difficulty, count, seed, max_attacks):
+    draws = RngStream(seed).draws()
+    results = [_fight_python(tables, difficulty, draws, max_attacks) for _ in range(count)]
+    return [w for w, _ in results], [t for _, t in results]
+
+
+# --- NUMPY MAG ---
+
+def _batch_numpy(tables, difficulty, count, seed, max_attacks):
+    rng = np.random.default_rng(seed)
+    d_ep, d_pe, p_max, e_max = (np.asarray(t, dtype=np.int64) for t in tables)
+    n_p, n_e = len(p_max), len(e_max)
+    # A lapok utáni 0 sor/elem: a kieső index itt "nincs lap"
+    p_max_ext = np.append(p_max, 0)
+    e_max_ext = np.append(e_max, 0)
+    d_ep = np.pad(d_ep.reshape(n_p, n_e), ((0, 1), (0, 1)))
+    d_pe = np.pad(d_pe.reshape(n_p, n_e), ((0, 1), (0, 1)))
+
+    p_idx = np.zeros(count, dtype=np.int64)
+    e_idx = np.zeros(count, dtype=np.int64)
+    p_hp = np.full(count, p_max_ext[0], dtype=np.int64)
+    e_hp = np.full(count, e_max_ext[0], dtype=np.int64)
+    turn = np.ones(count, dtype=np.int64)
+    player_next = np.zeros(count, dtype=bool)
+    winner = np.full(count, WINNER_NONE, dtype=np.int8)
+
+    active = np.arange(count)
+    for _ in range(max_attacks + 1):
+        pi, ei = p_idx[active], e_idx[active]
+        p_out = pi >= n_p
+        e_out = ~p_out & (ei >= n_e)
+        winner[active[p_out]] = WINNER_ENEMY
+        winner[active[e_out]] = WINNER_PLAYER
+        keep = ~(p_out | e_out)
+        active, pi, ei = active[keep], pi[keep], ei[keep]
+        if not active.size:
+            break
+
+        ph, eh, pn = p_hp[active], e_hp[active], player_next[active]
+        base_ep, base_pe = d_ep[pi, ei], d_pe[pi, ei]
+        # Egyik fél sem tud sebezni: a BattleEngine sosem érne véget
+        stuck = (base_ep <= 0) & (base_pe <= 0) & (ph > 0) & (eh > 0)
+        if stuck.any():
+            keep = ~stuck
+            active, pi, ei, ph, eh, pn = active[keep], pi[keep], ei[keep], ph[keep], eh[keep], pn[keep]
+            base_ep, base_pe = base_ep[keep], base_pe[keep]
+
+        rnd = rng.random(active.size)
+        dmg = np.where(pn, np.round(base_pe * (1 - (rnd * difficulty / 20))),
+                       np.round(base_ep * (1 + (rnd * difficulty / 10)))).astype(np.int64)
+        eh = np.where(pn, eh - dmg, eh)
+        ph = np.where(pn, ph, ph - dmg)
+        e_kill = pn & (eh <= 0)
+        p_kill = ~pn & (ph <= 0)
+        ph = np.where(e_kill & (ph > 0), np.minimum(p_max_ext[pi], ph + 1), ph)
+        pi = pi + p_kill
+        ei = ei + e_kill
+        p_hp[active] = np.where(p_kill, p_max_ext[pi], ph)
+        e_hp[active] = np.where(e_kill, e_max_ext[ei], eh)
+        p_idx[active], e_idx[active] = pi, ei
+        turn[active] += pn | p_kill
+        player_next[active] = ~(pn | p_kill)  # támadás után csere, ölés után a kazamata jön
+
+    return winner, turn
+
+
+def _batch_job(use_numpy, *args):
+    winners, turns = (_batch_numpy if use_numpy else _batch_python)(*args)
+    return [int(w) for w in winners], [int(t) for t in turns]
+
+
+# --- PUBLIKUS API ---
+
+def estimate_win_probability(deck, dungeon, difficulty, seed=None, max_fights=20000, tolerance=0.01,
+                             confidence=0.95, batch=512, max_attacks=100_000, use_numpy=None, jobs=1,
+                             cancelled=None):
+    """Gyozelmi esely becslese jatek modban, legfeljebb max_fights harcbol.
+
+    Kotegenkent (batch) fut, es leall, ha a Wilson-intervallum fele
+    szelessege <= tolerance. jobs > 1 eseten egyszerre jobs koteg fut kulon
+    folyamatokban; a kotegeket sorrendben ertekeljuk, a leallas utaniakat
+    eldobjuk, igy az eredmeny nem fugg a jobs-tol. Nehezseg nelkul a harc
+    determinisztikus: ekkor egyetlen pontos szimulacio az eredmeny (exact=True).
+    cancelled (threading.Event) beallitasakor a kovetkezo koteg elott a
+    reszeredmennyel (vagy None-nal) ter vissza.
+    """
+    if difficulty <= 0:
+        res = simulator.simulate(deck, dungeon, use_numpy=False)
+        w, turn = int(res.winner[0]), int(res.turn[0])
+        if w == WINNER_NONE:
+            return WinEstimate(0, 0, 1, 0, 0, confidence, exact=True)
+        return WinEstimate(int(w == WINNER_PLAYER), 1, 0, turn, turn * turn, confidence, exact=True)
+
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise RuntimeError("A NumPy nincs telepitve")
+    if seed is None:
+        seed = RngStream().seed
+    tables = _tables(deck, dungeon)
+    counts = [min(batch, max_fights - start) for start in range(0, max_fights, batch)]
+    jobs_args = [(use_numpy, tables, difficulty, count, derive_seed(seed, "mc", i), max_attacks)
+                 for i, count in enumerate(counts)]
+
+    pool = None
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=jobs)
+    wins = decided = undecided = 0
+    turns_sum = turns_sq_sum = 0
+    estimate = None
+    try:
+        for start in range(0, len(jobs_args), max(1, jobs)):
+            if cancelled is not None and cancelled.is_set():
+                return estimate
+            group = jobs_args[start:start + max(1, jobs)]
+            results = pool.map(_batch_job, *zip(*group)) if pool else (_batch_job(*a) for a in group)
+            for winners, turns in results:
+                for w, t in zip(winners, turns):
+                    if w == WINNER_NONE:
+                        undecided += 1
+                        continue
+                    decided += 1
+                    wins += w == WINNER_PLAYER
+                    turns_sum += t
+                    turns_sq_sum += t * t
+                estimate = WinEstimate(wins, decided, undecided, turns_sum, turns_sq_sum, confidence)
+                if estimate.half_width is not None and estimate.half_width <= tolerance:
+                    return estimate
+                if not decided and undecided >= batch:
+                    return estimate  # minden harc elakad: több minta sem segít
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    return estimate
@@ -0,0 +1,210 @@
+"""Pakli optimalizalo: a gyujtemeny legjobb rendezett reszhalmazai egy kazamata ellen.
+
+A harc a BattleEngine szabalyait koveti nehezseg nelkul (is_game_mode=False).
+Mivel a lapok sorban harcolnak, egy pakli-elotag hatasa csak attol fugg,
+hanyadik ellenfel all es mennyi elete maradt: a keresesi allapot ez a par
+plusz a mar felhasznalt lapok. Egy lap vegigharcolasa ebbol az allapotbol
+memoizalt, igy a sugarkereses (beam search) minden szinten csak uj
+atmeneteket szamol.
+
+Kulonbseg (margin): a jatekos megmaradt osszes eletereje (a gyoztes lap es a
+tartalekok) minusz a kazamata megmaradt eleterje; pozitiv = gyozelem.
+
+Hasznalat: python optimizer.py <mentes> [kazamata ...] [--top K] [--beam W] [--jobs N]
+"""
+import argparse
+import math
+import sys
+
+from core import base_damage, solve_duel
+
+
+def _snapshot(cards):
+    return [(c.base_dmg, c.max_hp, c.type_id) for c in cards]
+
+
+class DeckResult:
+    def __init__(self, deck, margin):
+        self.deck = deck
+        self.margin = margin
+
+    @property
+    def wins(self):
+        return self.margin > 0
+
+    def __repr__(self):
+        return f"DeckResult({[c.name for c in self.deck]}, margin={self.margin})"
+
+
+class _Stats:
+    """base_damage-hez elegendo nezet egy (sebzes, eletero, tipus) sorra."""
+    __slots__ = ("base_dmg", "type_id")
+
+    def __init__(self, row):
+        self.base_dmg = row[0]
+        self.type_id = row[2]
+
+
+class _Search:
+    def __init__(self, collection, enemies):
+        self.collection = collection  # (sebzes, eletero, tipus) sorok
+        self.enemies = enemies
+        # suffix[i]: az i. ellenféltől kezdve a teljes kazamata élet
+        self.suffix = [0] * (len(enemies) + 1)
+        for i in range(len(enemies) - 1, -1, -1):
+            self.suffix[i] = self.suffix[i + 1] + enemies[i][1]
+        self._cache = {}
+        self._pair = {}
+
+    def _damage(self, card, e_idx):
+        key = (card, e_idx)
+        dmg = self._pair.get(key)
+        if dmg is None:
+            enemy = self.enemies[e_idx]
+            atk = _Stats(card)
+            dfn = _Stats(enemy)
+            dmg = self._pair[key] = (base_damage(dfn, atk), base_damage(atk, dfn))
+        return dmg
+
+    def advance(self, card, e_idx, e_hp):
+        """Egy lap vegigharcolasa: (uj e_idx, uj e_hp, a lap megmaradt elete) vagy None, ha a harc elakad.
+
+        A lap akkor marad eletben (hp > 0), ha a kazamata elfogyott.
+        """
+        key = (card, e_idx, e_hp)
+        if key in self._cache:
+            return self._cache[key]
+        max_hp = card[1]
+        p_hp = max_hp
+        n = len(self.enemies)
+        result = None
+        while e_idx < n:
+            d_ep, d_pe = self._damage(card, e_idx)
+            # Minden párharcot a kazamata kezd
+            duel = solve_duel(d_ep, d_pe, p_hp, max_hp, e_hp, False)
+            if duel is None:
+                break  # senki sem sebez: a BattleEngine sosem érne véget
+            _, p_hp, e_hp, player_died = duel
+            if player_died:
+                result = (e_idx, e_hp, 0)
+                break
+            e_idx += 1
+            e_hp = self.enemies[e_idx][1] if e_idx < n else 0
+        else:
+            result = (n, 0, p_hp)
+        self._cache[key] = result
+        return result
+
+    def run(self, max_size, top_k, beam_width, cancelled=None):
+        n_cards = len(self.collection)
+        n_enemies = len(self.enemies)
+        hp_order = sorted(range(n_cards), key=lambda i: (-self.collection[i][1], i))
+        finished = {}
+
+        def finish(seq, used, margin_base):
+            # Győzelem után a tartalékok nem harcolnak: a legtöbb életű szabad lapokkal töltjük fel
+            reserves = [i for i in hp_order if i not in used][:max_size - len(seq)]
+            deck = tuple(seq) + tuple(reserves)
+            finished[deck] = margin_base + sum(self.collection[i][1] for i in reserves)
+
+        if n_enemies == 0:
+            if n_cards and max_size:
+                finish((), set(), 0)
+            return self._top(finished, top_k)
+
+        # Állapot: (elhasznált lapok, e_idx, e_hp) -> lapsorrend
+        beam = {(frozenset(), 0, self.enemies[0][1]): ()}
+        for depth in range(max_size):
+            if cancelled is not None and cancelled.is_set(): break
+            children = {}
+            for (used, e_idx, e_hp), seq in beam.items():
+                for i in range(n_cards):
+                    if i in used: continue
+                    step = self.advance(self.collection[i], e_idx, e_hp)
+                    if step is None: continue
+                    ne_idx, ne_hp, p_hp = step
+                    child_used = used | {i}
+                    child_seq = seq + (i,)
+                    if ne_idx == n_enemies:
+                        finish(child_seq, child_used, p_hp)
+                    elif depth + 1 == max_size or len(child_used) == n_cards:
+                        finished[child_seq] = -(ne_hp + self.suffix[ne_idx + 1])
+                    else:
+                        children.setdefault((child_used, ne_idx, ne_hp), child_seq)
+            if not children: break
+            # Legtöbb legyőzött ellenfél, utána a legkevesebb maradék élet elöl
+            ranked = sorted(children.items(), key=lambda kv: (-kv[0][1], kv[0][2], kv[1]))
+            beam = dict(ranked[:beam_width] if beam_width else ranked)
+        return self._top(finished, top_k)
+
+    @staticmethod
+    def _top(finished, top_k):
+        ranked = sorted(finished.items(), key=lambda kv: (-kv[1], len(kv[0]), kv[0]))
+        return ranked[:top_k]
+
+
+def default_deck_size(collection):
+    return math.ceil(len(collection) / 2)
+
+
+def _search_job(coll_snap, enemy_snap, max_size, top_k, beam_width):
+    return _Search(coll_snap, enemy_snap).run(max_size, top_k, beam_width)
+
+
+def optimize_deck(collection, dungeon, max_size=None, top_k=5, beam_width=64, cancelled=None):
+    """A top_k legjobb pakli (DeckResult, csokkeno margin szerint) a kazamata ellen.
+
+    max_size alapertelmezetten a hub korlatja (a gyujtemeny fele, felfele
+    kerekitve); beam_width=None eseten a kereses teljes (kis gyujtemenyekhez).
+    cancelled (threading.Event) beallitasakor a kereses a kovetkezo szint
+    elott leall (a reszeredmennyel).
+    """
+    if max_size is None:
+        max_size = default_deck_size(collection)
+    search = _Search(_snapshot(collection), _snapshot(dungeon.get_full_enemy_list()))
+    found = search.run(max_size, top_k, beam_width, cancelled)
+    return [DeckResult([collection[i] for i in seq], margin) for seq, margin in found]
+
+
+def optimize_decks(collection, dungeons, max_size=None, top_k=5, beam_width=64, jobs=1):
+    """optimize_deck minden kazamatara; jobs > 1 eseten kazamatankent kulon folyamatban."""
+    if max_size is None:
+        max_size = default_deck_size(collection)
+    coll_snap = _snapshot(collection)
+    args = [(coll_snap, _snapshot(d.get_full_enemy_list()), max_size, top_k, beam_width) for d in dungeons]
+    if jobs > 1 and len(dungeons) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            found = list(pool.map(_search_job, *zip(*args)))
+    else:
+        found = [_search_job(*a) for a in args]
+    return [[DeckResult([collection[i] for i in seq], margin) for seq, margin in res] for res in found]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="optimizer", description="Legjobb paklik keresese kazamatankent")
+    parser.add_argument("save", help="vilagmentes (JSON vagy .dwb)")
+    parser.add_argument("dungeons", nargs="*", help="kazamata nevek (alapertelmezetten mind)")
+    parser.add_argument("--top", type=int, default=3, help="kazamatankent ennyi pakli")
+    parser.add_argument("--beam", type=int, default=64, help="sugarszelesseg (0 = teljes kereses)")
+    parser.add_argument("--size", type=int, help="pakli meret korlat")
+    parser.add_argument("--jobs", type=int, default=1, help="parhuzamos folyamatok szama")
+    args = parser.parse_args(argv)
+
+    from core import GameState
+    game = GameState()
+    if not game.load_from_file(args.save):
+        print(f"Hiba a betoltesnel: {args.save}")
+        return 1
+    dungeons = [d for d in game.dungeons if not args.dungeons or d.name in args.dungeons]
+    results = optimize_decks(game.player_collection, dungeons, args.size, args.top, args.beam or None,
+                             max(1, args.jobs))
+    for dungeon, res in zip(dungeons, results):
+        print(f"{dungeon.name}:")
+        for r in res:
+            print(f"  {r.margin:+5d}  {', '.join(c.name for c in r.deck)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,159 @@
+"""Teszt mod kimeneti retege.
+
+DirectoryOutput: kimenetenkent egy fajl (az eredeti viselkedes), de a
+kimeneteket kotegekben irja, opcionalisan egy hatter szalon, igy lassu
+fajlrendszeren az I/O atfedi a harcok szamitasat.
+
+ArchiveOutput: minden kimenet egyetlen, csak hozzafuzessel irt konteiner
+fajlba kerul. Felepitese:
+    ARCHIVE_MAGIC | adatblokkok | JSON index | index offszet (u64 LE) | INDEX_MAGIC
+Az index nev -> [offszet, hossz]; azonos nev eseten az utolso iras ervenyes.
+
+MemoryOutput: a DirectoryOutput bajtjai egy szotarban (szerver mod, difftest).
+"""
+import json
+import os
+import struct
+from collections import deque
+
+ARCHIVE_MAGIC = b"DAMOUT1\n"
+INDEX_MAGIC = b"DAMIDX1\n"
+_FOOTER = struct.Struct("<Q8s")
+
+
+def _encode(text):
+    # Ugyanaz a bájtsorozat, amit a szöveges módú open(..., 'w', encoding='utf-8') írna
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode('utf-8')
+
+
+class DirectoryOutput:
+    def __init__(self, base_dir, batch_size=64, background=False):
+        self.base_dir = base_dir
+        self.batch_size = batch_size
+        self._batch = []
+        self._executor = None
+        if background:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._inflight = deque()
+
+    def write(self, name, text, error_label="mentesnel"):
+        self._batch.append((name, _encode(text), error_label))
+        if len(self._batch) >= self.batch_size:
+            self._submit()
+
+    def _submit(self):
+        batch, self._batch = self._batch, []
+        if not batch: return
+        if self._executor is None:
+            self._write_batch(batch)
+            return
+        self._inflight.append(self._executor.submit(self._write_batch, batch))
+        # Legfeljebb néhány köteg várakozhat, különben a memória nőne a kimenettel
+        while len(self._inflight) > 4 or (self._inflight and self._inflight[0].done()):
+            self._inflight.popleft().result()
+
+    def _write_batch(self, batch):
+        for name, data, error_label in batch:
+            try:
+                with open(os.path.join(self.base_dir, name), 'wb') as f:
+                    f.write(data)
+            except Exception as e:
+                print(f"Hiba {error_label}: {e}")
+
+    def flush(self):
+        self._submit()
+        while self._inflight:
+            self._inflight.popleft().result()
+
+    def close(self):
+        self.flush()
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+
+
+class MemoryOutput:
+    """A DirectoryOutput altal irt bajtok fajlnev szerint, lemez nelkul (az utolso iras ervenyes)."""
+
+    def __init__(self):
+        self.files = {}
+
+    def write(self, name, text, error_label="mentesnel"):
+        self.files[name] = _encode(text)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ArchiveOutput:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'wb', buffering=1 << 20)
+        self._file.write(ARCHIVE_MAGIC)
+        self._pos = len(ARCHIVE_MAGIC)
+        self._index = {}
+
+    def write(self, name, text, error_label="mentesnel"):
+        data = text.encode('utf-8')
+        try:
+            self._file.write(data)
+        except Exception as e:
+            print(f"Hiba {error_label}: {e}")
+            return
+        self._index[name] = [self._pos, len(data)]
+        self._pos += len(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if self._file is None: return
+        self._file.write(json.dumps(self._index, ensure_ascii=False).encode('utf-8'))
+        self._file.write(_FOOTER.pack(self._pos, INDEX_MAGIC))
+        self._file.close()
+        self._file = None
+
+
+class ArchiveReader:
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        if self._file.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+            self._file.close()
+            raise ValueError(f"Nem kimeneti archivum: {path}")
+        self._file.seek(-_FOOTER.size, os.SEEK_END)
+        index_end = self._file.tell()
+        index_pos, magic = _FOOTER.unpack(self._file.read(_FOOTER.size))
+        if magic != INDEX_MAGIC:
+            self._file.close()
+            raise ValueError(f"Hianyos archivum (nincs lezarva): {path}")
+        self._file.seek(index_pos)
+        self.index = json.loads(self._file.read(index_end - index_pos).decode('utf-8'))
+
+    def names(self):
+        return list(self.index)
+
+    def read(self, name):
+        pos, length = self.index[name]
+        self._file.seek(pos)
+        return self._file.read(length).decode('utf-8')
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_archive(path):
+    """Archivum tartalma nev -> szoveg szotarkent."""
+    with ArchiveReader(path) as reader:
+        return {name: reader.read(name) for name in reader.names()}
@@ -0,0 +1,267 @@
+"""Sok jatekos egy megosztott vilagon: csak olvashato vilag es jatekosonkenti, copy-on-write profilok.
+
+A GameState egyetlen jatekos szerkesztheto allapota (vilag es gyujtemeny
+egyutt). Itt a vilag (lapok, kazamatak) egyszer van a memoriaban
+(SharedWorld), a PlayerProfile pedig csak a sajat reszet tarolja: a
+gyujtemeny es a pakli a vilag lapjaira mutat, es egy lap csak az elso
+jutalomkor kap sajat peldanyt (CardOverlay), ami a vilaglapra hivatkozik es
+csak a sebzes/eletero elterest tarolja. Egy profil ara igy a gyujtemeny
+hivatkozasai es a jutalmazott lapok deltai.
+
+A PlayerProfile a GameState jatekos oldali feluletet adja (player_collection,
+player_deck, difficulty, add_to_collection, upgrade_card, find_in_collection,
+set_deck_by_names, first_unowned_card, reset_collection, world_cards,
+dungeons), igy a TestModeRunner, a BattleEngine es a jutalom logika
+valtozatlanul fut rajta; a vilag modositasa (add_world_card) hibat ad.
+"""
+import json
+from types import MappingProxyType
+
+from core import Card, Dungeon, GameState, TYPE_IDS
+
+
+class SharedWorld:
+    """Csak olvashato vilag: a lapok nev szerint (a vilag sorrendjeben) es a kazamatak."""
+
+    def __init__(self, cards, dungeons):
+        self.world_cards = MappingProxyType({c.name: c for c in cards})
+        self.dungeons = tuple(dungeons)
+        # A "nagy" kazamata jutalmának jelöltjei sorrendben (first_unowned_card)
+        self.rewardable = tuple(c for c in self.world_cards.values() if c.type in TYPE_IDS)
+
+    @classmethod
+    def from_game(cls, game):
+        """A GameState vilaganak masolata; a GameState kesobbi valtozasai nem latszanak benne."""
+        copies = {}
+
+        def copy(c):
+            # A kazamaták ugyanarra a lapra mutató hivatkozásai a másolatban is egy lapra mutatnak
+            new = copies.get(id(c))
+            if new is None:
+                new = copies[id(c)] = Card(c.name, c.base_dmg, c.max_hp, c.original_type_str)
+            return new
+
+        cards = [copy(c) for c in game.world_cards.values()]
+        dungeons = [Dungeon(d.type_id, d.name, [copy(c) for c in d.cards], d.leader and copy(d.leader),
+                            d.reward_type) for d in game.dungeons]
+        return cls(cards, dungeons)
+
+
+class CardOverlay:
+    """Egy vilaglap a jatekos sajat statjaival: csak a jutalmakbol szarmazo elteres tarolodik."""
+    __slots__ = ("base", "dmg", "hp")
+
+    def __init__(self, base, dmg=0, hp=0):
+        self.base = base
+        self.dmg = dmg
+        self.hp = hp
+
+    name = property(lambda self: self.base.name)
+    type = property(lambda self: self.base.type)
+    type_id = property(lambda self: self.base.type_id)
+    original_type_str = property(lambda self: self.base.original_type_str)
+    base_dmg = property(lambda self: self.base.base_dmg + self.dmg)
+    max_hp = property(lambda self: self.base.max_hp + self.hp)
+    # Gyűjteménybeli lapnál a Card.current_hp is mindig a max_hp (a harc BattleCard-on fut)
+    current_hp = max_hp
+
+    def to_dict(self):
+        return {"name": self.name, "dmg": self.base_dmg, "hp": self.max_hp, "type": self.original_type_str}
+
+    def __str__(self):
+        return f"[{self.original_type_str.upper()}] {self.name} (DMG: {self.base_dmg} | HP: {self.max_hp})"
+
+
+class PlayerProfile:
+    """Egy jatekos egy SharedWorld felett (a GameState jatekos oldali feluletevel)."""
+
+    def __init__(self, world):
+        self.world = world
+        self.player_collection = []
+        self.player_deck = []
+        self.difficulty = 0
+        self._first = {}  # név -> az első ilyen nevű gyűjteménybeli lap helye
+        self._unowned_cursor = 0
+        # Új játékos után a régi pakli a régi gyűjtemény lapjaira mutat: ezeket a jutalom nem érinti
+        self._deck_live = False
+
+    world_cards = property(lambda self: self.world.world_cards)
+    dungeons = property(lambda self: self.world.dungeons)
+
+    def add_world_card(self, card):
+        raise TypeError("A megosztott vilag csak olvashato")
+
+    def add_to_collection(self, card):
+        # A világlap másolata helyett maga a megosztott lap (vagy a tőle való eltérés) kerül be
+        base = self.world.world_cards.get(card.name)
+        if base is not None and base is not card and base.original_type_str == card.original_type_str:
+            dmg, hp = card.base_dmg - base.base_dmg, card.max_hp - base.max_hp
+            card = CardOverlay(base, dmg, hp) if dmg or hp else base
+        self._first.setdefault(card.name, len(self.player_collection))
+        self.player_collection.append(card)
+
+    def reset_collection(self):
+        self.player_collection = []
+        self._first = {}
+        self._unowned_cursor = 0
+        self._deck_live = False
+
+    def find_in_collection(self, name):
+        i = self._first.get(name)
+        return None if i is None else self.player_collection[i]
+
+    def set_deck_by_names(self, names):
+        coll, first = self.player_collection, self._first
+        self.player_deck = [coll[first[n]] for n in names if n in first]
+        self._deck_live = True
+
+    def first_unowned_card(self):
+        """Az elso olyan ervenyes tipusu vilaglap, ami meg nincs a gyujtemenyben."""
+        cards = self.world.rewardable
+        while self._unowned_cursor < len(cards):
+            c = cards[self._unowned_cursor]
+            if c.name not in self._first:
+                return c
+            self._unowned_cursor += 1
+        return None
+
+    def upgrade_card(self, card, reward_type):
+        """Sebzes/eletero jutalom; megosztott lapnal elobb sajat CardOverlay kerul a helyere."""
+        if reward_type == "sebzes":
+            dmg, hp = 1, 0
+        elif reward_type == "eletero":
+            dmg, hp = 0, 2
+        else:
+            return
+        if isinstance(card, CardOverlay):
+            card.dmg += dmg
+            card.hp += hp
+        elif self.world.world_cards.get(card.name) is card:
+            overlay = CardOverlay(card, dmg, hp)
+            coll = self.player_collection
+            i = self._first.get(card.name)
+            if i is None or coll[i] is not card:
+                i = next(k for k, c in enumerate(coll) if c is card)
+            coll[i] = overlay
+            if self._deck_live:
+                # A pakli a gyűjtemény első ilyen nevű lapjára mutat
+                self.player_deck = [overlay if c is card else c for c in self.player_deck]
+        else:
+            # Saját (a világban nem szereplő) lap: mint a GameState-ben
+            card.base_dmg += dmg
+            card.max_hp += hp
+            card.current_hp = card.max_hp
+
+    @property
+    def overlays(self):
+        return sum(1 for c in self.player_collection if isinstance(c, CardOverlay))
+
+    # --- ÁTALAKÍTÁSOK ---
+
+    def to_dict(self):
+        """Csak a profil sajat resze; a pakli nev szerint, a vilagon kivuli lapok nelkul (mint a GameState mentese)."""
+        world_cards = self.world.world_cards
+        coll = [c for c in self.player_collection if c.name in world_cards]
+        return {
+            "collection": [c.name for c in coll],
+            "upgrades": {str(i): [c.base_dmg - world_cards[c.name].base_dmg, c.max_hp - world_cards[c.name].max_hp]
+                         for i, c in enumerate(coll) if c is not world_cards[c.name]},
+            "deck": [c.name for c in self.player_deck if c.name in world_cards],
+            "difficulty": self.difficulty,
+        }
+
+    @classmethod
+    def from_dict(cls, world, data):
+        profile = cls(world)
+        for i, name in enumerate(data["collection"]):
+            base = world.world_cards.get(name)
+            if base is None: continue
+            dmg, hp = data["upgrades"].get(str(i), (0, 0))
+            profile.add_to_collection(CardOverlay(base, dmg, hp) if dmg or hp else base)
+        # Mint a GameState betöltésénél: a gyűjteményen kívüli (régi) paklilap a világlap lesz
+        profile.player_deck = [profile.find_in_collection(n) or world.world_cards[n] for n in data["deck"]
+                               if n in world.world_cards]
+        profile._deck_live = all(n in profile._first for n in data["deck"])
+        profile.difficulty = data.get("difficulty", 0)
+        return profile
+
+    @classmethod
+    def from_game(cls, world, game):
+        """A GameState jatekos resze profilkent (a world lapjaira kotve, ahol a statok egyeznek)."""
+        profile = cls(world)
+        slots = {}
+        for c in game.player_collection:
+            profile.add_to_collection(c)
+            slots.setdefault(id(c), profile.player_collection[-1])
+        # A régi gyűjteményből maradt paklilapok változatlanul maradnak (ahogy a GameState-ben)
+        profile.player_deck = [slots.get(id(c), c) for c in game.player_deck]
+        profile._deck_live = all(id(c) in slots for c in game.player_deck)
+        profile.difficulty = game.difficulty
+        return profile
+
+    def to_game_state(self):
+        """Onallo GameState (sajat lapmasolatokkal) a mentes es a GUI szamara."""
+        game = GameState()
+        world = SharedWorld.from_game(self)
+        game.world_cards = dict(world.world_cards)
+        game.dungeons = list(world.dungeons)
+        copies = {}
+        for c in self.player_collection:
+            own = Card(c.name, c.base_dmg, c.max_hp, c.original_type_str)
+            copies.setdefault(id(c), own)
+            game.player_collection.append(own)
+        if self._deck_live:
+            game.player_deck = [copies[id(c)] for c in self.player_deck]
+        else:
+            game.player_deck = [Card(c.name, c.base_dmg, c.max_hp, c.original_type_str) for c in self.player_deck]
+        game.difficulty = self.difficulty
+        game.rebuild_indexes()
+        return game
+
+
+class ProfileStore:
+    """Jatekosnev -> PlayerProfile egyetlen SharedWorld felett; a profilok egy JSON fajlba menthetok."""
+
+    def __init__(self, world):
+        self.world = world
+        self.profiles = {}
+
+    def get(self, player, create=True):
+        profile = self.profiles.get(player)
+        if profile is None and create:
+            profile = self.profiles[player] = PlayerProfile(self.world)
+        return profile
+
+    def drop(self, player):
+        return self.profiles.pop(player, None) is not None
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def save(self, filename):
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump({name: p.to_dict() for name, p in self.profiles.items()}, f)
+            return True
+        except Exception as e:
+            print(f"Hiba a mentesnel: {e}")
+            return False
+
+    def load(self, filename):
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.profiles = {name: PlayerProfile.from_dict(self.world, p) for name, p in data.items()}
+            return True
+        except Exception as e:
+            print(f"Hiba a betoltesnel: {e}")
+            return False
+
+
+def load_game(filename):
+    """Egy jatekmentes (JSON vagy .dwb) SharedWorld es PlayerProfile parkent, vagy None."""
+    game = GameState()
+    if not game.load_from_file(filename):
+        return None
+    world = SharedWorld.from_game(game)
+    return world, PlayerProfile.from_game(world, game)
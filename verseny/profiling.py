@@ -0,0 +1,174 @@
+"""Bekapcsolhato fazismeres a teszt modhoz es a BattleEngine-hez (damareen.py --profile).
+
+Kikapcsolva nem kerul semmibe: a mert fuggvenyek es metodusok csak
+install() utan kapnak idomero burkolot, uninstall() visszaallitja az
+eredetieket. A burkolok egy veremben kovetik a hivasokat, igy minden
+fazisnak van teljes es sajat (a gyermekek nelkuli) ideje.
+
+Mert fazisok: parse (a bemenet tokenizalasa), parancsonkent a dispatch
+(pl. "harc", "uj kartya"), Card (lap letrehozas), BattleEngine.run,
+step:play / step:attack, parharc (zart alaku parharc), sebzes (base_damage),
+nehezseg (apply_difficulty), naplo (a logger hivasai), jutalom, kimenet
+(write_output), kiiras (a kimenet fajlba irasa), visszajatszas.
+--jobs > 1 eseten a munkafolyamatok harcai nem latszanak, csak a
+"harc lezaras" varakozasa.
+
+Kimenet: <prefix>.json (fazisonkent darab, teljes es sajat ido) es
+<prefix>.folded, a flamegraph.pl / speedscope "collapsed stack" formatuma
+(keret;keret;... <sajat mikroszekundum>).
+"""
+import json
+import time
+
+import core
+import output
+import testmode
+
+
+class Profiler:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.phases = {}  # név -> [darab, teljes, saját]
+        self.stacks = {}  # hívási út -> saját idő
+        self._stack = []  # [név, kezdet, gyermekek ideje]
+        self._patches = []
+        self._started = None
+        self.wall = 0.0
+
+    # --- Mérés ---
+
+    def enter(self, name):
+        self._stack.append([name, self.clock(), 0.0])
+
+    def exit(self):
+        frame = self._stack.pop()
+        elapsed = self.clock() - frame[1]
+        name = frame[0]
+        own = elapsed - frame[2]
+        st = self.phases.get(name)
+        if st is None:
+            st = self.phases[name] = [0, 0.0, 0.0]
+        st[0] += 1
+        st[1] += elapsed
+        st[2] += own
+        path = tuple(f[0] for f in self._stack) + (name,)
+        self.stacks[path] = self.stacks.get(path, 0.0) + own
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def wrap(self, func, name):
+        """func burkolva; name lehet fuggveny is, ami a hivas argumentumaibol adja a nevet."""
+        enter, exit_ = self.enter, self.exit
+        dynamic = callable(name)
+
+        def wrapper(*args, **kwargs):
+            enter(name(*args, **kwargs) if dynamic else name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                exit_()
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def wrap_iter(self, func, name):
+        """Generator fuggveny: minden next() egy fazis (a fogyaszto ideje nem szamit bele)."""
+        enter, exit_ = self.enter, self.exit
+
+        def wrapper(*args, **kwargs):
+            it = func(*args, **kwargs)
+            while True:
+                enter(name)
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                finally:
+                    exit_()
+                yield item
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    # --- Beépítés ---
+
+    def patch(self, owner, attr, replacement):
+        self._patches.append((owner, attr, owner.__dict__[attr]))
+        setattr(owner, attr, replacement)
+
+    def install(self):
+        engine, runner = core.BattleEngine, testmode.TestModeRunner
+        self.patch(testmode, "iter_commands", self.wrap_iter(testmode.iter_commands, "parse"))
+        self.patch(runner, "dispatch", self.wrap(runner.dispatch, lambda self, parts: parts[0]))
+        self.patch(runner, "resolve_reward", self.wrap(runner.resolve_reward, "jutalom"))
+        self.patch(runner, "write_output", self.wrap(runner.write_output, "kimenet"))
+        self.patch(runner, "commit_battle", self.wrap(runner.commit_battle, "harc lezaras"))
+        self.patch(runner, "save_replay", self.wrap(runner.save_replay, "visszajatszas"))
+        for cls in (output.DirectoryOutput, output.ArchiveOutput):
+            for attr in ("flush", "close"):
+                self.patch(cls, attr, self.wrap(cls.__dict__[attr], "kiiras"))
+        self.patch(core.Card, "__init__", self.wrap(core.Card.__init__, "Card"))
+        self.patch(core, "base_damage", self.wrap(core.base_damage, "sebzes"))
+        self.patch(engine, "run", self.wrap(engine.run, "BattleEngine.run"))
+        self.patch(engine, "_resolve_duel", self.wrap(engine._resolve_duel, "parharc"))
+        self.patch(engine, "apply_difficulty", self.wrap(engine.apply_difficulty, "nehezseg"))
+        self.patch(engine, "step", self._wrap_step(engine.step))
+        self.patch(engine, "__init__", self._wrap_engine_init(engine.__init__))
+        self._started = self.clock()
+
+    def uninstall(self):
+        if self._started is not None:
+            self.wall += self.clock() - self._started
+            self._started = None
+        while self._patches:
+            owner, attr, original = self._patches.pop()
+            setattr(owner, attr, original)
+
+    def _wrap_step(self, step):
+        enter, exit_ = self.enter, self.exit
+
+        def wrapper(eng):
+            # A lépés fajtája a step() első ágaiból előre látszik, így a gyermek fázisok útja is pontos
+            if eng.battle_over or eng.p_idx >= len(eng.player_deck) or eng.e_idx >= len(eng.enemy_deck):
+                enter("step:end")
+            elif not (eng.e_card_played and eng.p_card_played):
+                enter("step:play")
+            else:
+                enter("step:attack")
+            try:
+                step(eng)
+            finally:
+                exit_()
+        return wrapper
+
+    def _wrap_engine_init(self, init):
+        wrap = self.wrap
+
+        def wrapper(eng, *args, **kwargs):
+            init(eng, *args, **kwargs)
+            if eng.log is not core._no_log:
+                eng.log = wrap(eng.log, "naplo")
+        return wrapper
+
+    # --- Riport ---
+
+    def report(self):
+        return {
+            "wall_s": self.wall,
+            "phases": {name: {"count": c, "total_s": total, "self_s": own}
+                       for name, (c, total, own) in sorted(self.phases.items(), key=lambda kv: -kv[1][2])},
+        }
+
+    def collapsed(self):
+        return [f"{';'.join(path)} {round(own * 1e6)}" for path, own in sorted(self.stacks.items())]
+
+    def write(self, prefix):
+        with open(prefix + ".json", 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        with open(prefix + ".folded", 'w', encoding='utf-8') as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+
+    def summary(self):
+        lines = [f"{'fazis':22s} {'darab':>10s} {'teljes ms':>11s} {'sajat ms':>10s}"]
+        for name, st in self.report()["phases"].items():
+            lines.append(f"{name:22s} {st['count']:10d} {st['total_s'] * 1e3:11.2f} {st['self_s'] * 1e3:10.2f}")
+        lines.append(f"{'ossz (fal)':22s} {'':10s} {self.wall * 1e3:11.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,406 @@
+"""Harcok visszajatszasa tomor binaris esemenyfolyambol.
+
+A ReplayRecorder a BattleEngine naplojara ul, es minden esemenyt nehany
+bajton rogzit: egy varint fej (esemenytipus + a kor novekmenye), kijatszasnal
+a lap indexe, tamadasnal a sebzes (zigzag varint). snapshot_every
+esemenyenkent pillanatkep keszul (kor, aktiv lapok indexe es elete), igy egy
+adott korra ugras a legkozelebbi pillanatkeptol legfeljebb snapshot_every
+esemeny dekodolasa, a harc ujrafuttatasa nelkul.
+
+Fajl (varintok):
+    MAGIC, verzio, snapshot_every, nehezseg, kazamata nev
+    lapok         jatekos, majd kazamata: nev, tipus, sebzes, eletero
+    esemenyek     darab, bajthossz, folyam
+    pillanatkepek darab, mindegyik: bajt offszet, kor, p_idx, e_idx, p_hp, e_hp, kijatszott jelzok
+    zaras         vegso kor, gyoztes, minden lap vegso elete
+
+A mar kiesett lapok elete a zarasbol, a meg nem harcolt lapoke a max_hp-bol
+jon, igy egy pillanatkep a pakli meretetol fuggetlenul allando meretu.
+
+Hasznalat: python replay.py <fajl> [--turn K] [--count N]
+"""
+import argparse
+import sys
+from bisect import bisect_left
+
+from core import Card, BattleCard, BattleEngine
+
+MAGIC = b"DAMRPL1\0"
+VERSION = 1
+REPLAY_EXTENSION = ".dmr"
+SNAPSHOT_EVERY = 32
+
+PLAY_DUNGEON, PLAY_PLAYER, ATTACK_DUNGEON, ATTACK_PLAYER = range(4)
+# Esemény -> a BattleEngine naplójának (action, owner) párja
+EVENT_NAMES = (("play", "kazamata"), ("play", "jatekos"), ("attack", "enemy"), ("attack", "player"))
+WINNER_CODES = {None: 0, "player": 1, "enemy": 2}
+WINNER_NAMES = {v: k for k, v in WINNER_CODES.items()}
+
+
+# --- VARINT KÓDOLÁS ---
+
+def _put_uvarint(out, n):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _put_svarint(out, n):
+    _put_uvarint(out, n << 1 if n >= 0 else ((-n) << 1) - 1)
+
+
+def _put_string(out, s):
+    data = s.encode('utf-8')
+    _put_uvarint(out, len(data))
+    out += data
+
+
+def _get_uvarint(buf, pos):
+    result = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7f) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _get_svarint(buf, pos):
+    z, pos = _get_uvarint(buf, pos)
+    return (z >> 1) if not z & 1 else -((z + 1) >> 1), pos
+
+
+def _get_string(buf, pos):
+    n, pos = _get_uvarint(buf, pos)
+    return bytes(buf[pos:pos + n]).decode('utf-8'), pos + n
+
+
+# --- ÁLLAPOT ---
+
+class ReplayState:
+    """A harc allapota ket esemeny kozott: kor, aktiv lapok indexe es elete."""
+    __slots__ = ("event", "offset", "turn", "p_idx", "e_idx", "p_hp", "e_hp", "p_played", "e_played")
+
+    def __init__(self, event, offset, turn, p_idx, e_idx, p_hp, e_hp, p_played, e_played):
+        self.event = event  # ennyi esemény után
+        self.offset = offset  # a következő esemény bájt offszetje
+        self.turn = turn
+        self.p_idx = p_idx
+        self.e_idx = e_idx
+        self.p_hp = p_hp
+        self.e_hp = e_hp
+        self.p_played = p_played
+        self.e_played = e_played
+
+    def copy(self):
+        return ReplayState(self.event, self.offset, self.turn, self.p_idx, self.e_idx, self.p_hp, self.e_hp,
+                           self.p_played, self.e_played)
+
+    def apply(self, kind, turn, arg, p_max, e_max):
+        """Egy esemeny a BattleEngine.step() szabalyai szerint (arg: lap index vagy sebzes)."""
+        self.turn = turn
+        self.event += 1
+        if kind == PLAY_DUNGEON:
+            self.e_idx = arg
+            self.e_played = True
+        elif kind == PLAY_PLAYER:
+            self.p_idx = arg
+            self.p_played = True
+        elif kind == ATTACK_DUNGEON:
+            self.p_hp -= arg
+            if self.p_hp <= 0:
+                self.p_idx += 1
+                self.p_hp = p_max[self.p_idx] if self.p_idx < len(p_max) else 0
+                self.p_played = False
+        else:
+            self.e_hp -= arg
+            if self.e_hp <= 0:
+                if self.p_hp > 0:
+                    self.p_hp = min(p_max[self.p_idx], self.p_hp + 1)
+                self.e_idx += 1
+                self.e_hp = e_max[self.e_idx] if self.e_idx < len(e_max) else 0
+                self.e_played = False
+
+
+def _initial_state(p_max, e_max):
+    return ReplayState(0, 0, 1, 0, 0, p_max[0] if p_max else 0, e_max[0] if e_max else 0, False, False)
+
+
+# --- FELVÉTEL ---
+
+class ReplayRecorder:
+    """A BattleEngine naplojat rogziti; az elso step()/run() elott kell letrehozni.
+
+    Az eredeti logger tovabbra is megkap minden esemenyt. Naplo nelkuli
+    motornal a fast_forward kikapcsol, hogy a run() az esemenyeket is kiadja
+    (a parharcok zart alakja tovabbra is ervenyes). A lapok statjai a
+    letrehozaskor rogzulnek: a BattleCard a gyujtemeny lapjat olvassa, igy egy
+    harc utani jutalom kulonben a felvetelbe is bekerulne.
+    """
+
+    def __init__(self, engine, snapshot_every=SNAPSHOT_EVERY):
+        self.engine = engine
+        self.snapshot_every = snapshot_every
+        self._inner = engine.log
+        engine.log = self._log
+        engine.fast_forward = False
+        cards = lambda deck: [Card(c.name, c.base_dmg, c.max_hp, c.original_type_str) for c in deck]
+        self._players = cards(engine.player_deck)
+        self._enemies = cards(engine.enemy_deck)
+        self._p_max = [c.max_hp for c in self._players]
+        self._e_max = [c.max_hp for c in self._enemies]
+        self._state = _initial_state(self._p_max, self._e_max)
+        self._events = bytearray()
+        self._snapshots = []
+
+    def _log(self, action, turn, owner, card, target, dmg):
+        state = self._state
+        if state.event % self.snapshot_every == 0:
+            state.offset = len(self._events)
+            self._snapshots.append(state.copy())
+        out = self._events
+        if action == "play":
+            kind, arg = (PLAY_DUNGEON, self.engine.e_idx) if owner == "kazamata" else (PLAY_PLAYER, self.engine.p_idx)
+            _put_uvarint(out, kind | (turn - state.turn) << 2)
+            _put_uvarint(out, arg)
+        else:
+            kind, arg = (ATTACK_DUNGEON if owner == "enemy" else ATTACK_PLAYER), dmg
+            _put_uvarint(out, kind | (turn - state.turn) << 2)
+            _put_svarint(out, arg)
+        state.apply(kind, turn, arg, self._p_max, self._e_max)
+        self._inner(action, turn, owner, card, target, dmg)
+
+    def finish(self):
+        eng = self.engine
+        return Replay(eng.dungeon.name, eng.difficulty, self._players, self._enemies,
+                      bytes(self._events), self._state.event, self._snapshots, self.snapshot_every,
+                      eng.turn, eng.winner, [c.current_hp for c in eng.player_deck],
+                      [c.current_hp for c in eng.enemy_deck])
+
+
+# --- VISSZAJÁTSZÁS ---
+
+class Replay:
+    def __init__(self, dungeon_name, difficulty, players, enemies, events, event_count, snapshots,
+                 snapshot_every, final_turn, winner, p_final_hp, e_final_hp):
+        self.dungeon_name = dungeon_name
+        self.difficulty = difficulty
+        self.players = players
+        self.enemies = enemies
+        self.events = events
+        self.event_count = event_count
+        self.snapshots = snapshots
+        self.snapshot_every = snapshot_every
+        self.final_turn = final_turn
+        self.winner = winner
+        self.p_final_hp = p_final_hp
+        self.e_final_hp = e_final_hp
+        self._p_max = [c.max_hp for c in players]
+        self._e_max = [c.max_hp for c in enemies]
+        self._snapshot_turns = [s.turn for s in snapshots]
+
+    # --- Keresés ---
+
+    def _decode(self, state, stop_event=None, stop_turn=None):
+        """Esemenyek (kind, turn, arg, p_idx, e_idx, p_hp, e_hp) az allapottol, az esemeny elotti indexekkel
+        es eletekkel; az allapot kozben halad."""
+        buf = self.events
+        pos = state.offset
+        end = self.event_count if stop_event is None else min(stop_event, self.event_count)
+        while state.event < end:
+            head, p = _get_uvarint(buf, pos)
+            kind, turn = head & 3, state.turn + (head >> 2)
+            if stop_turn is not None and turn >= stop_turn:
+                return
+            arg, pos = (_get_uvarint if kind < ATTACK_DUNGEON else _get_svarint)(buf, p)
+            before = (state.p_idx, state.e_idx, state.p_hp, state.e_hp)
+            state.apply(kind, turn, arg, self._p_max, self._e_max)
+            state.offset = pos
+            yield (kind, turn, arg) + before
+
+    def _from_snapshot(self, k):
+        if not self.snapshots:
+            return _initial_state(self._p_max, self._e_max)
+        return self.snapshots[max(0, min(k, len(self.snapshots) - 1))].copy()
+
+    def state_at(self, event):
+        """Allapot event darab esemeny utan."""
+        state = self._from_snapshot(event // self.snapshot_every)
+        for _ in self._decode(state, stop_event=event):
+            pass
+        return state
+
+    def seek(self, turn):
+        """Allapot a turn. kor elso esemenye elott (vagy a harc vegen, ha addig nem jut el)."""
+        # Az utolsó pillanatkép, ahol a kör még kisebb: onnan legfeljebb snapshot_every esemény
+        state = self._from_snapshot(bisect_left(self._snapshot_turns, turn) - 1)
+        for _ in self._decode(state, stop_turn=turn):
+            pass
+        return state
+
+    # --- Lapok ---
+
+    def player_hp(self, state, i):
+        return self._hp(i, state.p_idx, state.p_hp, self._p_max, self.p_final_hp)
+
+    def enemy_hp(self, state, i):
+        return self._hp(i, state.e_idx, state.e_hp, self._e_max, self.e_final_hp)
+
+    @staticmethod
+    def _hp(i, idx, active_hp, max_hp, final_hp):
+        if i < idx:
+            return final_hp[i]
+        return active_hp if i == idx else max_hp[i]
+
+    def play(self, logger, start_turn=1, stop_turn=None):
+        """A rogzitett esemenyek a BattleEngine logger hivasaival, start_turn-tol stop_turn-ig (kizarva)."""
+        state = self.seek(start_turn)
+        for kind, turn, arg, p_i, e_i, p_hp, e_hp in self._decode(state, stop_turn=stop_turn):
+            action, owner = EVENT_NAMES[kind]
+            if kind == PLAY_DUNGEON:
+                logger(action, turn, owner, self.enemies[arg], None, 0)
+            elif kind == PLAY_PLAYER:
+                logger(action, turn, owner, self.players[arg], None, 0)
+            else:
+                # A logger a védekező támadás utáni életét látja, mint a step()-ben
+                if kind == ATTACK_DUNGEON:
+                    attacker, defender = self.enemies[e_i], BattleCard(self.players[p_i])
+                    defender.current_hp = p_hp - arg
+                else:
+                    attacker, defender = self.players[p_i], BattleCard(self.enemies[e_i])
+                    defender.current_hp = e_hp - arg
+                logger(action, turn, owner, attacker, defender, arg)
+
+    # --- Fájl ---
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        for n in (VERSION, self.snapshot_every):
+            _put_uvarint(out, n)
+        _put_svarint(out, self.difficulty)
+        _put_string(out, self.dungeon_name)
+        for deck in (self.players, self.enemies):
+            _put_uvarint(out, len(deck))
+            for c in deck:
+                _put_string(out, c.name)
+                _put_string(out, c.original_type_str)
+                _put_svarint(out, c.base_dmg)
+                _put_svarint(out, c.max_hp)
+        _put_uvarint(out, self.event_count)
+        _put_uvarint(out, len(self.events))
+        out += self.events
+        _put_uvarint(out, len(self.snapshots))
+        for s in self.snapshots:
+            _put_uvarint(out, s.offset)
+            _put_uvarint(out, s.turn)
+            _put_uvarint(out, s.p_idx)
+            _put_uvarint(out, s.e_idx)
+            _put_svarint(out, s.p_hp)
+            _put_svarint(out, s.e_hp)
+            _put_uvarint(out, s.p_played | s.e_played << 1)
+        _put_uvarint(out, self.final_turn)
+        _put_uvarint(out, WINNER_CODES[self.winner])
+        for hp in self.p_final_hp + self.e_final_hp:
+            _put_svarint(out, hp)
+        return bytes(out)
+
+    @staticmethod
+    def from_bytes(data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Nem visszajatszas fajl")
+        pos = len(MAGIC)
+        version, pos = _get_uvarint(data, pos)
+        if version != VERSION:
+            raise ValueError(f"Ismeretlen visszajatszas verzio: {version}")
+        snapshot_every, pos = _get_uvarint(data, pos)
+        difficulty, pos = _get_svarint(data, pos)
+        dungeon_name, pos = _get_string(data, pos)
+        decks = []
+        for _ in range(2):
+            n, pos = _get_uvarint(data, pos)
+            deck = []
+            for _ in range(n):
+                name, pos = _get_string(data, pos)
+                type_name, pos = _get_string(data, pos)
+                dmg, pos = _get_svarint(data, pos)
+                hp, pos = _get_svarint(data, pos)
+                deck.append(Card(name, dmg, hp, type_name))
+            decks.append(deck)
+        event_count, pos = _get_uvarint(data, pos)
+        n, pos = _get_uvarint(data, pos)
+        events, pos = bytes(data[pos:pos + n]), pos + n
+        n, pos = _get_uvarint(data, pos)
+        snapshots = []
+        for k in range(n):
+            fields = []
+            for signed in (False, False, False, False, True, True, False):
+                value, pos = (_get_svarint if signed else _get_uvarint)(data, pos)
+                fields.append(value)
+            offset, turn, p_idx, e_idx, p_hp, e_hp, flags = fields
+            snapshots.append(ReplayState(k * snapshot_every, offset, turn, p_idx, e_idx, p_hp, e_hp,
+                                         bool(flags & 1), bool(flags & 2)))
+        final_turn, pos = _get_uvarint(data, pos)
+        winner, pos = _get_uvarint(data, pos)
+        final_hp = []
+        for _ in range(len(decks[0]) + len(decks[1])):
+            hp, pos = _get_svarint(data, pos)
+            final_hp.append(hp)
+        return Replay(dungeon_name, difficulty, decks[0], decks[1], events, event_count, snapshots, snapshot_every,
+                      final_turn, WINNER_NAMES[winner], final_hp[:len(decks[0])], final_hp[len(decks[0]):])
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return Replay.from_bytes(f.read())
+
+
+def record_battle(deck, dungeon, difficulty=0, is_game_mode=False, rng=None, logger_func=None,
+                  snapshot_every=SNAPSHOT_EVERY):
+    """Egy harc lefuttatasa felvetellel; (engine, Replay)."""
+    eng = BattleEngine(deck, dungeon, difficulty, logger_func, is_game_mode=is_game_mode, rng=rng)
+    recorder = ReplayRecorder(eng, snapshot_every)
+    eng.run()
+    return eng, recorder.finish()
+
+
+def format_event(action, turn, owner, c, t, d):
+    """Egy harcesemeny a teszt mod kimeneti soranak formajaban (a testmode.recorded_battle is ezt irja)."""
+    if action == "play":
+        return f"{turn}.kor; {owner};kijatszik; {c.name};{c.base_dmg};{c.max_hp}; {c.original_type_str}"
+    return f"{turn}.kor; {owner};tamad; {c.name}; {d}; {t.name}; {max(0, t.current_hp)}"
+
+
+# --- NÉZEGETŐ (CLI) ---
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="replay", description="Rogzitett harc megtekintese")
+    parser.add_argument("file", help="visszajatszas fajl (.dmr)")
+    parser.add_argument("--turn", type=int, default=1, help="ugras erre a korre")
+    parser.add_argument("--count", type=int, default=20, help="ennyi kor esemenyei (0 = a harc vegeig)")
+    args = parser.parse_args(argv)
+
+    try:
+        rep = Replay.load(args.file)
+    except (OSError, ValueError) as e:
+        print(f"Hiba a betoltesnel: {e}")
+        return 1
+    print(f"{rep.dungeon_name}: {len(rep.players)} vs {len(rep.enemies)} lap, {rep.event_count} esemeny, "
+          f"{rep.final_turn}. kor, gyoztes: {rep.winner}")
+    state = rep.seek(args.turn)
+    for label, cards, idx, hp in (("jatekos", rep.players, state.p_idx, rep.player_hp),
+                                  ("kazamata", rep.enemies, state.e_idx, rep.enemy_hp)):
+        card = f"{cards[idx].name} ({hp(state, idx)}/{cards[idx].max_hp})" if idx < len(cards) else "-"
+        print(f"  {args.turn}. kor elott, {label}: {idx + 1}. lap {card}")
+    stop = args.turn + args.count if args.count else None
+    rep.play(lambda *event: print(format_event(*event)), args.turn, stop)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
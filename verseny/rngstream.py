@@ -0,0 +1,93 @@
+"""Seedelheto, szetvalaszthato veletlenszam-folyamok.
+
+Minden harc, kommentator es minigame a sajat RngStream-jet kapja a globalis
+random modul helyett, igy egy seed-del a jatek mod harcai visszajatszhatok,
+gyorsitotarazhatok es parhuzamosan is determinisztikusan futtathatok.
+
+split(*kulcs) egy fuggetlen gyermek folyamot ad, amelynek seedje csak a
+szulo seedjetol es a kulcstol fugg (a huzasok sorrendjetol nem), igy
+munkafolyamatonkent / harconkent kiosztva az eredmeny nem fugg attol,
+melyik folyamat mikor fut.
+"""
+import hashlib
+import random
+from itertools import chain, islice
+
+
+def derive_seed(seed, *path):
+    """64 bites gyermek seed a szulo seedbol es egy kulcs-utvonalbol."""
+    digest = hashlib.blake2b(repr((seed,) + path).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class RngStream:
+    """random.Random alapu folyam elore legeneralt kotegekkel.
+
+    A random() a batch meretu pufferbol olvas; a sorozat ugyanaz, mintha
+    egyenkent huznank, csak kevesebb hivassal.
+    """
+
+    def __init__(self, seed=None, batch=64):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed = seed
+        self.batch_size = batch
+        self._rng = random.Random(seed)
+        self._it = iter(())
+
+    def random(self):
+        value = next(self._it, None)
+        if value is None:
+            self._it = iter(self.batch(self.batch_size))
+            value = next(self._it)
+        return value
+
+    def batch(self, n):
+        """A kovetkezo n huzas listakent (a puffer maradeka utan folytatva)."""
+        out = list(islice(self._it, n))
+        r = self._rng.random
+        out.extend([r() for _ in range(n - len(out))])
+        return out
+
+    def draws(self):
+        """Vegtelen iterator a huzasokra, kotegenkent elore generalva.
+
+        Forro ciklusokba: a next() C szinten fut. A folyamot ezutan csak ezen
+        keresztul szabad olvasni, mert az iterator elore lefoglalja a kotegeket.
+        """
+        return chain(self._it, chain.from_iterable(iter(lambda: self.batch(self.batch_size), None)))
+
+    def randint(self, a, b):
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    def split(self, *key):
+        return RngStream(derive_seed(self.seed, *key), self.batch_size)
+
+    def spawn(self, n):
+        """n fuggetlen gyermek folyam (pl. munkafolyamatonkent egy)."""
+        return [self.split(i) for i in range(n)]
+
+
+class FactorStream:
+    """Elore megadott [0, 1) tenyezok visszajatszasa (pl. egy rogzitett vagy vektorosan huzott harc)."""
+
+    def __init__(self, values):
+        self._values = values
+        self._pos = 0
+
+    def random(self):
+        value = self._values[self._pos]
+        self._pos += 1
+        return value
+
+    def batch(self, n):
+        out = list(self._values[self._pos:self._pos + n])
+        self._pos += len(out)
+        return out
+
+    @property
+    def consumed(self):
+        return self._pos
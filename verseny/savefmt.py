@@ -0,0 +1,208 @@
+"""Tomor binaris vilagmentes formatum.
+
+Felepites (little-endian):
+    fejlec        MAGIC, verzio, darabszamok, nehezseg, szakasz offszetek
+    sztringtabla  u32 offszetek[n_strings + 1], utana az UTF-8 blob
+    kartyak       fix szelessegu rekordok: nev, sebzes, eletero, tipus
+    kazamatak     fix szelessegu rekordok: tipus, nev, lapok kezdete/szama, vezer, jutalom
+    index tombok  kazamata lapok, gyujtemeny, pakli (u32 kartya indexek)
+
+A sztringek indexszel, a lapok a kartya tombbeli sorszamukkal hivatkozottak,
+a hianyzo vezer/jutalom -1. A WorldReader mmap-pel nyitja meg a fajlt, es a
+tombokre masolas nelkuli memoryview-kat ad (big-endian gepen a u32 tombok
+struct-tal dekodolt listak).
+
+Konvertalo: python savefmt.py <bemenet> <kimenet>   (a formatum a kiterjesztesbol: .dwb = binaris)
+"""
+import mmap
+import struct
+import sys
+
+MAGIC = b"DAMWLD1\0"
+VERSION = 1
+BINARY_EXTENSION = ".dwb"
+
+_HEADER = struct.Struct("<8sIIIIIIIi6Q")
+_CARD = struct.Struct("<IqqI")
+_DUNGEON = struct.Struct("<iIIIii")
+# A memoryview.cast('I') natív bájtsorrendű és méretű: csak ilyenkor olvasható a fájl másolás nélkül
+_NATIVE_U32 = sys.byteorder == "little" and struct.calcsize("I") == 4
+
+
+def is_binary_save(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class _StringTable:
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, s):
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def add_optional(self, s):
+        return -1 if s is None else self.add(s)
+
+    def to_bytes(self):
+        blobs = [s.encode('utf-8') for s in self.strings]
+        offsets = [0]
+        for b in blobs:
+            offsets.append(offsets[-1] + len(b))
+        return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(blobs)
+
+
+_I64 = (-(1 << 63), (1 << 63) - 1)
+_I32 = (-(1 << 31), (1 << 31) - 1)
+
+
+def _checked(value, bounds, what):
+    """Ertek a rekordmezo tartomanyaban, kulonben ValueError (a struct.error helyett olvashato uzenettel)."""
+    if not isinstance(value, int) or not bounds[0] <= value <= bounds[1]:
+        raise ValueError(f"{what} nem fer el a binaris mentesben ({value!r}); mentsd JSON-ba")
+    return value
+
+
+def _u32_array(values):
+    return struct.pack(f"<{len(values)}I", *values)
+
+
+def write_world(path, cards, dungeons, collection, deck, difficulty):
+    """Vilag kiirasa.
+
+    cards: (nev, sebzes, eletero, tipus) sorok; dungeons: (tipus, nev,
+    kartya indexek, vezer index vagy None, jutalom vagy None) sorok;
+    collection, deck: kartya indexek.
+    """
+    strings = _StringTable()
+    card_blob = b"".join(_CARD.pack(strings.add(n), _checked(d, _I64, f"{n} sebzese"),
+                                    _checked(h, _I64, f"{n} eletereje"), strings.add(t)) for n, d, h, t in cards)
+
+    dungeon_recs = []
+    dungeon_cards = []
+    for type_id, name, card_ids, leader, reward in dungeons:
+        dungeon_recs.append(_DUNGEON.pack(strings.add_optional(type_id), strings.add(name), len(dungeon_cards),
+                                          len(card_ids), -1 if leader is None else leader,
+                                          strings.add_optional(reward)))
+        dungeon_cards.extend(card_ids)
+
+    sections = [strings.to_bytes(), card_blob, b"".join(dungeon_recs),
+                _u32_array(dungeon_cards), _u32_array(collection), _u32_array(deck)]
+    offsets = []
+    pos = _HEADER.size
+    for sec in sections:
+        # 8 bájtos igazítás, hogy a tömbök memoryview-ként közvetlenül olvashatók legyenek
+        pos += -pos % 8
+        offsets.append(pos)
+        pos += len(sec)
+
+    header = _HEADER.pack(MAGIC, VERSION, len(strings.strings), len(cards), len(dungeons),
+                          len(dungeon_cards), len(collection), len(deck),
+                          _checked(difficulty, _I32, "A nehezseg"), *offsets)
+    with open(path, 'wb') as f:
+        f.write(header)
+        for off, sec in zip(offsets, sections):
+            f.write(b"\0" * (off - f.tell()))
+            f.write(sec)
+
+
+class WorldReader:
+    """Binaris mentes olvasoja mmap-pel; hasznalat utan close() (vagy with blokk)."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        (magic, version, n_strings, self.n_cards, self.n_dungeons, n_dcards, n_coll, n_deck,
+         self.difficulty, str_off, card_off, dung_off, dcard_off, coll_off, deck_off) = \
+            _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Ismeretlen mentes formatum: {path}")
+
+        self._str_offsets = self._u32_view(str_off, n_strings + 1)
+        self._str_base = str_off + (n_strings + 1) * 4
+        self._card_off = card_off
+        self._dung_off = dung_off
+        self.dungeon_cards = self._u32_view(dcard_off, n_dcards)
+        self.collection = self._u32_view(coll_off, n_coll)
+        self.deck = self._u32_view(deck_off, n_deck)
+
+    def _view(self, offset, length):
+        view = memoryview(self._mm)[offset:offset + length]
+        self._views.append(view)
+        return view
+
+    def _u32_view(self, offset, count):
+        if not _NATIVE_U32:
+            return list(struct.unpack_from(f"<{count}I", self._mm, offset))
+        raw = memoryview(self._mm)[offset:offset + count * 4]
+        # A cast view ugyanarra a pufferre mutat, a köztes szelet azonnal elengedhető
+        view = raw.cast('I')
+        raw.release()
+        self._views.append(view)
+        return view
+
+    def string(self, i):
+        if i < 0: return None
+        start, end = self._str_offsets[i], self._str_offsets[i + 1]
+        return self._mm[self._str_base + start:self._str_base + end].decode('utf-8')
+
+    def cards(self):
+        """(nev, sebzes, eletero, tipus) sorok a fajl sorrendjeben."""
+        s = self.string
+        types = {}  # kevés különböző típus: egyszer dekódoljuk
+        for n, d, h, t in _CARD.iter_unpack(self._view(self._card_off, self.n_cards * _CARD.size)):
+            type_str = types.get(t)
+            if type_str is None:
+                type_str = types[t] = s(t)
+            yield s(n), d, h, type_str
+
+    def dungeons(self):
+        """(tipus, nev, kartya index view, vezer index vagy None, jutalom) sorok."""
+        s = self.string
+        recs = self._view(self._dung_off, self.n_dungeons * _DUNGEON.size)
+        for t, n, start, count, leader, reward in _DUNGEON.iter_unpack(recs):
+            yield s(t), s(n), self.dungeon_cards[start:start + count], None if leader < 0 else leader, s(reward)
+
+    def close(self):
+        for v in self._views:
+            v.release()
+        self._views = []
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # a hívónál még élő szeletek; a mmap az utolsó hivatkozással együtt záródik
+            self._file.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert(src, dst):
+    from core import GameState
+
+    game = GameState()
+    if not game.load_from_file(src):
+        return False
+    return game.save_to_file(dst)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(2)
+    sys.exit(0 if convert(sys.argv[1], sys.argv[2]) else 1)
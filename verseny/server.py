@@ -0,0 +1,453 @@
+"""Rezidens harc szerver: a vilagok a memoriaban maradnak, a keresek egy helyi socketen jonnek.
+
+Protokoll: soronkent egy JSON keres, soronkent egy JSON valasz. A keres
+"id" mezoje a valaszban visszajon; egy kapcsolaton a keresek parhuzamosan
+futnak, a valaszok a befejezes sorrendjeben erkeznek. Minden valaszban
+"ok", hiba eseten "error", es "ms" (a beolvasastol a valaszig eltelt ido).
+
+Muveletek:
+    new       {"world"}                            ures vilag (a meglevot felulirja)
+    load      {"world", "path", "leaders"?}        mentes betoltese (JSON vagy .dwb); a mentes nem tarolja,
+              melyik lap vezer: ezek a "leaders" nevek, es az ugyanilyen nevu, felulirt vilag vezerei
+    save      {"world", "path"}
+    commands  {"world", "lines" | "path"}          teszt mod parancsok; valasz: {"applied", "outputs"}
+    simulate  {"world", "dungeon", "deck"?, "log"?}
+              harc a pakli (vagy a megadott gyujtemenybeli nevek) es a kazamata kozott,
+              a vilag valtoztatasa nelkul; valasz: {"winner", "p_idx", "lines"}
+    export    {"world", "kind": "vilag" | "jatekos"}  valasz: {"lines"}
+    unload    {"world"}
+    worlds    {}
+    metrics   {}                                   muveletenkenti keses (darab, p50/p95/p99, max)
+    cancel    {"target"}                           a kapcsolat egy futo keresenek megszakitasa
+
+A harcok (simulate, es a commands harc parancsai jobs > 1 eseten) egy
+kozos folyamatkeszletben futnak, a parancskotegek egy szalon, vilagonkenti
+zar alatt, igy az esemenyhurok kozben is valaszol. Torlodasnal: egy
+kapcsolat legfeljebb max_inflight keresen dolgozik (utana nem olvas tovabb,
+a kliens a TCP ablakon at lassul), a keszletre egyszerre legfeljebb
+max_queue harc varhat (a parancskotegek harcai is), a valaszok irasa pedig
+drain()-nel var a kliensre.
+Megszakitott parancskoteg a kovetkezo parancs elott all meg; az addig
+vegrehajtott parancsok hatasa megmarad.
+
+Hasznalat: python server.py [--host H] [--port P | --unix UTVONAL] [--jobs N]
+           [--max-inflight N] [--max-queue N]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+from core import GameState
+from output import MemoryOutput
+from testmode import TestModeRunner, iter_commands, card_snapshot, _battle_job
+
+DEFAULT_PORT = 8765
+LINE_LIMIT = 16 << 20  # egy kérés sora legfeljebb ekkora (nagy parancskötegek)
+
+
+class RequestError(Exception):
+    """Hibas keres; a szovege a valasz error mezojebe kerul."""
+
+
+class LatencyStats:
+    """Egy muvelet kesesei: darab, hibak, megszakitasok, atlag, max, es a legutobbi WINDOW keres percentilisei."""
+    WINDOW = 1024
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=self.WINDOW)
+
+    def add(self, seconds, status):
+        self.count += 1
+        self.errors += status == "error"
+        self.cancelled += status == "cancelled"
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def report(self):
+        recent = sorted(self.recent)
+
+        def pct(p):
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1e3, 3) if recent else None
+
+        return {"count": self.count, "errors": self.errors, "cancelled": self.cancelled,
+                "mean_ms": round(self.total / self.count * 1e3, 3) if self.count else None,
+                "p50_ms": pct(0.5), "p95_ms": pct(0.95), "p99_ms": pct(0.99), "max_ms": round(self.max * 1e3, 3)}
+
+
+class SlotPool:
+    """A parancskotegek harcainak keszlete: minden harc elott cpu_slots hely foglalasa (mint az offload)."""
+
+    def __init__(self, server, loop):
+        self.server = server
+        self.loop = loop
+
+    def submit(self, func, *args):
+        # A köteg szálán fut: a max_queue korlátig vár; a hely a harc végén (vagy törlésekor) szabadul
+        asyncio.run_coroutine_threadsafe(self.server.acquire_slot(), self.loop).result()
+        try:
+            future = self.server.pool.submit(func, *args)
+        except BaseException:
+            self.loop.call_soon_threadsafe(self.server.cpu_slots.release)
+            raise
+        future.add_done_callback(lambda f: self.loop.call_soon_threadsafe(self.server.cpu_slots.release))
+        return future
+
+
+class World:
+    """Egy betoltott vilag: a teszt mod futtatoja (jatek, ismert vezerek) es a modositasok zarja."""
+
+    def __init__(self, game=None, jobs=1, pool=None, known_leaders=()):
+        self.runner = TestModeRunner(None, jobs=jobs, output=MemoryOutput())
+        if game is not None:
+            self.runner.game = game
+        self.runner.known_leaders.update(known_leaders)
+        # A közös készlet (SlotPool); a runner.close() nem hívódik, így nem állítja le
+        self.runner._pool = pool
+        self.lock = asyncio.Lock()
+
+
+def _apply_commands(runner, commands, cancelled):
+    """Szalon fut: a parancsok a kovetkezo elott ellenorzik a megszakitast."""
+    runner.output = MemoryOutput()
+    applied = 0
+    for parts in commands:
+        if cancelled.is_set(): break
+        runner.dispatch(parts)
+        applied += 1
+    runner.flush()
+    return applied, {name: data.decode('utf-8') for name, data in runner.output.files.items()}
+
+
+def _parse_lines(lines):
+    # Ugyanaz a tokenizálás, mint az iter_commands-ben; a szálon fut, nem az eseményhurkon
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("//"):
+            yield [p.strip() for p in line.split(';')]
+
+
+def _read_commands(path):
+    commands = [parts for _, parts in iter_commands(path)]
+    if not commands:
+        raise RequestError(f"ures vagy olvashatatlan bemenet: {path}")
+    return commands
+
+
+class BattleServer:
+    def __init__(self, jobs=1, max_inflight=64, max_queue=None):
+        self.jobs = jobs
+        self.max_inflight = max_inflight
+        self.pool = None
+        if jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(max_workers=jobs)
+        self.cpu_slots = asyncio.Semaphore(max_queue or jobs * 4)
+        self.cpu_waiting = 0
+        self.inflight = 0
+        self.worlds = {}
+        self.stats = {}
+        self.started = time.perf_counter()
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def world(self, req):
+        name = req["world"]
+        world = self.worlds.get(name)
+        if world is None:
+            raise RequestError(f"ismeretlen vilag: {name}")
+        return world
+
+    async def acquire_slot(self):
+        """Hely a keszletben (max_queue korlat); a harc vegen cpu_slots.release()."""
+        self.cpu_waiting += 1
+        try:
+            await self.cpu_slots.acquire()
+        finally:
+            self.cpu_waiting -= 1
+
+    def battle_pool(self):
+        """A vilagok futtatoinak keszlete: a harcok a cpu_slots korlaton at jutnak a kozos keszletbe."""
+        return SlotPool(self, asyncio.get_running_loop()) if self.pool else None
+
+    async def offload(self, func, *args):
+        """CPU munka a keszletben (jobs == 1 eseten az alapertelmezett szalkeszletben), max_queue korlattal."""
+        await self.acquire_slot()
+        try:
+            job = asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+        except BaseException:
+            self.cpu_slots.release()
+            raise
+        # A hely csak a munka végén szabadul: a kérés törlése nem állítja le a futó harcot
+        job.add_done_callback(self._job_done)
+        return await asyncio.shield(job)
+
+    def _job_done(self, job):
+        self.cpu_slots.release()
+        if not job.cancelled():
+            job.exception()  # Törölt kérésnél is "átvett" kivétel, ne legyen figyelmeztetés
+
+    # --- MŰVELETEK ---
+
+    async def op_new(self, req):
+        self.worlds[req["world"]] = World(jobs=self.jobs, pool=self.battle_pool())
+        return {}
+
+    async def op_load(self, req):
+        game = GameState()
+        if not await asyncio.get_running_loop().run_in_executor(None, game.load_from_file, req["path"]):
+            raise RequestError(f"betoltes sikertelen: {req['path']}")
+        # A mentésben nincs vezér jelölés: a kérés és a felülírt világ vezérei maradnak meg (export)
+        leaders = req.get("leaders") or []
+        if not isinstance(leaders, list) or not all(isinstance(n, str) for n in leaders):
+            raise RequestError("a leaders nevek listaja")
+        old = self.worlds.get(req["world"])
+        leaders = set(leaders) | (old.runner.known_leaders if old else set())
+        self.worlds[req["world"]] = World(game, self.jobs, self.battle_pool(),
+                                          {n for n in leaders if n in game.world_cards})
+        return {"cards": len(game.world_cards), "dungeons": len(game.dungeons)}
+
+    async def op_save(self, req):
+        world = self.world(req)
+        async with world.lock:
+            ok = await asyncio.get_running_loop().run_in_executor(None, world.runner.game.save_to_file, req["path"])
+        if not ok:
+            raise RequestError(f"mentes sikertelen: {req['path']}")
+        return {}
+
+    async def op_commands(self, req):
+        world = self.world(req)
+        loop = asyncio.get_running_loop()
+        if "lines" in req:
+            lines = req["lines"]
+            if not isinstance(lines, list) or not all(isinstance(line, str) for line in lines):
+                raise RequestError("a lines parancssorok listaja")
+            commands = _parse_lines(lines)
+        else:
+            commands = await loop.run_in_executor(None, _read_commands, req["path"])
+        cancelled = threading.Event()
+        async with world.lock:
+            job = loop.run_in_executor(None, _apply_commands, world.runner, commands, cancelled)
+            try:
+                applied, outputs = await asyncio.shield(job)
+            except asyncio.CancelledError:
+                # A szál a következő parancsnál áll meg; addig a zár nálunk marad
+                cancelled.set()
+                await job
+                raise
+        return {"applied": applied, "outputs": outputs}
+
+    async def op_simulate(self, req):
+        world = self.world(req)
+        async with world.lock:
+            game = world.runner.game
+            dungeon = next((d for d in game.dungeons if d.name == req["dungeon"]), None)
+            if dungeon is None:
+                raise RequestError(f"ismeretlen kazamata: {req['dungeon']}")
+            deck = game.player_deck
+            names = req.get("deck")
+            if names is not None:
+                if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+                    raise RequestError("a deck nevek listaja")
+                missing = [n for n in names if game.find_in_collection(n) is None]
+                if missing:
+                    raise RequestError(f"nincs a gyujtemenyben: {', '.join(missing)}")
+                deck = [game.find_in_collection(n) for n in names]
+            deck_snap = card_snapshot(deck)
+            enemy_snap = card_snapshot(dungeon.get_full_enemy_list())
+        logs, winner, p_idx, _ = await self.offload(_battle_job, deck_snap, enemy_snap, dungeon.name,
+                                                    bool(req.get("log")))
+        return {"winner": winner, "p_idx": p_idx, "lines": logs}
+
+    async def op_export(self, req):
+        kind = req.get("kind", "vilag")
+        if kind not in ("vilag", "jatekos"):
+            raise RequestError(f"ismeretlen export: {kind}")
+        world = self.world(req)
+        async with world.lock:
+            runner = world.runner
+            runner.output = MemoryOutput()
+            runner.cmd_export([f"export {kind}", "export"])
+            text = runner.output.files["export"].decode('utf-8')
+        return {"lines": text.split("\n") if text else []}
+
+    async def op_unload(self, req):
+        if self.worlds.pop(req["world"], None) is None:
+            raise RequestError(f"ismeretlen vilag: {req['world']}")
+        return {}
+
+    async def op_worlds(self, req):
+        return {"worlds": {name: {"cards": len(w.runner.game.world_cards), "dungeons": len(w.runner.game.dungeons),
+                                  "collection": len(w.runner.game.player_collection)}
+                           for name, w in self.worlds.items()}}
+
+    async def op_metrics(self, req):
+        return {"uptime_s": round(time.perf_counter() - self.started, 3), "inflight": self.inflight,
+                "cpu_waiting": self.cpu_waiting, "worlds": len(self.worlds),
+                "ops": {op: st.report() for op, st in sorted(self.stats.items())}}
+
+    OPS = {
+        "new": op_new,
+        "load": op_load,
+        "save": op_save,
+        "commands": op_commands,
+        "simulate": op_simulate,
+        "export": op_export,
+        "unload": op_unload,
+        "worlds": op_worlds,
+        "metrics": op_metrics,
+    }
+
+    # --- KAPCSOLATOK ---
+
+    async def serve_request(self, req, started, send):
+        op = req.get("op")
+        handler = self.OPS.get(op) if isinstance(op, str) else None
+        status = "ok"
+        self.inflight += 1
+        try:
+            if handler is None:
+                raise RequestError(f"ismeretlen muvelet: {op}")
+            resp = {"id": req.get("id"), "ok": True, **await handler(self, req)}
+        except asyncio.CancelledError:
+            status = "cancelled"
+            resp = {"id": req.get("id"), "ok": False, "error": "megszakitva"}
+        except RequestError as e:
+            status = "error"
+            resp = {"id": req.get("id"), "ok": False, "error": str(e)}
+        except KeyError as e:
+            status = "error"
+            resp = {"id": req.get("id"), "ok": False, "error": f"hianyzo mezo: {e}"}
+        except Exception as e:
+            status = "error"
+            resp = {"id": req.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            self.inflight -= 1
+        elapsed = time.perf_counter() - started
+        self.stats.setdefault(op if handler else "ismeretlen", LatencyStats()).add(elapsed, status)
+        resp["ms"] = round(elapsed * 1e3, 3)
+        try:
+            await send(resp)
+        except (ConnectionError, RuntimeError):
+            pass  # a kliens közben bontott
+
+    async def handle(self, reader, writer):
+        tasks = {}
+        slots = asyncio.Semaphore(self.max_inflight)
+        write_lock = asyncio.Lock()
+
+        async def send(obj, started=None):
+            if started is not None:
+                obj["ms"] = round((time.perf_counter() - started) * 1e3, 3)
+            async with write_lock:
+                writer.write((json.dumps(obj, ensure_ascii=False) + "\n").encode('utf-8'))
+                await writer.drain()
+
+        def finished(task, rid):
+            if tasks.get(rid) is task:
+                del tasks[rid]
+            slots.release()
+
+        try:
+            while True:
+                # Tele kapcsolatnál nem olvasunk tovább: a kliens írása a socketen torlódik
+                await slots.acquire()
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await send({"id": None, "ok": False, "error": f"tul hosszu keres (> {LINE_LIMIT} bajt)"},
+                               time.perf_counter())
+                    break
+                if not line:
+                    break
+                started = time.perf_counter()
+                try:
+                    req = json.loads(line)
+                    if not isinstance(req, dict): raise ValueError("nem objektum")
+                    if not isinstance(req.get("id"), (str, int, type(None))): raise ValueError("az id szoveg vagy szam")
+                except ValueError as e:
+                    slots.release()
+                    await send({"id": None, "ok": False, "error": f"hibas JSON: {e}"}, started)
+                    continue
+                if req.get("op") == "cancel":
+                    slots.release()
+                    target = req.get("target")
+                    task = tasks.get(target) if isinstance(target, (str, int)) else None
+                    if task:
+                        task.cancel()
+                    await send({"id": req.get("id"), "ok": task is not None,
+                                **({} if task else {"error": "nincs ilyen futo keres"})}, started)
+                    continue
+                rid = req.get("id")
+                task = asyncio.create_task(self.serve_request(req, started, send))
+                tasks[rid] = task
+                task.add_done_callback(lambda t, rid=rid: finished(t, rid))
+        except ConnectionError:
+            pass
+        finally:
+            # Bontáskor a függő kérések megszakadnak
+            for task in list(tasks.values()):
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            writer.close()
+
+    def summary(self):
+        lines = [f"{'muvelet':10s} {'darab':>8s} {'hiba':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'max ms':>9s}"]
+        for op, st in sorted(self.stats.items()):
+            r = st.report()
+            lines.append(f"{op:10s} {r['count']:8d} {r['errors']:6d} {r['p50_ms'] or 0:9.2f} "
+                         f"{r['p95_ms'] or 0:9.2f} {r['max_ms']:9.2f}")
+        return "\n".join(lines)
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, unix=None, jobs=1, max_inflight=64, max_queue=None):
+    server = BattleServer(jobs, max_inflight, max_queue)
+    try:
+        if unix:
+            srv = await asyncio.start_unix_server(server.handle, unix, limit=LINE_LIMIT)
+        else:
+            srv = await asyncio.start_server(server.handle, host, port, limit=LINE_LIMIT)
+        print(f"Damareen szerver: {unix or f'{host}:{port}'} (jobs={jobs})", flush=True)
+        async with srv:
+            await srv.serve_forever()
+    finally:
+        server.close()
+        if server.stats:
+            print(server.summary())
+
+
+def run_server(host="127.0.0.1", port=DEFAULT_PORT, unix=None, jobs=1, max_inflight=64, max_queue=None):
+    try:
+        asyncio.run(serve(host, port, unix, jobs, max_inflight, max_queue))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="server", description="Rezidens Damareen harc szerver")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Unix socket utvonal a TCP helyett")
+    parser.add_argument("--jobs", type=int, default=1, help="harc folyamatok szama")
+    parser.add_argument("--max-inflight", type=int, default=64, help="egyszerre futo keresek kapcsolatonkent")
+    parser.add_argument("--max-queue", type=int, help="a keszletre varo harcok (alapertelmezetten jobs*4)")
+    args = parser.parse_args(argv)
+    return run_server(args.host, args.port, args.unix, max(1, args.jobs), max(1, args.max_inflight),
+                      args.max_queue)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
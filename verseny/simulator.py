@@ -0,0 +1,268 @@
+"""Fej nelkuli, tomeges harcszimulacio a BattleEngine szabalyai szerint.
+
+A kartyak allapota tombokben (sebzes, eletero, tipus) el, a harcokat
+parhuzamos "savokban" lepteti: minden iteracio minden meg futo harcban
+egy teljes parharcot old meg zart alakban (core.solve_duel). Ha a NumPy
+elerheto, a parharcok vektorosan oldodnak meg, kulonben egy tiszta Python
+ciklus fut ugyanazzal a logikaval. Az eredmeny bitre megegyezik a BattleEngine-nel is_game_mode=False
+eseten.
+
+Mert gyorsulas a step()-enkenti BattleEngine-hez kepest (python benchmark.py
+simulator): a tiszta Python sav kb. 4x, a NumPy sav kb. 30x; nagysagrendekkel
+gyorsabb egyik sem. A NumPy opcionalis fuggoseg (requirements-optional.txt);
+nelkule minden hivas a Python savon fut. Az eredmeny backend mezoje mutatja,
+melyik sav futott; ha a NumPy hianyzik es a hivo nem valasztott savot, a tobb
+harcos hivasok figyelmeztetest (RuntimeWarning) adnak.
+"""
+import warnings
+
+from core import TYPE_MODIFIERS, solve_duel
+
+try:
+    import numpy as np  # opcionalis (requirements-optional.txt): a kb. 30x-os sav
+except ImportError:
+    np = None
+
+# Eredmeny kodok a winner tombben
+WINNER_ENEMY = 0
+WINNER_PLAYER = 1
+WINNER_NONE = -1  # Egyik fel sem tud sebezni, a BattleEngine sosem erne veget
+
+# A TYPE_MODIFIERS tortkent: math.floor(dmg * 2.0) == dmg * 2, math.floor(dmg * 0.5) == dmg // 2
+_MOD_NUM = [[2 if m == 2.0 else 1 for m in row] for row in TYPE_MODIFIERS]
+_MOD_DEN = [[2 if m == 0.5 else 1 for m in row] for row in TYPE_MODIFIERS]
+# A NumPy magban a "sosem üt le" ütésszám (hits_to_kill None)
+_NEVER = 1 << 62
+
+
+def _pack(cards):
+    return ([c.base_dmg for c in cards], [c.max_hp for c in cards], [c.type_id for c in cards])
+
+
+def _enemy_cards(dungeon):
+    return dungeon.cards + [dungeon.leader] if dungeon.leader else list(dungeon.cards)
+
+
+class SimulationResult:
+    """Harcok vegallapota savonkent (a BattleEngine mezoinek megfeleloen).
+
+    A player_hp / enemy_hp sorai a pakli hosszara vagott HP listak; a NumPy
+    mag kitoltott matrixot ad vissza, ezert a hosszakat kulon taroljuk.
+    A backend a futtato sav neve: "numpy" vagy "python".
+    """
+
+    def __init__(self, winner, turn, p_idx, e_idx, player_hp, enemy_hp, player_len, enemy_len, backend="python"):
+        self.winner = winner
+        self.turn = turn
+        self.p_idx = p_idx
+        self.e_idx = e_idx
+        self.player_hp = player_hp
+        self.enemy_hp = enemy_hp
+        self.player_len = player_len
+        self.enemy_len = enemy_len
+        self.backend = backend
+
+    def __len__(self):
+        return len(self.winner)
+
+    @property
+    def wins(self):
+        return sum(1 for w in self.winner if w == WINNER_PLAYER)
+
+    def outcome(self, i):
+        """Egy harc eredmenye: (winner, turn, p_idx, e_idx, player_hp, enemy_hp)."""
+        return (int(self.winner[i]), int(self.turn[i]), int(self.p_idx[i]), int(self.e_idx[i]),
+                [int(h) for h in self.player_hp[i][:self.player_len[i]]],
+                [int(h) for h in self.enemy_hp[i][:self.enemy_len[i]]])
+
+
+# --- TISZTA PYTHON MAG ---
+
+def _run_lane(pd, ph, pt, ed, eh, et):
+    p_cur, e_cur = list(ph), list(eh)
+    n_p, n_e = len(pd), len(ed)
+    p_idx = e_idx = 0
+    turn = 1
+
+    # Párharconként egy lépés: minden párharcot a kazamata kezd, a végeredmény zárt alakban
+    while True:
+        if p_idx >= n_p:
+            winner = WINNER_ENEMY
+            break
+        if e_idx >= n_e:
+            winner = WINNER_PLAYER
+            break
+        a, d = et[e_idx], pt[p_idx]
+        d_ep = ed[e_idx] * _MOD_NUM[a][d] // _MOD_DEN[a][d]
+        d_pe = pd[p_idx] * _MOD_NUM[d][a] // _MOD_DEN[d][a]
+        outcome = solve_duel(d_ep, d_pe, p_cur[p_idx], ph[p_idx], e_cur[e_idx], False)
+        if outcome is None:
+            winner = WINNER_NONE
+            break
+        attacks, p_cur[p_idx], e_cur[e_idx], player_died = outcome
+        # Minden játékos támadás egy kör, a kiesett játékos lap még egy
+        turn += attacks // 2
+        if player_died:
+            p_idx += 1
+            turn += 1
+        else:
+            e_idx += 1
+
+    return winner, turn, p_idx, e_idx, p_cur, e_cur
+
+
+def _run_python(decks, enemies, deck_ids, enemy_ids):
+    """use_numpy=False (es NumPy nelkul az alapertelmezes) sava: csak kb. 4x a step()-hez kepest."""
+    results = [_run_lane(*decks[i], *enemies[j]) for i, j in zip(deck_ids, enemy_ids)]
+    cols = [list(c) for c in zip(*results)] if results else [[] for _ in range(6)]
+    return SimulationResult(*cols, [len(h) for h in cols[4]], [len(h) for h in cols[5]])
+
+
+# --- NUMPY MAG ---
+
+def _table(packs):
+    """Paklik kitoltott (sebzes, max HP, tipus, hossz) tablai."""
+    width = max([len(p[0]) for p in packs] + [1])
+    dmg, hp, typ = (np.zeros((len(packs), width), dtype=np.int64) for _ in range(3))
+    lengths = np.array([len(p[0]) for p in packs], dtype=np.int64)
+    for i, (d, h, t) in enumerate(packs):
+        n = len(d)
+        dmg[i, :n], hp[i, :n], typ[i, :n] = d, h, t
+    return dmg, hp, typ, lengths
+
+
+def _damage_by_type(dmg, typ, mod_num, mod_den):
+    """Lapitott tabla: [lap * tipusok szama + vedekezo tipus] -> a lap sebzese (mint a base_damage)."""
+    return (dmg[:, :, None] * mod_num[typ] // mod_den[typ]).ravel()
+
+
+def _hits_to_kill(hp, dmg):
+    """A core.hits_to_kill tombosen; a None helyett _NEVER."""
+    safe = np.where(dmg > 0, dmg, 1)
+    return np.where(hp <= dmg, 1, np.where(dmg > 0, -(-hp // safe), _NEVER))
+
+
+def _run_numpy(decks, enemies, deck_ids, enemy_ids):
+    deck_ids = np.asarray(deck_ids, dtype=np.int64)
+    enemy_ids = np.asarray(enemy_ids, dtype=np.int64)
+    pd_t, ph_t, pt_t, pl_t = _table(decks)
+    ed_t, eh_t, et_t, el_t = _table(enemies)
+    mp, me = pd_t.shape[1], ed_t.shape[1]
+    n = len(deck_ids)
+    mod_num, mod_den = np.array(_MOD_NUM, dtype=np.int64), np.array(_MOD_DEN, dtype=np.int64)
+    n_types = len(_MOD_NUM)
+    # Lapított táblák: a lap sorszáma pakli * szélesség + hely, a sebzés a védekező típusa szerint
+    p_dmg, e_dmg = _damage_by_type(pd_t, pt_t, mod_num, mod_den), _damage_by_type(ed_t, et_t, mod_num, mod_den)
+    p_typ, e_typ = pt_t.ravel(), et_t.ravel()
+
+    # Savonkénti HP mátrixok (lapított indexeléssel)
+    p_cur, e_cur = ph_t[deck_ids].ravel(), eh_t[enemy_ids].ravel()
+    p_max = p_cur.copy()
+    winner = np.full(n, WINNER_NONE, dtype=np.int8)
+    turn = np.ones(n, dtype=np.int64)
+    p_idx = np.zeros(n, dtype=np.int64)
+    e_idx = np.zeros(n, dtype=np.int64)
+
+    # A futó sávok tömörített állapota; a befejezett sávok a globális tömbökbe íródnak vissza
+    lane = np.arange(n)
+    pi, ei = np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+    p_len, e_len = pl_t[deck_ids], el_t[enemy_ids]
+    p_base, e_base = deck_ids * mp, enemy_ids * me
+    p_row, e_row = lane * mp, lane * me
+    lane_turn = turn.copy()
+
+    # Iterációnként minden futó sávban egy teljes párharc (mint a _run_lane-ben)
+    while lane.size:
+        p_out = pi >= p_len
+        e_out = ei >= e_len
+        done = p_out | e_out
+        if done.any():
+            winner[lane[e_out]] = WINNER_PLAYER
+            winner[lane[p_out]] = WINNER_ENEMY
+            finished = lane[done]
+            turn[finished], p_idx[finished], e_idx[finished] = lane_turn[done], pi[done], ei[done]
+            keep = ~done
+            lane, pi, ei, p_len, e_len, p_base, e_base, p_row, e_row, lane_turn = (
+                x[keep] for x in (lane, pi, ei, p_len, e_len, p_base, e_base, p_row, e_row, lane_turn))
+            if not lane.size:
+                break
+
+        pc, ec = p_base + pi, e_base + ei
+        d_ep = e_dmg[ec * n_types + p_typ[pc]]
+        d_pe = p_dmg[pc * n_types + e_typ[ec]]
+        p_flat, e_flat = p_row + pi, e_row + ei
+        hp_p, hp_e = p_cur[p_flat], e_cur[e_flat]
+        k_p, k_e = _hits_to_kill(hp_p, d_ep), _hits_to_kill(hp_e, d_pe)
+
+        # Elakadt párharc: a sáv WINNER_NONE-nal kiesik (a helye a globális tömbökben)
+        stuck = (k_p == _NEVER) & (k_e == _NEVER)
+        if stuck.any():
+            finished = lane[stuck]
+            turn[finished], p_idx[finished], e_idx[finished] = lane_turn[stuck], pi[stuck], ei[stuck]
+            keep = ~stuck
+            (lane, pi, ei, p_len, e_len, p_base, e_base, p_row, e_row, lane_turn,
+             d_ep, d_pe, p_flat, e_flat, hp_p, hp_e, k_p, k_e) = (
+                x[keep] for x in (lane, pi, ei, p_len, e_len, p_base, e_base, p_row, e_row, lane_turn,
+                                  d_ep, d_pe, p_flat, e_flat, hp_p, hp_e, k_p, k_e))
+
+        # A kazamata kezd, így döntetlen ütésszámnál a játékos lapja esik el (solve_duel);
+        # a kazamata mindkét esetben k-szor üt, a játékos k-szor vagy (ha elesik) k-1-szer
+        died = k_p <= k_e
+        k = np.minimum(k_p, k_e)
+        hp_p = hp_p - k * d_ep
+        heal = ~died & (hp_p > 0)
+        p_cur[p_flat] = np.where(heal, np.minimum(p_max[p_flat], hp_p + 1), hp_p)
+        e_cur[e_flat] = hp_e - (k - died) * d_pe
+        pi += died
+        ei += ~died
+        lane_turn += k
+
+    return SimulationResult(winner, turn, p_idx, e_idx, p_cur.reshape(n, mp), e_cur.reshape(n, me),
+                            pl_t[deck_ids], el_t[enemy_ids])
+
+
+def _run(decks, enemies, deck_ids, enemy_ids, use_numpy=None):
+    if use_numpy is None:
+        use_numpy = np is not None and len(deck_ids) > 1
+        if np is None and len(deck_ids) > 1:
+            warnings.warn("A NumPy nincs telepitve: a szimulacio a lassu tiszta Python savon fut",
+                          RuntimeWarning, stacklevel=3)
+    if use_numpy and np is None:
+        raise RuntimeError("A NumPy nincs telepitve")
+    result = (_run_numpy if use_numpy else _run_python)(decks, enemies, deck_ids, enemy_ids)
+    result.backend = "numpy" if use_numpy else "python"
+    return result
+
+
+# --- PUBLIKUS API ---
+
+def simulate(deck, dungeon, n=1, use_numpy=None):
+    """Egy pakli n harca egy kazamata ellen (nem jatek modban).
+
+    Egyetlen harcot szamol, ezert use_numpy=None eseten a Python savon fut;
+    a futtato sav az eredmeny backend mezojeben all.
+    """
+    # Nem játék módban a harc determinisztikus: egyszer számoljuk, n-szer adjuk vissza.
+    one = _run([_pack(deck)], [_pack(_enemy_cards(dungeon))], [0], [0], use_numpy=use_numpy)
+    winner, turn, p_idx, e_idx, player_hp, enemy_hp = one.outcome(0)
+    # A HP sorok futásonként külön listák, hogy egy sor módosítása ne látsszon a többiben
+    return SimulationResult([winner] * n, [turn] * n, [p_idx] * n, [e_idx] * n,
+                            [list(player_hp) for _ in range(n)], [list(enemy_hp) for _ in range(n)],
+                            [len(player_hp)] * n, [len(enemy_hp)] * n, one.backend)
+
+
+def simulate_matrix(decks, dungeons, use_numpy=None):
+    """Minden pakli minden kazamata ellen; a sav indexe deck_i * len(dungeons) + dungeon_j."""
+    deck_packs = [_pack(d) for d in decks]
+    enemy_packs = [_pack(_enemy_cards(d)) for d in dungeons]
+    deck_ids = [i for i in range(len(decks)) for _ in range(len(dungeons))]
+    enemy_ids = list(range(len(dungeons))) * len(decks)
+    return _run(deck_packs, enemy_packs, deck_ids, enemy_ids, use_numpy=use_numpy)
+
+
+def simulate_pairs(pairs, use_numpy=None):
+    """Fuggetlen (pakli, kazamata) parok harcai; a sav indexe a par indexe."""
+    deck_packs = [_pack(deck) for deck, _ in pairs]
+    enemy_packs = [_pack(_enemy_cards(dungeon)) for _, dungeon in pairs]
+    ids = list(range(len(pairs)))
+    return _run(deck_packs, enemy_packs, ids, ids, use_numpy=use_numpy)
@@ -0,0 +1,231 @@
+"""Megismetelheto meresi csomag regresszio-figyeleshez.
+
+A merendo bemenetek a generate.py seedelt generatoraibol jonnek (SCALES
+meretekben, kapcsolokkal felulirhatoan), igy ket verzio ugyanazon a
+terhelesen fut. Minden eset repeat-szer fut; az eredmeny (minden futas
+ideje, a legjobb es a median) a verzio, a Python es a meretek adataival
+egyutt JSON-ba mentheto, es egy korabbi mentessel osszevetheto: ha egy
+eset legjobb ideje a kuszobnel tobbel lassult, a kilepesi kod 1.
+
+Hasznalat: python suite.py [eset ...] [--scale kicsi|kozepes|nagy] [--repeat N]
+           [--save eredmeny.json] [--compare alap.json] [--threshold 0.15] [meretek]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from core import BattleEngine, GameState
+from testmode import TestModeRunner, run_test_mode
+from output import DirectoryOutput
+from generate import WorldSpec, write_script, generate_world, add_spec_arguments, spec_from_args
+
+SCALES = {
+    "kicsi": WorldSpec(cards=200, dungeons=20, collection=50, deck=8, battles=200, exports=2),
+    "kozepes": WorldSpec(cards=5_000, dungeons=500, collection=1_000, deck=20, battles=2_000, exports=4),
+    "nagy": WorldSpec(cards=100_000, dungeons=2_000, dungeon_size=10, collection=50_000, deck=20, battles=10_000,
+                      exports=4),
+}
+
+
+class Workload:
+    """A generalt bemenetek egy ideiglenes mappaban; minden eset ezeket hasznalja."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.dir = tempfile.mkdtemp(prefix="damareen-suite-")
+        self.script_dir = os.path.join(self.dir, "script")
+        write_script(spec, self.script_dir)
+        self.game = generate_world(spec)
+        self.json_path = os.path.join(self.dir, "world.json")
+        self.dwb_path = os.path.join(self.dir, "world.dwb")
+        self.game.save_to_file(self.json_path)
+        self.game.save_to_file(self.dwb_path)
+
+    def close(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+# --- ESETEK ---
+# Mindegyik a Workload-ból egy argumentum nélküli, mérendő függvényt készít
+
+def case_test_mode(w):
+    return lambda: run_test_mode(w.script_dir)
+
+
+def case_test_mode_no_log(w):
+    return lambda: run_test_mode(w.script_dir, with_log=False)
+
+
+def _engine_case(w, stepwise, logger):
+    deck = w.game.player_deck
+    dungeons = w.game.dungeons[:200]
+
+    def run():
+        for d in dungeons:
+            eng = BattleEngine(deck, d, 0, logger)
+            if stepwise:
+                while not eng.battle_over:
+                    eng.step()
+            else:
+                eng.run()
+    return run
+
+
+def case_engine_step(w):
+    return _engine_case(w, True, lambda *e: None)
+
+
+def case_engine_run(w):
+    return _engine_case(w, False, lambda *e: None)
+
+
+def case_engine_fast(w):
+    # logger=None: a run() napló nélkül ugrik a párharcok végére
+    return _engine_case(w, False, None)
+
+
+def _save_case(w, name):
+    path = os.path.join(w.dir, name)
+    return lambda: w.game.save_to_file(path)
+
+
+def _load_case(path):
+    return lambda: GameState().load_from_file(path)
+
+
+def _export_case(w, command):
+    out_dir = os.path.join(w.dir, "export")
+    os.makedirs(out_dir, exist_ok=True)
+    runner = TestModeRunner(out_dir, output=DirectoryOutput(out_dir))
+    runner.game = w.game
+
+    def run():
+        runner.cmd_export([command, "out.txt"])
+        runner.output.flush()
+    return run
+
+
+CASES = {
+    "teszt_mod": case_test_mode,
+    "teszt_mod_naplo_nelkul": case_test_mode_no_log,
+    "engine_step": case_engine_step,
+    "engine_run": case_engine_run,
+    "engine_gyors": case_engine_fast,
+    "mentes_json": lambda w: _save_case(w, "save.json"),
+    "betoltes_json": lambda w: _load_case(w.json_path),
+    "mentes_dwb": lambda w: _save_case(w, "save.dwb"),
+    "betoltes_dwb": lambda w: _load_case(w.dwb_path),
+    "export_vilag": lambda w: _export_case(w, "export vilag"),
+    "export_jatekos": lambda w: _export_case(w, "export jatekos"),
+}
+
+
+# --- FUTTATÁS ÉS ÖSSZEVETÉS ---
+
+def run_suite(spec, names=None, repeat=5, progress=None):
+    """{eset: {"runs_s": [...], "best_s", "median_s"}}; az elso futas elott egy nem mert bemelegites."""
+    workload = Workload(spec)
+    results = {}
+    try:
+        for name in names or list(CASES):
+            func = CASES[name](workload)
+            func()
+            runs = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                func()
+                runs.append(time.perf_counter() - t0)
+            results[name] = {"runs_s": runs, "best_s": min(runs), "median_s": statistics.median(runs)}
+            if progress:
+                progress(name, results[name])
+    finally:
+        workload.close()
+    return results
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def make_report(spec, scale, results):
+    return {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scale": scale,
+        "spec": spec.to_dict(),
+        "cases": results,
+    }
+
+
+def compare(base, current, threshold):
+    """Soronkent (eset, alap, uj, arany, regresszio?); csak a mindkettoben meglevo esetek."""
+    rows = []
+    for name, res in current["cases"].items():
+        old = base["cases"].get(name)
+        if old is None: continue
+        ratio = res["best_s"] / old["best_s"] if old["best_s"] else float("inf")
+        rows.append((name, old["best_s"], res["best_s"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="suite", description="Meresi csomag regresszio-figyeleshez")
+    parser.add_argument("cases", nargs="*", help=f"esetek (alapertelmezetten mind: {', '.join(CASES)})")
+    parser.add_argument("--scale", choices=list(SCALES), default="kicsi")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="eredmeny mentese JSON-ba")
+    parser.add_argument("--compare", help="osszevetes egy korabbi mentessel")
+    parser.add_argument("--threshold", type=float, default=0.15, help="megengedett lassulas (0.15 = 15%%)")
+    add_spec_arguments(parser)
+    args = parser.parse_args(argv)
+
+    unknown = [c for c in args.cases if c not in CASES]
+    if unknown:
+        print(f"Ismeretlen eset: {', '.join(unknown)}")
+        return 2
+    base = None
+    if args.compare:
+        try:
+            with open(args.compare, encoding='utf-8') as f:
+                base = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Hiba a betoltesnel: {e}")
+            return 2
+    # Összevetéskor az alap méretei, hogy ugyanaz a terhelés fusson
+    spec = spec_from_args(args, WorldSpec(**base["spec"]) if base else SCALES[args.scale])
+    scale = base["scale"] if base else args.scale
+
+    def progress(name, res):
+        print(f"{name:24s} legjobb {res['best_s'] * 1e3:10.2f} ms  median {res['median_s'] * 1e3:10.2f} ms")
+
+    report = make_report(spec, scale, run_suite(spec, args.cases, max(1, args.repeat), progress))
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if base is None:
+        return 0
+
+    print(f"\nosszevetes: {base.get('revision')} -> {report['revision']}")
+    regressions = 0
+    for name, old, new, ratio, slower in compare(base, report, args.threshold):
+        regressions += slower
+        print(f"{name:24s} {old * 1e3:10.2f} -> {new * 1e3:10.2f} ms  {ratio:6.2f}x{'  REGRESSZIO' if slower else ''}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,325 @@
+import os
+from collections import deque
+from output import DirectoryOutput, ArchiveOutput
+from core import Card, Dungeon, BattleEngine, GameState
+from replay import ReplayRecorder, Replay, REPLAY_EXTENSION, format_event
+
+# --- TESZT MÓD (I. FORDULÓ LOGIKA - VÁLTOZATLAN) ---
+
+def iter_commands(input_path, start_offset=0):
+    """Tokenizalo: (a parancs utani bajt offszet, mezok) parokat ad, egyetlen olvasassal.
+
+    A feldolgozott parancsok az elso hibas UTF-8 sorig pufferelodnek: hiba
+    eseten semmit sem ad (mint az eredeti, egyben beolvaso valtozat).
+    """
+    try:
+        f = open(input_path, 'rb')
+    except Exception as e:
+        print(f"Hiba a fajl olvasasakor: {e}")
+        return
+    with f:
+        f.seek(start_offset)
+        offset = start_offset
+        # Hibás UTF-8 esetén az eredeti readlines()-hoz hasonlóan egyetlen parancs sem fut le
+        commands = []
+        for raw in f:
+            # A szöveges mód a magányos \r-t is sorvégnek veszi; UTF-8-ban a 0x0D bájt mindig \r
+            pieces = raw.split(b'\r')
+            for i, piece in enumerate(pieces):
+                offset += len(piece) + (i < len(pieces) - 1)
+                try:
+                    line = piece.decode('utf-8').strip()
+                except UnicodeDecodeError as e:
+                    print(f"Hiba a fajl olvasasakor: {e}")
+                    return
+                if not line or line.startswith("//"): continue
+                commands.append((offset, [p.strip() for p in line.split(';')]))
+    yield from commands
+
+
+def logged_battle(deck, dungeon, with_log=True):
+    """Teszt modu harc a kimeneti fajl soraival (jutalom sor nelkul)."""
+    logs, eng, _ = recorded_battle(deck, dungeon, with_log, record=False)
+    return logs, eng
+
+
+def recorded_battle(deck, dungeon, with_log=True, record=True):
+    """logged_battle, record=True eseten a harc visszajatszasaval is: (sorok, motor, Replay vagy None)."""
+    if not with_log:
+        eng = BattleEngine(deck, dungeon, 0, None, is_game_mode=False)
+        recorder = ReplayRecorder(eng) if record else None
+        eng.run()
+        return [], eng, recorder and recorder.finish()
+
+    logs = [f"harc kezdodik; {dungeon.name}"]
+
+    def fl(*event):
+        logs.append(format_event(*event))
+
+    # FONTOS: is_game_mode=False!
+    eng = BattleEngine(deck, dungeon, 0, fl, is_game_mode=False)
+    recorder = ReplayRecorder(eng) if record else None
+    eng.run()
+    return logs, eng, recorder and recorder.finish()
+
+
+def card_snapshot(cards):
+    return tuple((c.name, c.base_dmg, c.max_hp, c.original_type_str) for c in cards)
+
+
+def _battle_job(deck_snap, enemy_snap, dungeon_name, with_log, record=False):
+    """Munkafolyamat oldali harc: csak a lapok statjaitol fugg, igy barhol futtathato."""
+    deck = [Card(*s) for s in deck_snap]
+    dungeon = Dungeon(None, dungeon_name, [Card(*s) for s in enemy_snap])
+    logs, eng, replay = recorded_battle(deck, dungeon, with_log, record)
+    # A visszajátszás bájtként utazik vissza a fő folyamatba
+    return logs, eng.winner, eng.p_idx, replay and replay.to_bytes()
+
+
+class TestModeRunner:
+    """A teszt mod parancsainak vegrehajtoja.
+
+    Az allapot (vilag, jatekos, offset) a futasok kozott megmarad, igy egy
+    novekvo bemeneti fajl feldolgozasa a legutobbi offset-tol folytathato.
+
+    jobs > 1 eseten a harcok egy folyamatkeszletben futnak. Egy harc csak a
+    pakli es a kazamata lapjainak statjaitol fugg; minden mas parancs olvassa
+    vagy irja a jatekost/vilagot, ezert elotte a fuggo harcok sorrendben
+    lezarulnak. Egymast koveto harcok kozott csak a "sebzes"/"eletero" jutalom
+    valtoztathat a pakli statjain: lezaraskor a bekuldott pillanatkepet
+    osszevetjuk a pakli aktualis allapotaval, es elteres eseten helyben
+    ujraszamoljuk a harcot. A kimenet igy bajtra egyezik a soros futassal.
+
+    with_log=False eseten a harc kimenete csak a gyoztes/jutalom sor.
+    replay_dir megadasakor minden harc visszajatszasa <kimenet>.dmr neven ide kerul.
+    """
+
+    def __init__(self, input_dir, jobs=1, output=None, with_log=True, replay_dir=None):
+        self.input_dir = input_dir
+        self.output = output if output is not None else DirectoryOutput(input_dir)
+        self.with_log = with_log
+        self.replay_dir = replay_dir
+        self.game = GameState()
+        self.known_leaders = set()
+        self.offset = 0
+        self.jobs = jobs
+        self._pool = None
+        self._pending = deque()
+
+    def run(self, input_path, start_offset=None):
+        if start_offset is None:
+            start_offset = self.offset
+        self.offset = start_offset
+        for offset, parts in iter_commands(input_path, start_offset):
+            self.dispatch(parts)
+            self.offset = offset
+        self.flush()
+        self.output.flush()
+
+    def close(self):
+        self.flush()
+        if self._pool:
+            self._pool.shutdown()
+            self._pool = None
+        self.output.close()
+
+    def dispatch(self, parts):
+        cmd = parts[0]
+        if self._pending and cmd != "harc":
+            self.flush()
+        handler = self.HANDLERS.get(cmd)
+        if handler is None and cmd.startswith("export"):
+            handler = TestModeRunner.cmd_export
+        if handler:
+            handler(self, parts)
+
+    def write_output(self, out_file, lines, error_label):
+        self.output.write(out_file, "\n".join(lines), error_label)
+
+    # --- PARANCSOK ---
+
+    def cmd_new_card(self, parts):
+        if len(parts) >= 5:
+            self.game.add_world_card(Card(parts[1], parts[2], parts[3], parts[4]))
+
+    def cmd_new_leader(self, parts):
+        game = self.game
+        if len(parts) >= 4 and parts[2] in game.world_cards:
+            base = game.world_cards[parts[2]]
+            dmg, hp = base.base_dmg, base.max_hp
+            if "sebzes" in parts[3]:
+                dmg *= 2
+            elif "eletero" in parts[3]:
+                hp *= 2
+            game.add_world_card(Card(parts[1], dmg, hp, base.original_type_str))
+            self.known_leaders.add(parts[1])
+
+    def cmd_new_dungeon(self, parts):
+        game = self.game
+        if len(parts) >= 4:
+            cards = []
+            card_names = parts[3].split(',')
+            for x in card_names:
+                x = x.strip()
+                if x in game.world_cards:
+                    cards.append(game.world_cards[x])
+
+            leader = None
+            reward = None
+
+            if parts[1] == "egyszeru":
+                if len(parts) > 4: reward = parts[4]
+            elif parts[1] == "kis":
+                if len(parts) > 4 and parts[4] in game.world_cards: leader = game.world_cards[parts[4]]
+                if len(parts) > 5: reward = parts[5]
+            elif parts[1] == "nagy":
+                if len(parts) > 4 and parts[4] in game.world_cards: leader = game.world_cards[parts[4]]
+
+            game.dungeons.append(Dungeon(parts[1], parts[2], cards, leader, reward))
+
+    def cmd_new_player(self, parts):
+        self.game.reset_collection()
+
+    def cmd_add_to_collection(self, parts):
+        game = self.game
+        if len(parts) >= 2 and parts[1] in game.world_cards:
+            b = game.world_cards[parts[1]]
+            game.add_to_collection(Card(b.name, b.base_dmg, b.max_hp, b.original_type_str))
+
+    def cmd_new_deck(self, parts):
+        if len(parts) >= 2:
+            self.game.set_deck_by_names([x.strip() for x in parts[1].split(',')])
+
+    def cmd_battle(self, parts):
+        if len(parts) >= 3:
+            d_name, out_file = parts[1], parts[2]
+            dungeon = next((d for d in self.game.dungeons if d.name == d_name), None)
+            if not dungeon: return
+
+            if self.jobs > 1:
+                self.submit_battle(dungeon, out_file)
+                return
+
+            logs, eng, replay = recorded_battle(self.game.player_deck, dungeon, self.with_log,
+                                                self.replay_dir is not None)
+            logs.append(self.resolve_reward(eng.winner, eng.p_idx, eng.player_deck, dungeon))
+            self.write_output(out_file, logs, "mentesnel")
+            self.save_replay(out_file, replay)
+
+    # --- PÁRHUZAMOS HARCOK ---
+
+    def submit_battle(self, dungeon, out_file):
+        if self._pool is None:
+            # A multiprocessing importja drága; csak --jobs > 1 esetén töltjük be
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=self.jobs)
+        deck_snap = card_snapshot(self.game.player_deck)
+        enemy_snap = card_snapshot(dungeon.get_full_enemy_list())
+        future = self._pool.submit(_battle_job, deck_snap, enemy_snap, dungeon.name, self.with_log,
+                                   self.replay_dir is not None)
+        self._pending.append((future, deck_snap, dungeon, out_file))
+        # Korlátos előretekintés, hogy a memória ne nőjön a bemenettel
+        if len(self._pending) > self.jobs * 4:
+            self.commit_battle()
+
+    def commit_battle(self):
+        future, deck_snap, dungeon, out_file = self._pending.popleft()
+        deck = self.game.player_deck
+        if card_snapshot(deck) == deck_snap:
+            logs, winner, p_idx, replay = future.result()
+            replay = replay and Replay.from_bytes(replay)
+        else:
+            # Egy korábbi jutalom módosította a paklit: a spekulatív eredmény érvénytelen
+            future.cancel()
+            logs, eng, replay = recorded_battle(deck, dungeon, self.with_log, self.replay_dir is not None)
+            winner, p_idx = eng.winner, eng.p_idx
+        logs.append(self.resolve_reward(winner, p_idx, deck, dungeon))
+        self.write_output(out_file, logs, "mentesnel")
+        self.save_replay(out_file, replay)
+
+    def save_replay(self, out_file, replay):
+        if replay is None: return
+        path = os.path.join(self.replay_dir, os.path.splitext(out_file)[0] + REPLAY_EXTENSION)
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            replay.save(path)
+        except OSError as e:
+            print(f"Hiba a visszajatszas mentesenel: {e}")
+
+    def flush(self):
+        while self._pending:
+            self.commit_battle()
+
+    def resolve_reward(self, winner, p_idx, deck, dungeon):
+        game = self.game
+        if winner != "player":
+            return "jatekos vesztett"
+        if not deck:
+            return "jatekos nyert; hiba"
+
+        idx = min(p_idx, len(deck) - 1)
+        if idx < 0: idx = 0
+        lc = deck[idx]
+        orig = game.find_in_collection(lc.name)
+        if dungeon.type_id != "nagy":
+            if orig: game.upgrade_card(orig, dungeon.reward_type)
+            return f"jatekos nyert; {dungeon.reward_type}; {lc.name}"
+
+        new_c = game.first_unowned_card()
+        if new_c:
+            game.add_to_collection(Card(new_c.name, new_c.base_dmg, new_c.max_hp, new_c.original_type_str))
+            return f"jatekos nyert; {new_c.name}"
+        return "jatekos nyert; nincs uj kartya"
+
+    def cmd_export(self, parts):
+        game = self.game
+        if len(parts) >= 2:
+            out_file = parts[1]
+            lines_out = []
+            if "vilag" in parts[0]:
+                for c in game.world_cards.values():
+                    p = "vezer" if c.name in self.known_leaders else "kartya"
+                    lines_out.append(f"{p}; {c.name};{c.base_dmg};{c.max_hp};{c.original_type_str}")
+                for d in game.dungeons:
+                    l = f"kazamata; {d.type_id}; {d.name}; " + ", ".join([c.name for c in d.cards])
+                    if d.leader: l += f"; {d.leader.name}"
+                    if d.reward_type: l += f"; {d.reward_type}"
+                    lines_out.append(l)
+            else:
+                for c in game.player_collection:
+                    lines_out.append(f"gyujtemeny; {c.name}; {c.base_dmg};{c.max_hp};{c.original_type_str}")
+                for c in game.player_deck:
+                    lines_out.append(f"pakli; {c.name}")
+
+            self.write_output(out_file, lines_out, "exportnal")
+
+    HANDLERS = {
+        "uj kartya": cmd_new_card,
+        "uj vezer": cmd_new_leader,
+        "uj kazamata": cmd_new_dungeon,
+        "uj jatekos": cmd_new_player,
+        "felvetel gyujtemenybe": cmd_add_to_collection,
+        "uj pakli": cmd_new_deck,
+        "harc": cmd_battle,
+        "export vilag": cmd_export,
+        "export jatekos": cmd_export,
+    }
+
+
+def run_test_mode(input_arg, start_offset=0, jobs=1, archive=None, with_log=True, replay_dir=None):
+    if os.path.isfile(input_arg):
+        input_path = input_arg
+        input_dir = os.path.dirname(input_path)
+    else:
+        input_dir = input_arg
+        input_path = os.path.join(input_dir, "in.txt")
+
+    if not os.path.exists(input_path): return None
+
+    output = ArchiveOutput(archive) if archive else DirectoryOutput(input_dir)
+    runner = TestModeRunner(input_dir, jobs=jobs, output=output, with_log=with_log, replay_dir=replay_dir)
+    try:
+        runner.run(input_path, start_offset)
+    finally:
+        runner.close()
+    return runner